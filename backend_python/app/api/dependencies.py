@@ -0,0 +1,21 @@
+from typing import Optional
+
+from fastapi import Request
+
+from app.services.graph.graph_snapshot import GraphSnapshot
+from app.services.graph.snapshot_store import GraphSnapshotStore
+
+
+def get_snapshot_store(request: Request) -> GraphSnapshotStore:
+    """The worker's GraphSnapshotStore, created once in the application lifespan."""
+    return request.app.state.graph_snapshots
+
+
+def get_graph_snapshot(request: Request) -> Optional[GraphSnapshot]:
+    """
+    The current query-time graph snapshot (None until a first ingestion published one).
+
+    Usage in a retrieval route: snapshot = Depends(get_graph_snapshot). The object is
+    immutable: a request keeps the version it received even if a newer one is published.
+    """
+    return get_snapshot_store(request).current()
@@ -1,6 +1,6 @@
 import logging
 from fastapi import UploadFile
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 # Services & Repositories
 from app.infrastructure.database.postgres_client import PostgresClient
@@ -8,29 +8,41 @@ from app.infrastructure.neo4j.client import Neo4jClient
 from app.services.database.document_repository import DocumentRepository
 from app.services.database.chunk_repository import ChunkRepository
 from app.services.database.encyclopedia_repository import EncyclopediaRepository
+from app.services.database.entity_registry_repository import EntityRegistryRepository
+from app.services.database.resolution_verdict_repository import ResolutionVerdictRepository
+from app.services.database.summary_repository import SummaryRepository
+from app.services.database.community_repository import CommunityRepository
 from app.services.database.ingestion_context import IngestionContext
 from app.services.storage.file_service import FileService
 from app.services.llm.factory import LLMFactory
 from app.services.llm.parser import LLMParser
 from app.services.graph.graph_service import GraphService
+from app.services.graph.snapshot_store import GraphSnapshotStore
+from app.services.vector.embedding_service import EmbeddingService
 from app.services.startup_service import StartupService
 
 # Resolution Engine & Operations
 from app.indexing.operations.text.identity_service import IdentityService
 from app.indexing.workflows.create_text_units import workflow_create_text_units
+from app.indexing.workflows.finalize_graph import workflow_finalize_graph
 from app.indexing.operations.graph.graph_extractor import EntityAndRelationExtractor
 from app.indexing.operations.graph.summarize_manager import SummarizeManager 
 from app.indexing.operations.graph.store_manager import GraphStoreManager
+from app.indexing.operations.graph.community_detector import CommunityDetector
+from app.indexing.operations.graph.community_reporter import CommunityReportGenerator
 from app.indexing.operations.entity_resolution.core_resolver import CoreResolver
 from app.indexing.operations.entity_resolution.encyclopedia_manager import EncyclopediaManager
 from app.indexing.operations.entity_resolution.llm_resolver import LLMResolver
+from app.indexing.operations.entity_resolution.registry_resolver import RegistryResolver
+from app.indexing.operations.entity_resolution.resolution_memo import ResolutionMemo
 from app.indexing.operations.entity_resolution.resolution_engine import EntityResolutionEngine
 
+from app.core.config.graph_config import REGISTRY_EMBEDDINGS
 from app.core.data_model.text_units import TextUnit
 
 logger = logging.getLogger(__name__)
 
-async def ingest_single_file(file: UploadFile) -> Dict[str, Any]:
+async def ingest_single_file(file: UploadFile, snapshot_store: Optional[GraphSnapshotStore] = None) -> Dict[str, Any]:
     """
     Orchestrates the complete ingestion pipeline for a single PDF document.
     
@@ -42,9 +54,14 @@ async def ingest_single_file(file: UploadFile) -> Dict[str, Any]:
     5. Graph Extraction: Distributed extraction of entities and relationships.
     6. Entity Resolution: Merges duplicates using core logic and LLM verification.
     7. Persistence: Stores chunks and metadata (Graph storage usually follows).
+    8. Finalization: Community detection and community reports over the whole graph.
 
     Args:
         file (UploadFile): The raw PDF file from the API request.
+        snapshot_store (GraphSnapshotStore, optional): The API worker's store (app.state.graph_snapshots,
+            see app.api.dependencies.get_snapshot_store): the new graph snapshot is current in this
+            worker as soon as it is published. Without it (scripts, tests), a standalone store publishes
+            to the same directory and the API workers pick the version up at their next refresh.
 
     Returns:
         Dict[str, Any]: A summary of the ingestion results, including graph stats and cost report.
@@ -70,6 +87,10 @@ async def ingest_single_file(file: UploadFile) -> Dict[str, Any]:
     doc_repo = DocumentRepository(db)
     chunk_repo = ChunkRepository(db)
     encyclopedia_repo = EncyclopediaRepository(db)
+    registry_repo = EntityRegistryRepository(db)
+    verdict_repo = ResolutionVerdictRepository(db)
+    summary_repo = SummaryRepository(db)
+    community_repo = CommunityRepository(db)
 
     parser = LLMParser()
     
@@ -79,15 +100,26 @@ async def ingest_single_file(file: UploadFile) -> Dict[str, Any]:
     core_res = CoreResolver(encyclopedia=EncyclopediaManager(encyclopedia_repo))
     llm_res = LLMResolver(
         light_service=llm_light, 
-        heavy_service=llm_heavy
+        heavy_service=llm_heavy,
+        embedder=EmbeddingService.shared(),  # Process-wide, only loaded in 'embedding' resolution mode
+        memo=ResolutionMemo(verdict_repo)
+    )
+    registry_res = RegistryResolver(
+        repo=registry_repo,
+        llm_resolver=llm_res,
+        embedder=EmbeddingService.shared() if REGISTRY_EMBEDDINGS else None  # Opt-in: loads the model at each ingestion
+    )
+    res_engine = EntityResolutionEngine(
+        core_resolver=core_res, 
+        llm_resolver=llm_res, 
+        registry_resolver=registry_res
     )
-    res_engine = EntityResolutionEngine(core_resolver=core_res, llm_resolver=llm_res)
 
 
     # ASSEMBLE GRAPH SERVICE
     graph_service = GraphService(
         extractor=EntityAndRelationExtractor(llm_light),
-        summarizer=SummarizeManager(llm_light), 
+        summarizer=SummarizeManager(llm_light, store=summary_repo), 
         parser=parser,
         resolution_engine=res_engine,
         store_manager=store_manager
@@ -129,11 +161,32 @@ async def ingest_single_file(file: UploadFile) -> Dict[str, Any]:
             logger.info("🕸️ Running Graph Extraction pipeline...")
             entities_df, relationships_df = await graph_service.run_pipeline(
                 text_units=final_units,
-                domain_context=domain_context
+                domain_context=domain_context,
+                doc_id=str(doc_id)
             )
             
             logger.info(f"✅ Graph success: {len(entities_df)} entities, {len(relationships_df)} relations.")
 
+            # E. COMMUNITIES & REPORTS (only the communities touched by this document are rebuilt)
+            try:
+                await workflow_finalize_graph(
+                    store_manager=store_manager,
+                    detector=CommunityDetector(client=neo4j_client),
+                    reporter=CommunityReportGenerator(llm_heavy, store=community_repo),
+                    community_repo=community_repo,
+                    entities_df=entities_df,
+                    relationships_df=relationships_df,
+                    incremental=True
+                )
+            except Exception as e:
+                logger.error(f"❌ Finalize-graph failed, communities are stale: {e}", exc_info=True)
+
+            # F. QUERY-TIME SNAPSHOT (new CSR version, picked up by the API workers)
+            try:
+                await (snapshot_store or GraphSnapshotStore()).rebuild(store_manager)
+            except Exception as e:
+                logger.error(f"❌ Graph snapshot rebuild failed, queries keep the previous version: {e}")
+
         # 5. FINAL REPORTING
         tracker = LLMFactory.get_tracker()
         final_report = tracker.get_report()
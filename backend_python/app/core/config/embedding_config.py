@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+class EmbeddingConfig(BaseModel):
+    model_name: str = "BAAI/bge-m3"
+    device: str = "cpu"
+    batch_size: int = 32
+    max_length: int = 512   # Entity texts are short, no need for the 8192 window
+    tokenizer_batch_size: int = 512   # Texts per call of the batched token counter
+
+
+embedding_config = EmbeddingConfig()
+
+EMBEDDING_MODEL_NAME = embedding_config.model_name
+EMBEDDING_DEVICE = embedding_config.device
+EMBEDDING_BATCH_SIZE = embedding_config.batch_size
+EMBEDDING_MAX_LENGTH = embedding_config.max_length
+EMBEDDING_TOKENIZER_BATCH_SIZE = embedding_config.tokenizer_batch_size
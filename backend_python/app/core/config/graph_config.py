@@ -12,14 +12,53 @@ class SummarizationConfig(BaseModel):
     max_summary_length: int = 350  # words
     max_input_tokens: int = 2000
     entity_batch_size: int = 10
+    batch_token_budget: int = 2500      # Input tokens packed per batched prompt (keeps the JSON answer under max_tokens)
+    batch_max_items: int = 20
+    batch_item_max_tokens: int = 300    # Larger jobs keep their own call
 
 
 class EntityResolvingConfig(BaseModel):
     max_cluster_batch: int = 22
     levenshtein_score_merge_trigger: float = 0.85
+    registry_max_candidates: int = 8
+    registry_embeddings: bool = False             # Embed registry descriptions (loads BGE-M3 on every ingestion, whatever the resolution mode)
+    registry_min_similarity: float = 0.6          # Description cosine below which a registry candidate is not sent to the LLM
+    resolution_mode: str = "tfidf"               # "tfidf" | "embedding"
+    embedding_similarity_threshold: float = 0.82  # Cosine similarity for an ANN candidate pair
+    ann_neighbors: int = 8                        # k nearest neighbors queried per entity
+    hnsw_min_size: int = 2000                     # Below this size the exact numpy search is used
+    max_resolution_concurrency: int = 8           # Concurrent LLM calls shared by all categories/clusters
+
+
+class GraphStoreConfig(BaseModel):
+    write_batch_size: int = 5000     # Rows per Neo4j transaction (bounded heap usage)
+    write_concurrency: int = 4       # Concurrent write transactions
+    write_max_retries: int = 5       # Attempts on transient errors (deadlocks, lock timeouts)
+
+
+class CommunityConfig(BaseModel):
+    algorithm: str = "leiden"            # "leiden" | "louvain" (Leiden falls back to Louvain without graspologic)
+    backend: str = "auto"                # "auto" (GDS when installed) | "networkx" | "gds"
+    max_levels: int = 3                  # Depth of the hierarchy (level 0 = coarsest)
+    max_cluster_size: int = 10           # Leiden: communities above this size are split at the next level
+    resolution: float = 1.0
+    seed: int = 42                       # Deterministic partitions across runs
+    min_size: int = 2                    # Smaller communities get no report
+    report_max_input_tokens: int = 6000  # Context budget of one community report
+    report_concurrency: int = 8          # Concurrent report generations
+    incremental_max_share: float = 0.3   # Incremental finalize re-clusters at most this share of the graph, else full run
+
+
+class GraphSnapshotConfig(BaseModel):
+    directory: str = "./data/graph_snapshot"  # Versioned CSR snapshots, shared (mmap) by the API workers
+    keep_versions: int = 3                    # Older versions are pruned after a publish
+    refresh_interval: float = 5.0             # Seconds between two checks of the published version
 
 
 extraction_config = ExtractionConfig()
+community_config = CommunityConfig()
+graph_store_config = GraphStoreConfig()
+graph_snapshot_config = GraphSnapshotConfig()
 summarization_config = SummarizationConfig()
 entity_resolving_config = EntityResolvingConfig()
 
@@ -32,7 +71,40 @@ RECORD_DELIMITER = extraction_config.record_delimiter
 MAX_SUMMARY_LENGTH = summarization_config.max_summary_length
 MAX_INPUT_TOKENS = summarization_config.max_input_tokens
 ENTITY_BATCH_SIZE = summarization_config.entity_batch_size
+SUMMARY_BATCH_TOKEN_BUDGET = summarization_config.batch_token_budget
+SUMMARY_BATCH_MAX_ITEMS = summarization_config.batch_max_items
+SUMMARY_BATCH_ITEM_MAX_TOKENS = summarization_config.batch_item_max_tokens
 
 # Entity Resolving
 MAX_CLUSTER_BATCH = entity_resolving_config.max_cluster_batch
 LEVENSHTEIN_SCORE_MERGE_TRIGGER = entity_resolving_config.levenshtein_score_merge_trigger
+REGISTRY_MAX_CANDIDATES = entity_resolving_config.registry_max_candidates
+REGISTRY_EMBEDDINGS = entity_resolving_config.registry_embeddings
+REGISTRY_MIN_SIMILARITY = entity_resolving_config.registry_min_similarity
+RESOLUTION_MODE = entity_resolving_config.resolution_mode
+EMBEDDING_SIMILARITY_THRESHOLD = entity_resolving_config.embedding_similarity_threshold
+ANN_NEIGHBORS = entity_resolving_config.ann_neighbors
+HNSW_MIN_SIZE = entity_resolving_config.hnsw_min_size
+MAX_RESOLUTION_CONCURRENCY = entity_resolving_config.max_resolution_concurrency
+
+# Graph Store
+NEO4J_WRITE_BATCH_SIZE = graph_store_config.write_batch_size
+NEO4J_WRITE_CONCURRENCY = graph_store_config.write_concurrency
+NEO4J_WRITE_MAX_RETRIES = graph_store_config.write_max_retries
+
+# Graph Snapshot
+GRAPH_SNAPSHOT_DIR = graph_snapshot_config.directory
+GRAPH_SNAPSHOT_KEEP_VERSIONS = graph_snapshot_config.keep_versions
+GRAPH_SNAPSHOT_REFRESH_INTERVAL = graph_snapshot_config.refresh_interval
+
+# Communities
+COMMUNITY_ALGORITHM = community_config.algorithm
+COMMUNITY_BACKEND = community_config.backend
+COMMUNITY_MAX_LEVELS = community_config.max_levels
+COMMUNITY_MAX_CLUSTER_SIZE = community_config.max_cluster_size
+COMMUNITY_RESOLUTION = community_config.resolution
+COMMUNITY_SEED = community_config.seed
+COMMUNITY_MIN_SIZE = community_config.min_size
+COMMUNITY_REPORT_MAX_INPUT_TOKENS = community_config.report_max_input_tokens
+COMMUNITY_REPORT_CONCURRENCY = community_config.report_concurrency
+COMMUNITY_INCREMENTAL_MAX_SHARE = community_config.incremental_max_share
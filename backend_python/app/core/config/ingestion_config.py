@@ -1,3 +1,4 @@
+import os
 from pydantic import BaseModel
 
 class ChunkingConfig(BaseModel):
@@ -10,3 +11,66 @@ chunking_config = ChunkingConfig()
 
 CHUNK_SIZE = chunking_config.chunk_size
 CHUNK_OVERLAP = chunking_config.chunk_overlap
+
+
+class ConverterPoolConfig(BaseModel):
+    max_converters: int = 4            # Warm DocumentConverters kept across all option sets (each holds its models)
+    max_idle_per_options: int = 2      # Idle converters kept for one option set
+    warm_on_startup: bool = True
+    warm_ocr: bool = False             # OCR models are heavy: only preload them for scan-heavy corpora
+
+
+converter_pool_config = ConverterPoolConfig()
+
+CONVERTER_POOL_MAX = converter_pool_config.max_converters
+CONVERTER_POOL_MAX_IDLE = converter_pool_config.max_idle_per_options
+CONVERTER_WARM_ON_STARTUP = converter_pool_config.warm_on_startup
+CONVERTER_WARM_OCR = converter_pool_config.warm_ocr
+
+
+class ConversionWorkersConfig(BaseModel):
+    use_process_pool: bool = True      # False: conversion runs in a thread of the API process
+    workers: int = max(1, min(4, (os.cpu_count() or 2) // 2))
+    max_tasks_per_worker: int = 20     # Recycles a worker after N documents (native memory growth)
+
+
+conversion_workers_config = ConversionWorkersConfig()
+
+CONVERSION_USE_PROCESS_POOL = conversion_workers_config.use_process_pool
+CONVERSION_WORKERS = conversion_workers_config.workers
+CONVERSION_MAX_TASKS_PER_WORKER = conversion_workers_config.max_tasks_per_worker
+
+
+class ShardingConfig(BaseModel):
+    min_pages: int = 120               # Smaller PDFs are converted in one call
+    pages_per_shard: int = 60
+
+
+sharding_config = ShardingConfig()
+
+SHARD_MIN_PAGES = sharding_config.min_pages
+SHARD_PAGES = sharding_config.pages_per_shard
+
+
+class OcrRoutingConfig(BaseModel):
+    min_text_chars: int = 50           # Below this much native text, a page may be a scan
+    min_image_coverage: float = 0.3    # ... and it is one when images cover this share of it
+    min_text_run: int = 3              # Shorter digital runs between scans are OCRed with them (fewer segments)
+
+
+ocr_routing_config = OcrRoutingConfig()
+
+OCR_MIN_TEXT_CHARS = ocr_routing_config.min_text_chars
+OCR_MIN_IMAGE_COVERAGE = ocr_routing_config.min_image_coverage
+OCR_MIN_TEXT_RUN = ocr_routing_config.min_text_run
+
+
+class StreamingConversionConfig(BaseModel):
+    enabled: bool = True               # Figures cropped during conversion, no page bitmaps retained
+    window_pages: int = 30             # Pages converted (and released) at a time inside a worker
+
+
+streaming_conversion_config = StreamingConversionConfig()
+
+STREAMING_CONVERSION = streaming_conversion_config.enabled
+STREAMING_WINDOW_PAGES = streaming_conversion_config.window_pages
@@ -14,4 +14,6 @@ LLM_CONFIG_HEAVY = LLMConfig(model_name="gpt-4o", temperature=0.0, streaming=Fal
 
 SUMMARIZATION_LLM_CONFIG = LLMConfig(model_name="gpt-4o-mini", temperature=0.1, streaming=False)
 
-CHAT_AGENT_CONFIG = LLMConfig(model_name="gpt-4o", temperature=0.1, streaming=True)
\ No newline at end of file
+CHAT_AGENT_CONFIG = LLMConfig(model_name="gpt-4o", temperature=0.1, streaming=True)
+# Tokenizer used for prompt budgeting (gpt-4o family), see TokenizerRegistry
+LLM_TOKENIZER_NAME = "tiktoken:o200k_base"
@@ -1,13 +1,17 @@
 from typing import List, Optional, Dict, Any
 from pydantic import Field
-from app.core.data_model.base import NamedModel
+from app.core.data_model.base import IdentifiedModel
 
-class CommunityModel(NamedModel):
+class CommunityModel(IdentifiedModel):
     """
     A community (cluster) within the system, representing a group of related entities.
+
+    The id is derived from the level and the sorted member ids, so an unchanged
+    community keeps its id (and its cached report) from one detection to the next.
     """
-    
-    level: str = Field(..., description="Community level (0, 1, 2, etc.)")
+    title: str = Field("", description="Readable name, e.g. 'Community 1-4'")
+
+    level: int = Field(..., description="Community level (0 = coarsest, 1, 2, etc.)")
     parent: Optional[str] = Field(None, description="ID of the parent community")
     children: List[str] = Field(default_factory=list, description="IDs of sub-communities")
     
@@ -20,4 +24,4 @@ class CommunityModel(NamedModel):
     
     attributes: Dict[str, Any] = Field(default_factory=dict)
     size: Optional[int] = Field(None, description="Amount of text units in this community")
-    period: Optional[str] = Field(None, description="Time period associated with this community")
\ No newline at end of file
+    period: Optional[str] = Field(None, description="Time period associated with this community")
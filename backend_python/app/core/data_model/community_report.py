@@ -1,19 +1,24 @@
 from typing import List, Optional, Dict, Any
 from pydantic import Field
-from .base import NamedModel
+from .base import IdentifiedModel
 
-class CommunityReportModel(NamedModel):
+class CommunityReportModel(IdentifiedModel):
     """
     The LLM-generated summary report for a specific community.
     """
     community_id: str = Field(..., description="The ID of the community this report describes")
-    
+    level: int = Field(0, description="Level of the community in the hierarchy")
+
+    title: str = Field("", description="Title given by the LLM")
     summary: str = Field("", description="A brief summary of the community's importance")
     full_content: str = Field("", description="The complete text of the generated report")
+    findings: List[Dict[str, str]] = Field(default_factory=list, description="Key insights: [{'summary', 'explanation'}]")
     
     rank: float = Field(1.0, description="Quality rank of the report (higher is better)")
     full_content_embedding: Optional[List[float]] = Field(None, description="Semantic vector of the full report")
+
+    context_hash: str = Field("", description="Hash of the prompt version and of the context the report was built from")
     
     attributes: Dict[str, Any] = Field(default_factory=dict)
     size: Optional[int] = Field(None, description="Complexity or size indicator")
-    period: Optional[str] = Field(None, description="Temporal context of the report")
\ No newline at end of file
+    period: Optional[str] = Field(None, description="Temporal context of the report")
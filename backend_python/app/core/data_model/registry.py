@@ -0,0 +1,30 @@
+from typing import List, Optional
+from pydantic import Field, ConfigDict
+
+from app.core.data_model.base import DescriptiveModel
+
+
+class RegistryEntry(DescriptiveModel):
+    """
+    A resolved graph entity as remembered across documents.
+
+    Unlike the Encyclopedia (curated, authoritative), the registry is filled
+    automatically at the end of every ingestion. It gives each new extraction
+    a pool of already-known identities to be resolved against, so a companion
+    met in a previous book keeps the same id in the next one.
+    """
+    model_config = ConfigDict(populate_by_name=True)
+
+    type: str = Field("UNKNOWN", description="Specific type of the entity (SAHABI, BATTLE, ...)")
+
+    category: Optional[str] = Field(None, description="Broad category (HUMAN, EVENT, etc.)")
+
+    phonetic_key: str = Field("", description="Primary Double Metaphone code of the title")
+
+    aliases: List[str] = Field(default_factory=list, description="Slugs of every variant merged into this identity")
+
+    description: str = Field("", description="Reference description used for disambiguation")
+
+    description_embedding: Optional[List[float]] = Field(None, description="Semantic vector of the description")
+
+    frequency: int = Field(1, description="Cumulated number of occurrences across the corpus")
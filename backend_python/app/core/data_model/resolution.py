@@ -0,0 +1,30 @@
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
+
+
+class ResolutionVerdict(BaseModel):
+    """
+    A remembered LLM decision about two entities: same identity or not.
+
+    Both sides are identified by a fingerprint of (slug, category, description),
+    so the verdict is reused whenever the same pair shows up again, whatever the
+    cluster it belongs to. A changed description yields a new fingerprint, hence
+    a fresh decision.
+    """
+    pair_key: str = Field(..., description="Hash of the two sorted fingerprints")
+
+    left_key: str = Field(..., description="Fingerprint of the first side (sorted order)")
+
+    right_key: str = Field(..., description="Fingerprint of the second side (sorted order)")
+
+    left_slug: str = ""
+
+    right_slug: str = ""
+
+    category: Optional[str] = None
+
+    verdict: Literal["MERGE", "DISTINCT"]
+
+    target_key: Optional[str] = Field(None, description="Fingerprint of the surviving side of a MERGE")
+
+    source: Literal["CLUSTER", "ANCHORING"] = "CLUSTER"
@@ -0,0 +1,21 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+
+class DescriptionSummary(BaseModel):
+    """
+    A persisted Phase 4 summary.
+
+    The summary is valid for the exact fragment set it was built from (fragments_hash)
+    and for the prompts that produced it (prompt_version). Keeping the fragments allows
+    an incremental update when a later ingestion only adds new ones.
+    """
+    object_id: str = Field(..., description="Entity id, or 'source_id->target_id' for a relationship")
+
+    prompt_version: str = Field(..., description="Hash of the summarization prompts")
+
+    fragments_hash: str = Field(..., description="Hash of the sorted, deduplicated fragments")
+
+    fragments: List[str] = Field(default_factory=list, description="Sorted, deduplicated fragments")
+
+    summary: str = Field(..., description="The synthesized description")
@@ -181,6 +181,28 @@ Description List: {description_list}
 Output:
 """
 
+INCREMENTAL_SUMMARIZE_USER_PROMPT = """
+#######
+-Data-
+Subject: {target_name}
+Current Summary: {current_summary}
+New Descriptions: {description_list}
+#######
+Fold the new descriptions into the current summary, following the same rules.
+Output:
+"""
+
+BATCH_SUMMARIZE_USER_PROMPT = """
+Each subject below comes with its own description list. Summarize every subject independently, following the rules above.
+Short description lists deserve short summaries.
+#######
+-Data-
+{subjects}
+#######
+Return ONLY a JSON object mapping every subject key to its summary, e.g. {{"S0": "...", "S1": "..."}}.
+Output:
+"""
+
 
 ENTITY_RESOLUTION_SYSTEM_PROMPT = """
 You are an expert historian specializing in the Sira (biography of Prophet Muhammad ﷺ).
@@ -266,4 +288,35 @@ CONSULTANT_RESOLUTION_USER_PROMPT = """
 ### Category: {category}
 ### Entity Titles to Evaluate:
 {titles_text}
-"""
\ No newline at end of file
+"""
+
+COMMUNITY_REPORT_SYSTEM_PROMPT = """
+You are an expert historian of the Sira (biography of Prophet Muhammad ﷺ) writing the report of a community of the knowledge graph:
+a group of closely related entities (people, tribes, places, events) and the relationships between them.
+The report helps answering global questions about the corpus without reading it again.
+
+STRICT RULES:
+1. ONLY PROVIDED DATA: Use only the entities, relationships and sub-community reports given. No external knowledge.
+2. GROUNDING: Every finding must be supported by the data; do not speculate.
+3. STYLE: Factual, dense, professional prose.
+
+You must return ONLY a valid JSON object in this format:
+{
+  "title": "Short name of the community, naming its most representative entities",
+  "summary": "Executive summary of the community: its structure, key entities and how they relate",
+  "rating": 5.0,
+  "rating_explanation": "One sentence on the importance of the community in the corpus",
+  "findings": [
+    {"summary": "Short statement of one key insight", "explanation": "Grounded explanation of the insight"}
+  ]
+}
+The rating is a float between 0 and 10 (10 = central to the corpus). Give between 2 and 8 findings.
+"""
+
+COMMUNITY_REPORT_USER_PROMPT = """
+#######
+-Data-
+{context}
+#######
+Output:
+"""
@@ -0,0 +1,84 @@
+import logging
+from typing import List, Tuple
+
+import numpy as np
+
+from app.core.config.graph_config import ANN_NEIGHBORS, HNSW_MIN_SIZE
+
+try:
+    import hnswlib
+except ImportError:  # Optional: the exact numpy search is always available
+    hnswlib = None
+
+logger = logging.getLogger(__name__)
+
+class ANNIndex:
+    """
+    In-process nearest-neighbor index over L2-normalized embeddings.
+
+    - Small sets (the usual per-category orphan pool): exact cosine kNN with blocked
+      numpy matrix products, which is fast and deterministic.
+    - Large sets: an HNSW graph (hnswlib) when the package is installed.
+
+    The index only produces candidate pairs; deciding the merge stays with the LLM.
+    """
+
+    BLOCK_SIZE = 1024
+
+    def __init__(self, vectors: np.ndarray, hnsw_min_size: int = HNSW_MIN_SIZE):
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.use_hnsw = hnswlib is not None and len(self.vectors) >= hnsw_min_size
+        self._hnsw = self._build_hnsw() if self.use_hnsw else None
+
+    def query_pairs(self, k: int = ANN_NEIGHBORS, min_similarity: float = 0.0) -> List[Tuple[int, int, float]]:
+        """
+        Returns the unique (i, j, similarity) pairs, i < j, where j is among the k
+        nearest neighbors of i (or the reverse) with a similarity >= min_similarity.
+        """
+        n = len(self.vectors)
+        if n < 2:
+            return []
+
+        k = min(k, n - 1)
+        neighbors, similarities = self._knn_hnsw(k) if self.use_hnsw else self._knn_exact(k)
+
+        pairs = {}
+        for i in range(n):
+            for j, sim in zip(neighbors[i], similarities[i]):
+                j = int(j)
+                if j == i or j < 0 or sim < min_similarity:
+                    continue
+                key = (i, j) if i < j else (j, i)
+                pairs[key] = max(pairs.get(key, -1.0), float(sim))
+
+        return sorted((i, j, sim) for (i, j), sim in pairs.items())
+
+    def _knn_exact(self, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Blocked exact search: one (block x n) similarity matrix at a time."""
+        n = len(self.vectors)
+        neighbors = np.empty((n, k), dtype=np.int64)
+        similarities = np.empty((n, k), dtype=np.float32)
+
+        for start in range(0, n, self.BLOCK_SIZE):
+            stop = min(start + self.BLOCK_SIZE, n)
+            sims = self.vectors[start:stop] @ self.vectors.T
+            sims[np.arange(stop - start), np.arange(start, stop)] = -np.inf  # No self match
+
+            top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            neighbors[start:stop] = top
+            similarities[start:stop] = np.take_along_axis(sims, top, axis=1)
+
+        return neighbors, similarities
+
+    def _build_hnsw(self):
+        n, dim = self.vectors.shape
+        index = hnswlib.Index(space="cosine", dim=dim)
+        index.init_index(max_elements=n, ef_construction=200, M=16, random_seed=42)
+        index.add_items(self.vectors, np.arange(n), num_threads=1)  # Deterministic graph
+        logger.debug(f"🕸️ HNSW index built on {n} vectors.")
+        return index
+
+    def _knn_hnsw(self, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        self._hnsw.set_ef(max(2 * (k + 1), 50))
+        labels, distances = self._hnsw.knn_query(self.vectors, k=k + 1)
+        return labels, 1.0 - distances
@@ -1,6 +1,6 @@
+import numpy as np
 import pandas as pd
 import logging
-import asyncio
 from typing import List, Dict, Tuple, Optional, Any
 from phonetics import dmetaphone
 from Levenshtein import ratio
@@ -9,6 +9,9 @@ from app.core.config.graph_config import LEVENSHTEIN_SCORE_MERGE_TRIGGER
 
 from app.core.data_model.entity import EntityModel
 from app.core.data_model.encyclopedia import EncyclopediaEntry
+from app.indexing.operations.graph.aggregation_utils import (
+    columnar_aggregate, JOIN_UNIQUE, UNION_LISTS, MERGE_DICTS
+)
 from app.indexing.operations.entity_resolution.encyclopedia_manager import EncyclopediaManager
 
 logger = logging.getLogger(__name__)
@@ -59,9 +62,21 @@ class CoreResolver:
         # Note: local_changes should be populated by this method for internal merges
         merged_df = self._algorithmic_merging(df, local_changes)
 
-        # 2. Encyclopedia Anchoring (Concurrent)
-        tasks = [self._anchor_single_entity(row) for _, row in merged_df.iterrows()]
-        anchoring_results = await asyncio.gather(*tasks)
+        # 2. Encyclopedia Anchoring (Single bulk lookup for the whole batch)
+        rows = [row for _, row in merged_df.iterrows()]
+        try:
+            all_matches = await self.encyclopedia.find_matches([
+                (str(row["title"]) if pd.notna(row["title"]) else "",
+                 str(row["category"]) if pd.notna(row["category"]) else None)
+                for row in rows
+            ])
+        except Exception as e:
+            logger.error(f"❌ Error during bulk encyclopedia lookup: {e}")
+            all_matches = [[] for _ in rows]
+
+        anchoring_results = [
+            self._anchor_single_entity(row, matches) for row, matches in zip(rows, all_matches)
+        ]
         
         # 3. Final Integration
         # We create a mapping dataframe to update the main merged_df
@@ -79,15 +94,14 @@ class CoreResolver:
 
         return merged_df, local_changes
     
-    async def _anchor_single_entity(self, row: pd.Series) -> dict:
+    def _anchor_single_entity(self, row: pd.Series, matches: List[EncyclopediaEntry]) -> dict:
         """
-        Internal worker to match a single row against the Encyclopedia.
+        Internal worker to match a single row against its Encyclopedia candidates.
         Returns a dictionary of fields to update for this specific entity ID.
         """
         # Data cleanup (equivalent to your previous manual dict cleanup)
         row_id = row['id']
         title = str(row['title']) if pd.notna(row['title']) else ""
-        category = str(row['category']) if pd.notna(row['category']) else None
         
         # Preserve existing attributes
         attributes = row.get('attributes', {})
@@ -101,122 +115,92 @@ class CoreResolver:
             "attributes": attributes
         }
 
-        try:
-            matches = await self.encyclopedia.find_match(title, category)
+        if len(matches) == 1:
+            canonical = matches[0]
+            logger.info(f"✅ Encyclopedia Match: '{title}' -> {canonical.id}")
+            res["canonical_id"] = canonical.id
+            res["review_status"] = "CORE_VALIDATED"
             
-            if len(matches) == 1:
-                canonical = matches[0]
-                logger.info(f"✅ Encyclopedia Match: '{title}' -> {canonical.id}")
-                res["canonical_id"] = canonical.id
-                res["review_status"] = "CORE_VALIDATED"
-                
-            elif len(matches) > 1:
-                logger.warning(f"⚠️ Ambiguity: '{title}' has {len(matches)} candidates.")
-                res["attributes"]["anchoring_candidates"] = [m.model_dump() for m in matches]
-                res["review_status"] = "PENDING"
-                
-        except Exception as e:
-            logger.error(f"❌ Error during anchoring for '{title}': {e}")
+        elif len(matches) > 1:
+            logger.warning(f"⚠️ Ambiguity: '{title}' has {len(matches)} candidates.")
+            res["attributes"]["anchoring_candidates"] = [m.model_dump() for m in matches]
+            res["review_status"] = "PENDING"
             
         return res
 
-        
-
     def _algorithmic_merging(self, df: pd.DataFrame, changes: Dict[str, str]) -> pd.DataFrame:
         """
         Clusters entities based on frequency-first priority.
         
         The algorithm treats the most frequent name as the cluster 'pivot' 
         to ensure naming stability throughout the graph.
+
+        Two rows merge when they share the category and the phonetic key, and their
+        slugs reach the Levenshtein threshold. Candidates are therefore only compared
+        inside (category, phonetic_key) blocks.
+        Clusters are then collapsed in one columnar pass (see _aggregate_clusters).
         """
 
         # Frequency-based sorting to ensure the dominant name survives as the cluster head        
         df = df.sort_values("frequency", ascending=False).reset_index(drop=True)
-        
-        merged_indices = set()
-        final_rows = []
 
-        for i, row in df.iterrows():
-            if i in merged_indices: continue
+        ids = df["id"].tolist()
+        titles = df["title"].tolist()
+        slugs = [str(s) for s in df["slug"].tolist()]
 
-            cluster = [row]
-            merged_indices.add(i)
+        # Blocking on (category, phonetic_key), rows kept in frequency order
+        blocks: Dict[Any, List[int]] = {}
+        for i, (category, key) in enumerate(zip(df["category"].tolist(), df["phonetic_key"].tolist())):
+            # NaN never equals itself: such a row cannot merge with anything
+            block_key = (i,) if pd.isna(category) and category is not None else (category, key)
+            blocks.setdefault(block_key, []).append(i)
 
-            for j, candidate in df.iloc[i+1:].iterrows():
-                if j in merged_indices: continue
-                
-                if self._is_mergeable(row, candidate):
-                    changes[candidate["id"]] = row["id"]
-                    logger.debug(f"🔗 Merging variant '{candidate['title']}' into pivot '{row['title']}'")
-                    cluster.append(candidate)
-                    merged_indices.add(j)
+        pivots = np.arange(len(df))
+        for block in blocks.values():
+            merged = set()
+            for pos, i in enumerate(block):
+                if i in merged: continue
 
-            final_rows.append(self._aggregate_cluster(cluster))
-            
-        return pd.DataFrame(final_rows)
+                for j in block[pos + 1:]:
+                    if j in merged: continue
 
-    def _is_mergeable(self, row: pd.Series, candidate: pd.Series) -> bool:
-        """
-        Deterministic check:
-        1. Must share the same category (Human, Place, etc.)
-        2. Must share phonetic sound AND string similarity.
-        """
-        # 1. Semantic Check (Zero overhead now)
-        if row["category"] != candidate["category"]:
-            return False
+                    if ratio(slugs[i], slugs[j]) >= self.similarity_threshold:
+                        changes[ids[j]] = ids[i]
+                        logger.debug(f"🔗 Merging variant '{titles[j]}' into pivot '{titles[i]}'")
+                        pivots[j] = i
+                        merged.add(j)
 
-        # 2. Structural Check
-        same_sound = row["phonetic_key"] == candidate["phonetic_key"]
-        sim_ratio = ratio(str(row["slug"]), str(candidate["slug"]))
-        
-        return same_sound and sim_ratio >= self.similarity_threshold
+        return self._aggregate_clusters(df, pivots)
 
-    def _aggregate_cluster(self, cluster_rows: List[pd.Series]) -> Dict:
+    def _aggregate_clusters(self, df: pd.DataFrame, pivots: np.ndarray) -> pd.DataFrame:
         """
-        Collapses a group of similar entities into a single unified record.
+        Collapses every cluster into a single unified record.
         
         Merges source tracking IDs and joins descriptions with a pipe delimiter ("|") 
         to preserve context for the subsequent Summarization phase.
-        """
-               
-        main = cluster_rows[0]        
-        
-        # 1. Traceability: Union of source_ids (deduplicated)
-        all_sources = []
-        for r in cluster_rows:
-            all_sources.extend(r.get("source_ids", []))
-        unique_sources = list(set(all_sources))
-        
-        # 2. Importance: Sum of frequencies and Max rank
-        # If 'A' appears 3 times and 'A'' 2 times, the total is 5.
-        total_frequency = sum(r.get("frequency", 1) for r in cluster_rows)
 
-        # Keep the highest rank in the cluster to maintain entity significance
-        max_rank = max(r.get("rank", 1) for r in cluster_rows)
-        
-        # 3. Context: Merge descriptions
-        descriptions = set(filter(None, [str(r.get("description", "")) for r in cluster_rows]))
-        
-        # 4. Attributes & Communities: Merge dictionaries and lists
-        merged_attributes = {}
-        merged_communities = set()
-        for r in cluster_rows:
-            merged_attributes.update(r.get("attributes", {}))
-            merged_communities.update(r.get("community_ids", []))
-
-        # The returned dictionary must match the EntityModel fields
-        return {
-            "id": main["id"],
-            "title": main["title"], # Will be re-normalized by the EntityModel validator
-            "slug": main.get("slug"), 
-            "type": main["type"],
-            "category": main.get("category"), # Will be re-calculated by the model_validator if None
-            "description": " | ".join(descriptions),
-            "frequency": total_frequency,
-            "source_ids": unique_sources,
-            "rank": max_rank,
-            "community_ids": list(merged_communities),
-            "attributes": merged_attributes,
-            "canonical_id": None,
-            "review_status": "NOT_KNOWN"
-        }
\ No newline at end of file
+        Args:
+            df: Frequency-sorted entities.
+            pivots: For each row, the position of its cluster pivot (itself if unmerged).
+                    A pivot always precedes its variants, so 'first' is the pivot's value.
+        """
+        df = df.assign(_pivot=pivots)
+
+        merged = columnar_aggregate(df, ["_pivot"], {
+            "id": "first",
+            "title": "first",       # Will be re-normalized by the EntityModel validator
+            "slug": "first",
+            "type": "first",
+            "category": "first",    # Will be re-calculated by the model_validator if None
+            "description": JOIN_UNIQUE,
+            "frequency": "sum",     # If 'A' appears 3 times and 'A'' 2 times, the total is 5.
+            "source_ids": UNION_LISTS,
+            "rank": "max",          # Keep the highest rank in the cluster
+            "community_ids": UNION_LISTS,
+            "attributes": MERGE_DICTS
+        }).drop(columns="_pivot")
+
+        # The returned columns must match the EntityModel fields
+        merged["canonical_id"] = None
+        merged["review_status"] = "NOT_KNOWN"
+        return merged
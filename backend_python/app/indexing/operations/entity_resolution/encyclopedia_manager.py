@@ -1,5 +1,5 @@
 import logging
-from typing import List
+from typing import List, Optional, Tuple
 
 from app.core.data_model.base import slugify_entity
 from app.core.data_model.encyclopedia import EncyclopediaEntry
@@ -49,4 +49,30 @@ class EncyclopediaManager:
         return await self.repo.search_by_criteria(
             slug=target_title, 
             category=extracted_category
-        )
\ No newline at end of file
+        )
+
+    async def find_matches(self, queries: List[Tuple[str, Optional[str]]]) -> List[List[EncyclopediaEntry]]:
+        """
+        Bulk counterpart of find_match, used by the CoreResolver.
+
+        Titles are slugified once in Python, identical (slug, category) pairs are
+        collapsed, and the whole set is resolved by a single repository query.
+
+        Args:
+            queries: (raw title or slug, category) tuples, one per entity.
+
+        Returns:
+            A list aligned with `queries`, each item holding its matching entries.
+        """
+        keys = [(slugify_entity(title), category) for title, category in queries]
+
+        # Empty slugs or missing categories can never match: keep them out of the query
+        unique_keys = list(dict.fromkeys(k for k in keys if k[0] and k[1]))
+        if not unique_keys:
+            return [[] for _ in keys]
+
+        logger.info(f"🔎 find_matches: {len(keys)} entities -> {len(unique_keys)} distinct lookups")
+        matches = await self.repo.search_many_by_criteria(unique_keys)
+        by_key = dict(zip(unique_keys, matches))
+
+        return [list(by_key.get(k, [])) for k in keys]
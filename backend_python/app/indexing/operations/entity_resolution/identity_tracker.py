@@ -1,29 +1,41 @@
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List
 import logging
 
+import numpy as np
+import pandas as pd
+
 
 logger = logging.getLogger(__name__)
 
 class IdentityTracker:
     """
     Centralized registry for tracking entity renames and identity merges.
-    
-    This tracker maintains a mapping of 'old identities' to 'new identities'. 
-    It is designed to handle messy extractions by enforcing case-insensitive 
-    keys and resolving multi-step redirection chains (transitive resolution).
+
+    This tracker maintains a mapping of 'old identities' to 'new identities'.
+    It is designed to handle messy extractions by enforcing clean string keys and
+    resolving multi-step redirection chains (transitive resolution).
+
+    Internally it is a disjoint-set forest (union-find) with path compression and
+    union by rank. Each set remembers its 'canonical' member (the target side of the
+    last merge), so redirection chains of any length resolve in near-constant time
+    per lookup instead of being walked again from every key.
     """
 
     def __init__(self):
-        """Initializes an empty mapping dictionary."""
-        self._mapping: Dict[str, str] = {}
+        """Initializes an empty forest."""
+        self._index: Dict[str, int] = {}   # identity -> node
+        self._ids: List[str] = []          # node -> identity
+        self._parent: List[int] = []
+        self._rank: List[int] = []
+        self._canonical: List[int] = []    # root -> node holding the canonical identity
 
     def add_mapping(self, old_id: Any, new_id: Any):
         """
         Registers a redirection from an old id to a new id.
-        
-        To prevent lookup failures due to inconsistent casing from the LLM, 
-        this method stores the mapping in two forms: original, UPPER, and lower.
-        
+
+        Both sets are united; the canonical identity of the resulting set is the
+        one of `new_id`. Null-like values, empty strings and self-loops are ignored.
+
         Args:
             old_id: The source ID to be redirected.
             new_id: The target ID (the 'canonical' version).
@@ -47,35 +59,96 @@ class IdentityTracker:
 
         logger.debug(f"Registering alias: '{old_s}' -> '{new_s}'")
 
-        self._mapping[old_s] = new_s
+        old_root = self._find_root(self._node(old_s))
+        new_root = self._find_root(self._node(new_s))
+
+        # Already the same identity (also breaks circular links like A -> B -> A)
+        if old_root == new_root:
+            return
+
+        canonical = self._canonical[new_root]
+
+        # Union by rank: the shallower tree is attached under the deeper one
+        if self._rank[old_root] > self._rank[new_root]:
+            old_root, new_root = new_root, old_root
+        self._parent[old_root] = new_root
+        if self._rank[old_root] == self._rank[new_root]:
+            self._rank[new_root] += 1
+
+        self._canonical[new_root] = canonical
+
+    def find(self, entity_id: Any) -> Any:
+        """
+        Returns the final identity of a single id (the id itself if it was never redirected).
+        """
+        node = self._index.get(str(entity_id).strip())
+        if node is None:
+            return entity_id
+        return self._ids[self._canonical[self._find_root(node)]]
+
+    def find_many(self, entity_ids: Iterable[Any]) -> List[Any]:
+        """
+        Bulk version of find(), preserving the input order.
+        """
+        return [self.find(i) for i in entity_ids]
+
+    def remap(self, ids: pd.Series) -> pd.Series:
+        """
+        Vectorized remapping of an id column.
+
+        Values are factorized first, so each distinct id is resolved once and the
+        result is broadcast back with a single take() over the integer codes.
+        Missing values are left untouched.
+        """
+        if ids.empty or not self._ids:
+            return ids
 
+        codes, uniques = pd.factorize(ids)
+        resolved = np.asarray(self.find_many(uniques), dtype=object)
+
+        values = ids.to_numpy(dtype=object, copy=True)
+        valid = codes >= 0
+        values[valid] = resolved[codes[valid]]
+        return pd.Series(values, index=ids.index, name=ids.name)
 
     def resolve(self) -> dict:
         """
         Computes the final state of all registered mappings using transitive logic.
-        
-        This method follows the redirection path to its absolute end. 
-        Example: If A -> B and B -> C, the resolved map will contain A -> C.
-        
-        Logic:
-        - It iterates through every key and follows the 'current' target.
-        - A 'path' set is used to detect and break infinite recursion (circular links).
-        
+
+        Example: If A -> B and B -> C, the resolved map will contain A -> C and B -> C.
+
         Returns:
-            A dictionary where every key points directly to its final resolved identity.
+            A dictionary where every redirected id points directly to its final identity.
         """
         final_map = {}
-        for key in self._mapping:
-            path = {key}
-            current = self._mapping[key]
-            
-            # 1. We follow the chain
-            while current in self._mapping and current not in path:
-                path.add(current)
-                current = self._mapping[current]
-                
-            # 2. We register each key
-            final_map[key] = current
+        for node, identity in enumerate(self._ids):
+            canonical = self._canonical[self._find_root(node)]
+            if canonical != node:
+                final_map[identity] = self._ids[canonical]
 
         logger.info(f"✅ Identity resolution complete. {len(final_map)} identities stabilized.")
-        return final_map
\ No newline at end of file
+        return final_map
+
+    # --- INTERNAL PRIVATE METHODS ---
+
+    def _node(self, identity: str) -> int:
+        """Returns the node of an identity, creating a singleton set if needed."""
+        node = self._index.get(identity)
+        if node is None:
+            node = len(self._ids)
+            self._index[identity] = node
+            self._ids.append(identity)
+            self._parent.append(node)
+            self._rank.append(0)
+            self._canonical.append(node)
+        return node
+
+    def _find_root(self, node: int) -> int:
+        """Iterative find with full path compression (no recursion limit on long chains)."""
+        parent = self._parent
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
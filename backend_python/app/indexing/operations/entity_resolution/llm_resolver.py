@@ -1,9 +1,11 @@
 import pandas as pd
 import asyncio
+import itertools
+import numpy as np
 import networkx as nx
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-from typing import Dict, Any, Tuple, List
+from typing import Dict, Any, Tuple, List, Optional
 
 from app.core.data_model.entity import EntityModel
 from app.core.data_model.encyclopedia import EncyclopediaEntry
@@ -17,7 +19,18 @@ from app.core.prompts.graph_prompts import (
     CONSULTANT_RESOLUTION_SYSTEM_PROMPT,
     CONSULTANT_RESOLUTION_USER_PROMPT
 )
-from app.core.config.graph_config import MAX_CLUSTER_BATCH
+from app.core.config.graph_config import (
+    MAX_CLUSTER_BATCH,
+    RESOLUTION_MODE,
+    EMBEDDING_SIMILARITY_THRESHOLD,
+    ANN_NEIGHBORS,
+    MAX_RESOLUTION_CONCURRENCY
+)
+from app.indexing.operations.entity_resolution.identity_tracker import IdentityTracker
+from app.indexing.operations.entity_resolution.ann_index import ANNIndex
+from app.indexing.operations.entity_resolution.resolution_memo import ResolutionMemo
+from app.core.data_model.resolution import ResolutionVerdict
+from app.services.vector.embedding_service import EmbeddingService
 from app.indexing.operations.text.text_utils import similarity
 
 import logging
@@ -33,12 +46,41 @@ class LLMResolver:
        matches are found for a single entity.
     2. Pyramidal Clustering: Identifying semantic duplicates among 'orphan' entities 
        (those not found in the Encyclopedia) by analyzing names and context snippets.
+
+    Candidate pairs for the clustering come either from TF-IDF ('tfidf' mode) or from
+    BGE-M3 embeddings searched through a local ANN index ('embedding' mode). The latter
+    catches transliteration variants ("Husayn" / "Al-Hussein") that share no n-gram,
+    and its tighter threshold yields smaller clusters for the heavy LLM.
     """
 
-    def __init__(self, light_service: LLMService, heavy_service: LLMService):
-        """Initializes the resolver with both LLM services for semantic decision-making."""
+    def __init__(
+        self,
+        light_service: LLMService,
+        heavy_service: LLMService,
+        embedder: Optional[EmbeddingService] = None,
+        resolution_mode: str = RESOLUTION_MODE,
+        max_concurrency: int = MAX_RESOLUTION_CONCURRENCY,
+        memo: Optional[ResolutionMemo] = None
+    ):
+        """
+        Initializes the resolver with both LLM services for semantic decision-making.
+
+        Args:
+            embedder: Local embedding model, required by the 'embedding' mode.
+            resolution_mode: 'tfidf' or 'embedding'.
+            max_concurrency: Budget of concurrent LLM calls, shared by every category and cluster.
+            memo: Persistent store of past merge / no-merge verdicts (optional).
+        """
         self.light_service = light_service
         self.heavy_service = heavy_service
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.embedder = embedder
+        self.resolution_mode = resolution_mode
+        self.memo = memo
+
+        if resolution_mode == "embedding" and embedder is None:
+            logger.warning("⚠️ Embedding resolution mode requested without an embedder, falling back to TF-IDF.")
+            self.resolution_mode = "tfidf"
 
 
     async def llm_resolve(self, entities: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, str]]:
@@ -69,6 +111,8 @@ class LLMResolver:
                     all_llm_mappings[entity.id] = entity.canonical_id
 
         # 2. SEMANTIC CLUSTERING (Orphan Entities)
+        # Categories are independent: they run concurrently, the LLM calls being
+        # throttled by the shared semaphore.
         orphans = [e for e in entity_models if not e.canonical_id]
         
         if orphans:
@@ -76,49 +120,184 @@ class LLMResolver:
             for e in orphans:
                 orphans_by_cat.setdefault(e.category, []).append(e)
 
-            for category, group in orphans_by_cat.items():
-                logger.info(f"🔍 Analyzing category '{category}' with {len(group)} entities...")
-
-                # A. STEP 1: Algorithmic Clustering (Blocking)
-                # Creates clusters based on typos/fuzzy match, including singletons.
-                algo_clusters = self._create_algo_clusters(group)
-                
-                # B. STEP 2: LLM Consultant (Semantic Bridge)
-                # We pick the first entity of each cluster as a 'Representative'.
-                representatives = [cluster[0] for cluster in algo_clusters]
-                
-                # The consultant returns indices of 'representatives' that should merge.
-                # Example: [[0, 2]] means algo_clusters[0] and algo_clusters[2] are suspected duplicates.
-                bridge_indices_list = await self._get_semantic_bridges(representatives, str(category))
-                
-                # C. STEP 3: Super-Clustering
-                # We merge algo_clusters together based on LLM Consultant's advice.
-                final_clusters_to_resolve = self._merge_clusters_by_indices(algo_clusters, bridge_indices_list)
-                
-                logger.info(f"🚀 Processing {len(final_clusters_to_resolve)} refined clusters for {category}...")
-
-                # D. STEP 4: Pyramidal Resolver (Final Verdict)
-                for cluster in final_clusters_to_resolve:
-                    if len(cluster) >= 2:
-                        # The resolver now sees the full context of the merged groups.
-                        mapping = await self._pyramidal_resolve(cluster, str(category))
-                        all_llm_mappings.update(mapping)
+            category_mappings = await asyncio.gather(*[
+                self._resolve_category(category, group) for category, group in orphans_by_cat.items()
+            ])
+
+            # Deterministic merge: categories in first-appearance order (gather keeps the order)
+            for mapping in category_mappings:
+                all_llm_mappings.update(mapping)
 
         resolved_entities = pd.DataFrame([e.model_dump() for e in entity_models])
         return resolved_entities, all_llm_mappings
     
+    async def _resolve_category(self, category: Any, group: List[EntityModel]) -> Dict[str, str]:
+        """
+        Runs the clustering cascade for the orphans of one category.
+
+        The CPU-bound clustering runs in a worker thread, and the refined clusters are
+        resolved concurrently. Their mappings are merged in cluster order, so the result
+        does not depend on which LLM call finishes first.
+        """
+        logger.info(f"🔍 Analyzing category '{category}' with {len(group)} entities...")
+
+        # A. STEP 1: Algorithmic Clustering (Blocking)
+        # Creates clusters based on typos/fuzzy match, including singletons.
+        embeddings = await self._embed_entities(group) if self.resolution_mode == "embedding" else None
+        algo_clusters = await asyncio.to_thread(self._create_algo_clusters, group, embeddings)
+        
+        # B. STEP 2: LLM Consultant (Semantic Bridge)
+        # We pick the first entity of each cluster as a 'Representative'.
+        representatives = [cluster[0] for cluster in algo_clusters]
+        
+        # The consultant returns indices of 'representatives' that should merge.
+        # Example: [[0, 2]] means algo_clusters[0] and algo_clusters[2] are suspected duplicates.
+        bridge_indices_list = await self._get_semantic_bridges(representatives, str(category))
+        
+        # C. STEP 3: Super-Clustering
+        # We merge algo_clusters together based on LLM Consultant's advice.
+        final_clusters_to_resolve = self._merge_clusters_by_indices(algo_clusters, bridge_indices_list)
+        
+        logger.info(f"🚀 Processing {len(final_clusters_to_resolve)} refined clusters for {category}...")
+
+        # D. STEP 4: Pyramidal Resolver (Final Verdict)
+        # The resolver sees the full context of the merged groups.
+        cluster_mappings = await asyncio.gather(*[
+            self._pyramidal_resolve(cluster, str(category))
+            for cluster in final_clusters_to_resolve if len(cluster) >= 2
+        ])
+
+        category_mapping = {}
+        for mapping in cluster_mappings:
+            category_mapping.update(mapping)
+        return category_mapping
+
+    async def resolve_against_candidates(self, entity: EntityModel, candidates: List[EntityModel]) -> Optional[str]:
+        """
+        Decides whether a new entity is one of the given known identities.
+
+        Reuses the cluster prompt with the new entity at index 0: any MERGE linking
+        index 0 to a candidate (in either direction) is read as "same identity".
+        The known identity always survives, so already persisted ids stay stable.
+
+        Returns:
+            The id of the matching candidate, or None if the entity is new.
+        """
+        if not candidates:
+            return None
+
+        mapping = await self._resolve_cluster([entity] + list(candidates), str(entity.category))
+        candidate_ids = {c.id for c in candidates}
+
+        for src, tgt in mapping.items():
+            if src == entity.id and tgt in candidate_ids:
+                return tgt
+            if tgt == entity.id and src in candidate_ids:
+                return src
+        return None
+
     async def _resolve_cluster(self, cluster: List[EntityModel], entity_category: str) -> Dict[str, str]:
         """
-        Analyzes a semantic cluster via LLM to identify internal duplicates.
+        Analyzes a semantic cluster to identify internal duplicates.
+
+        Without memo, the whole cluster goes to the LLM. With a memo:
+        1. Pairs with a known MERGE verdict are pre-merged (no LLM).
+        2. Survivors whose pairs are all known DISTINCT are pruned.
+        3. The LLM only sees the remaining survivors; its answer is memorized as one
+           verdict per previously unknown pair.
+        The returned mapping is then transitive (every merged id -> its final id).
+        """
+        if len(cluster) < 2:
+            return {}
+
+        if self.memo is None:
+            return await self._ask_cluster(cluster, entity_category) or {}
+
+        keys = {e.id: self.memo.entity_key(e) for e in cluster}
+        known = await self.memo.lookup(
+            (keys[a.id], keys[b.id]) for a, b in itertools.combinations(cluster, 2)
+        )
+
+        def known_verdict(a: EntityModel, b: EntityModel) -> Optional[ResolutionVerdict]:
+            return known.get(self.memo.pair_key(keys[a.id], keys[b.id]))
+
+        # 1. Pre-merge known duplicates (without target preference, the later one joins the earlier)
+        tracker = IdentityTracker()
+        for a, b in itertools.combinations(cluster, 2):
+            verdict = known_verdict(a, b)
+            if verdict and verdict.verdict == "MERGE":
+                src, tgt = (a, b) if verdict.target_key == keys[b.id] else (b, a)
+                tracker.add_mapping(src.id, tgt.id)
+
+        pre_merged = tracker.resolve()
+        survivors = [e for e in cluster if e.id not in pre_merged]
+
+        # 2. Prune survivors that have no open question left
+        pending = [
+            a for a in survivors
+            if any(known_verdict(a, b) is None for b in survivors if b is not a)
+        ]
+
+        if pre_merged or len(pending) < len(survivors):
+            logger.info(
+                f"🧾 Memo ({entity_category}): {len(pre_merged)} pre-merged, "
+                f"{len(survivors) - len(pending)} pruned, {len(pending)}/{len(cluster)} sent to the LLM."
+            )
+
+        # 3. LLM verdict on the open questions
+        if len(pending) >= 2:
+            llm_mapping = await self._ask_cluster(pending, entity_category)
+            if llm_mapping is not None:
+                for old_id, new_id in llm_mapping.items():
+                    tracker.add_mapping(old_id, new_id)
+                await self.memo.record(
+                    self._cluster_verdicts(pending, llm_mapping, keys, known, entity_category)
+                )
+
+        return tracker.resolve()
+
+    def _cluster_verdicts(
+        self,
+        cluster: List[EntityModel],
+        mapping: Dict[str, str],
+        keys: Dict[str, str],
+        known: Dict[str, ResolutionVerdict],
+        entity_category: str
+    ) -> List[ResolutionVerdict]:
+        """
+        Turns an LLM cluster answer into pairwise verdicts (MERGE inside a group,
+        DISTINCT across groups), skipping the pairs that were already known.
+        """
+        groups = IdentityTracker()
+        for old_id, new_id in mapping.items():
+            groups.add_mapping(old_id, new_id)
+
+        verdicts = []
+        for a, b in itertools.combinations(cluster, 2):
+            key_a, key_b = keys[a.id], keys[b.id]
+            if key_a == key_b or self.memo.pair_key(key_a, key_b) in known:
+                continue
+
+            final_a, final_b = groups.find(a.id), groups.find(b.id)
+            target_key = {a.id: key_a, b.id: key_b}.get(final_a)
+            verdicts.append(self.memo.make_verdict(
+                key_a, a.slug, key_b, b.slug, entity_category,
+                merge=final_a == final_b,
+                target_key=target_key
+            ))
+        return verdicts
+
+    async def _ask_cluster(self, cluster: List[EntityModel], entity_category: str) -> Optional[Dict[str, str]]:
+        """
+        Sends a cluster to the heavy LLM.
         
         Uses a 'tuple-based' prompt where the LLM returns MERGE instructions.
         The method leverages EntityModel objects, ensuring consistent access to 
         titles and descriptions for the resolution process.
-        """
-        
-        if len(cluster) < 2:
-            return {}
 
+        Returns:
+            The {source_id: target_id} merges, or None if the call failed.
+        """
         # Use index-based mapping to prevent LLM hallucination of titles
         index_to_id = {str(i): entity.id for i, entity in enumerate(cluster)}
 
@@ -136,13 +315,14 @@ class LLMResolver:
 
         try:
             # Expects tuples like ["MERGE", "0", "1"] where numbers are the indices
-            tuples = await self.heavy_service.ask_tuples(
-                system_prompt=ENTITY_RESOLUTION_SYSTEM_PROMPT,
-                user_prompt=ENTITY_RESOLUTION_USER_PROMPT.format(
-                    entity_type=entity_category,
-                    candidates=candidates_text
+            async with self.semaphore:
+                tuples = await self.heavy_service.ask_tuples(
+                    system_prompt=ENTITY_RESOLUTION_SYSTEM_PROMPT,
+                    user_prompt=ENTITY_RESOLUTION_USER_PROMPT.format(
+                        entity_type=entity_category,
+                        candidates=candidates_text
+                    )
                 )
-            )
 
             # Map the merges based on LLM output 
             mapping = {}
@@ -163,9 +343,9 @@ class LLMResolver:
             return mapping
 
         except Exception as e:
-            # We log the error but return an empty dict to allow the pipeline to continue
+            # We log the error but return None (no verdict) to allow the pipeline to continue
             logger.error(f"❌ LLMResolver cluster error ({entity_category}): {e}")
-            return {}
+            return None
 
     async def _resolve_anchoring(self, entity: EntityModel) -> Dict[str, Any]:
         """
@@ -180,6 +360,12 @@ class LLMResolver:
         if not candidates:
             return {"choice": "NEW_ENTITY"}
 
+        # Known verdicts may settle the question without the LLM
+        if self.memo:
+            memo_result = await self._anchoring_from_memo(entity, candidates)
+            if memo_result is not None:
+                return memo_result
+
         # Format candidates for the LLM prompt using our helper
         candidates_text = self._format_anchoring_candidates(candidates)
         
@@ -191,14 +377,15 @@ class LLMResolver:
             # The LLM evaluates the context vs candidates to determine the best match
             slug_to_id = {c.get("slug"): c.get("id") for c in candidates}
 
-            result = await self.light_service.ask_json(
-                system_prompt=ANCHORING_RESOLUTION_SYSTEM_PROMPT,
-                user_prompt=ANCHORING_RESOLUTION_USER_PROMPT.format(
-                    entity_title=entity.title,
-                    entity_type=entity.type,
-                    entity_context=entity_context,
-                    candidates_text=candidates_text
-                ))
+            async with self.semaphore:
+                result = await self.light_service.ask_json(
+                    system_prompt=ANCHORING_RESOLUTION_SYSTEM_PROMPT,
+                    user_prompt=ANCHORING_RESOLUTION_USER_PROMPT.format(
+                        entity_title=entity.title,
+                        entity_type=entity.type,
+                        entity_context=entity_context,
+                        candidates_text=candidates_text
+                    ))
             
             choice = result.get("choice")
             
@@ -207,12 +394,14 @@ class LLMResolver:
                     entity.canonical_id = slug_to_id[choice] 
                     entity.review_status = "LLM_VALIDATED"
                     # TODO : entity.attributes["llm_confidence"] = result.get("confidence") ,in the future, we want to have a condiance score of the LLM decisions
+                    await self._record_anchoring(entity, candidates, choice)
 
                 else:
                     logger.warning(f"⚠️ Le LLM a renvoyé un slug inconnu : {choice}")
                     entity.review_status = "NOT_KNOWN"
             else:
                 entity.review_status = "NOT_KNOWN"
+                await self._record_anchoring(entity, candidates, None)
 
             return result
             
@@ -221,6 +410,51 @@ class LLMResolver:
             logger.error(f"❌ LLMResolver anchoring error ({entity.title}): {e}")
             return {"choice": "NEW_ENTITY"}
 
+    async def _anchoring_from_memo(self, entity: EntityModel, candidates: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Answers an anchoring question from past verdicts, if they are conclusive:
+        exactly one known MERGE, or a known DISTINCT for every candidate.
+        Returns None when the LLM is still needed.
+        """
+        entity_key = self.memo.entity_key(entity)
+        candidate_keys = [self.memo.candidate_key(c) for c in candidates]
+        known = await self.memo.lookup((entity_key, k) for k in candidate_keys)
+
+        verdicts = [known.get(self.memo.pair_key(entity_key, k)) for k in candidate_keys]
+        merges = [c for c, v in zip(candidates, verdicts) if v and v.verdict == "MERGE"]
+
+        if len(merges) == 1:
+            entity.canonical_id = merges[0].get("id")
+            entity.review_status = "LLM_VALIDATED"
+            logger.debug(f"🧾 Memo anchoring: '{entity.title}' -> {entity.canonical_id}")
+            return {"choice": merges[0].get("slug")}
+
+        if not merges and all(v is not None for v in verdicts):
+            entity.review_status = "NOT_KNOWN"
+            return {"choice": "NEW_ENTITY"}
+
+        return None
+
+    async def _record_anchoring(self, entity: EntityModel, candidates: List[Dict[str, Any]], chosen_slug: Optional[str]):
+        """Memorizes an anchoring answer: MERGE with the chosen candidate, DISTINCT with the others."""
+        if not self.memo:
+            return
+
+        entity_key = self.memo.entity_key(entity)
+        verdicts = []
+        for c in candidates:
+            candidate_key = self.memo.candidate_key(c)
+            if candidate_key == entity_key:
+                continue
+            is_chosen = chosen_slug is not None and c.get("slug") == chosen_slug
+            verdicts.append(self.memo.make_verdict(
+                entity_key, entity.slug, candidate_key, c.get("slug"), entity.category,
+                merge=is_chosen,
+                target_key=candidate_key,   # The Encyclopedia record always survives
+                source="ANCHORING"
+            ))
+        await self.memo.record(verdicts)
+
     async def _pyramidal_resolve(self, cluster: List[EntityModel], entity_category: str) -> Dict[str, str]:
         """
         Processes large clusters by batches and recursively re-evaluates 
@@ -228,13 +462,15 @@ class LLMResolver:
         """
         # We work with a list of EntityModels instead of a DataFrame
         current_pool = list(cluster)
-        global_mappings = {}
+        # Union-find registry: keeps transitivity across rounds without re-walking chains
+        tracker = IdentityTracker()
 
         while len(current_pool) > 1:
             # Case 1: Cluster fits in a single batch, process and exit
             if len(current_pool) <= MAX_CLUSTER_BATCH:
                 final_mapping = await self._resolve_cluster(current_pool, entity_category)
-                self._update_transitive_mappings(global_mappings, final_mapping)
+                for old_id, new_id in final_mapping.items():
+                    tracker.add_mapping(old_id, new_id)
                 break
 
             # Case 2: Cluster is too large, split into batches and process in parallel
@@ -259,63 +495,44 @@ class LLMResolver:
                 break 
 
             # Update global registry with new findings (maintaining transitivity)
-            self._update_transitive_mappings(global_mappings, round_mappings)
+            for old_id, new_id in round_mappings.items():
+                tracker.add_mapping(old_id, new_id)
 
             # Prepare for next round: keep only 'surviving' entities
             # (Entities that were NOT the source of a merge, i.e., keys in round_mappings)
             merged_away = set(round_mappings.keys())
             current_pool = [e for e in current_pool if e.id not in merged_away]
 
-        return global_mappings
+        return tracker.resolve()
 
-    def _update_transitive_mappings(self, master: Dict[str, str], new: Dict[str, str]):
-        """
-        Updates the master mapping dictionary ensuring transitive integrity.
-        Logic: If A -> B already exists and we find B -> C, update A to point to C.
-        """
-
-        # 1. Merge newly discovered mappings
-        master.update(new)
-
-        # 2. Resolve transitive chains with path compression
-        for source in master:
-            target = master[source]
-
-            # If the target also redirects somewhere else, follow the chain until the final canonical node
-            if target in master:
-                visited = {source}  # Prevent circular references
-
-                while target in master and target not in visited:
-                    visited.add(target)
-                    target = master[target]
-
-                # Compress the path: directly point source -> final canonical target
-                master[source] = target
-        
-    def _create_algo_clusters(self, entities: List[EntityModel]) -> List[List[EntityModel]]:
+    def _create_algo_clusters(
+        self,
+        entities: List[EntityModel],
+        embeddings: Optional[np.ndarray] = None
+    ) -> List[List[EntityModel]]:
         """
         Groups entities into 'potential duplicate clusters' using a graph-based approach.
         
         Algorithm:
         1. Nodes = Entities.
-        2. Edges = Created if two entities share semantic similarity (TF-IDF),
-           structural similarity (Levenshtein), or name containment.
+        2. Edges = Created if two entities share semantic similarity (TF-IDF, or ANN
+           neighbors over embeddings when provided), structural similarity
+           (Levenshtein), or name containment.
         3. Clusters = Connected components of the resulting graph.
         """
         if len(entities) <= 1:
             return [entities]
 
-        # 1. Prepare data for vectorized comparison
-
-        texts = [f"{e.title} {str(e.description).replace('|', ' ')}" for e in entities]
-
-        vectorizer = TfidfVectorizer(stop_words='english') 
-        tfidf_matrix = vectorizer.fit_transform(texts)
-        cosine_sim = cosine_similarity(tfidf_matrix)
+        # 1. Semantic candidate pairs
+        if embeddings is not None:
+            semantic_pairs = self._embedding_pairs(embeddings)
+        else:
+            semantic_pairs = self._tfidf_pairs(entities)
 
         # 2. Build the graph based on semantic and structural criteria
         G = nx.Graph()
         G.add_nodes_from(range(len(entities)))
+        G.add_edges_from(semantic_pairs)
 
         for i in range(len(entities)):
             slug_i = entities[i].slug
@@ -323,12 +540,10 @@ class LLMResolver:
                 slug_j = entities[j].slug
 
                 # Similarity criterias
-
-                is_semantic = cosine_sim[i, j] >= 0.3         
                 is_contained = (slug_i in slug_j or slug_j in slug_i) if (len(slug_i) > 4 and len(slug_j) > 4) else False     
                 is_fuzzy = similarity(slug_i, slug_j) >= 0.75
 
-                if is_semantic or is_contained or is_fuzzy:
+                if is_contained or is_fuzzy:
                     G.add_edge(i, j)
 
         # 3. Extract connected components
@@ -346,6 +561,38 @@ class LLMResolver:
     for component in clusters
 ]
 
+    def _tfidf_pairs(self, entities: List[EntityModel]) -> List[Tuple[int, int]]:
+        """Pairs whose TF-IDF cosine similarity (title + description) reaches 0.3."""
+        texts = [f"{e.title} {str(e.description).replace('|', ' ')}" for e in entities]
+
+        vectorizer = TfidfVectorizer(stop_words='english') 
+        tfidf_matrix = vectorizer.fit_transform(texts)
+        cosine_sim = cosine_similarity(tfidf_matrix)
+
+        return [(int(i), int(j)) for i, j in np.argwhere(np.triu(cosine_sim >= 0.3, k=1))]
+
+    def _embedding_pairs(self, embeddings: np.ndarray) -> List[Tuple[int, int]]:
+        """Pairs of ANN neighbors whose cosine similarity reaches the embedding threshold."""
+        index = ANNIndex(embeddings)
+        return [
+            (i, j) for i, j, _ in index.query_pairs(k=ANN_NEIGHBORS, min_similarity=EMBEDDING_SIMILARITY_THRESHOLD)
+        ]
+
+    async def _embed_entities(self, entities: List[EntityModel]) -> Optional[np.ndarray]:
+        """
+        Embeds 'title + description' of each entity (batched, CPU, off the event loop).
+        Returns None on failure so that the caller falls back to TF-IDF.
+        """
+        if len(entities) <= 1:
+            return None
+
+        texts = [f"{e.title}: {str(e.description).replace('|', ' ')}" for e in entities]
+        try:
+            return await self.embedder.embed(texts)
+        except Exception as e:
+            logger.error(f"❌ Embedding error, falling back to TF-IDF: {e}")
+            return None
+
     async def _get_semantic_bridges(self, representatives: List[EntityModel], category: str) -> List[List[int]]:
         """
         Consults the LLM to find semantic overlaps between cluster representatives.
@@ -358,13 +605,14 @@ class LLMResolver:
 
         try:
             # Using the standardized CONSULTANT prompts
-            bridges = await self.light_service.ask_json(
-                system_prompt=CONSULTANT_RESOLUTION_SYSTEM_PROMPT,
-                user_prompt=CONSULTANT_RESOLUTION_USER_PROMPT.format(
-                    category=category,
-                    titles_text=titles_text
+            async with self.semaphore:
+                bridges = await self.light_service.ask_json(
+                    system_prompt=CONSULTANT_RESOLUTION_SYSTEM_PROMPT,
+                    user_prompt=CONSULTANT_RESOLUTION_USER_PROMPT.format(
+                        category=category,
+                        titles_text=titles_text
+                    )
                 )
-            )
             return bridges if isinstance(bridges, list) else []
         except Exception as e:
             logger.error(f"❌ LLMConsultant bridge error: {e}")
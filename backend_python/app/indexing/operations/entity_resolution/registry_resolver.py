@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+from phonetics import dmetaphone
+from Levenshtein import ratio
+
+from app.core.config.graph_config import (
+    LEVENSHTEIN_SCORE_MERGE_TRIGGER, REGISTRY_MAX_CANDIDATES, REGISTRY_MIN_SIMILARITY
+)
+from app.core.data_model.entity import EntityModel
+from app.core.data_model.registry import RegistryEntry
+from app.indexing.operations.entity_resolution.llm_resolver import LLMResolver
+from app.services.database.entity_registry_repository import EntityRegistryRepository
+from app.services.vector.embedding_service import EmbeddingService
+
+logger = logging.getLogger(__name__)
+
+class RegistryResolver:
+    """
+    Incremental, cross-document resolution against the persistent entity registry.
+
+    The in-document stages (Core, LLM) only see the current DataFrame. This resolver
+    then links the surviving entities to identities known from previous documents:
+    1. Blocking: one indexed registry query returns candidates sharing the category
+       and the slug, an alias or the phonetic key.
+    2. Deterministic pass: same slug/alias, or same sound + Levenshtein ratio, with a
+       single candidate (the CoreResolver rules).
+    3. Semantic pass: remaining ambiguous entities go to the LLMResolver, one small
+       cluster (entity + its candidates) each. With an embedder, the candidates are first
+       ranked by description similarity (the vectors stored at registration) and those
+       below min_similarity are dropped; an entity left without candidates is new.
+
+    Entities without candidates are new and skip both passes, so the cost of this stage
+    follows the novelty of the document rather than the size of the corpus.
+    """
+
+    def __init__(
+        self,
+        repo: EntityRegistryRepository,
+        llm_resolver: LLMResolver,
+        similarity_threshold: float = LEVENSHTEIN_SCORE_MERGE_TRIGGER,
+        max_candidates: int = REGISTRY_MAX_CANDIDATES,
+        embedder: Optional[EmbeddingService] = None,
+        min_similarity: float = REGISTRY_MIN_SIMILARITY
+    ):
+        """
+        Initializes the resolver.
+
+        Args:
+            repo: The registry repository (SQL-backed).
+            llm_resolver: Used for the semantic verdict on ambiguous candidates.
+            similarity_threshold: Levenshtein ratio (0.0 to 1.0) required for a deterministic link.
+            max_candidates: Upper bound of registry candidates fetched per entity.
+            embedder: Embeds the descriptions at registration and for the candidate ranking (optional).
+            min_similarity: Description cosine similarity required to keep a candidate for the LLM.
+        """
+        self.repo = repo
+        self.llm = llm_resolver
+        self.similarity_threshold = similarity_threshold
+        self.max_candidates = max_candidates
+        self.embedder = embedder
+        self.min_similarity = min_similarity
+
+    async def resolve(self, entities: pd.DataFrame) -> Dict[str, str]:
+        """
+        Links the current entities to already registered identities.
+
+        Args:
+            entities: The DataFrame produced by the in-document resolution stages.
+
+        Returns:
+            A mapping {current_id: registry_id} for every entity recognized as known.
+        """
+        if entities.empty:
+            return {}
+
+        # Anchored entities already carry a corpus-wide id (the Encyclopedia UUID)
+        if "canonical_id" in entities.columns:
+            entities = entities[entities["canonical_id"].isna() | (entities["canonical_id"] == "")]
+
+        models = [EntityModel(**r) for r in entities.to_dict("records")]
+        if not models:
+            return {}
+
+        keys = [(e.slug, self.phonetic_key(e.title), e.category) for e in models]
+        all_candidates = await self.repo.find_candidates(keys, max_candidates=self.max_candidates)
+
+        mapping: Dict[str, str] = {}
+        ambiguous: List[Tuple[EntityModel, List[RegistryEntry]]] = []
+
+        for entity, (slug, phonetic, _), candidates in zip(models, keys, all_candidates):
+            # Same deterministic id: the entity is already registered as-is
+            if not candidates or any(c.id == entity.id for c in candidates):
+                continue
+
+            target = self._deterministic_match(slug, phonetic, candidates)
+            if target:
+                mapping[entity.id] = target
+                logger.debug(f"🗂️ [REGISTRY CORE] '{entity.title}' -> {target}")
+            else:
+                ambiguous.append((entity, candidates))
+
+        # Semantic verdict on the leftovers (small independent clusters)
+        if ambiguous and self.embedder is not None:
+            ambiguous = await self._rank_by_description(ambiguous)
+
+        if ambiguous:
+            logger.info(f"🧠 Registry: {len(ambiguous)} ambiguous entities sent to the LLM.")
+            verdicts = await asyncio.gather(*[
+                self.llm.resolve_against_candidates(entity, [self._to_entity(c) for c in candidates])
+                for entity, candidates in ambiguous
+            ])
+            for (entity, _), target in zip(ambiguous, verdicts):
+                if target:
+                    mapping[entity.id] = target
+                    logger.debug(f"🗂️ [REGISTRY LLM] '{entity.title}' -> {target}")
+
+        logger.info(f"🗂️ Registry: {len(mapping)}/{len(models)} entities linked to known identities.")
+        return mapping
+
+    async def register(self, entities: pd.DataFrame, aliases: Dict[str, List[str]]):
+        """
+        Persists the final entities of the document as registry identities.
+
+        Args:
+            entities: Final, aggregated entities (one row per identity).
+            aliases: {final_id: [slugs of every variant merged into it]}.
+        """
+        if entities.empty:
+            return
+
+        entries = [
+            RegistryEntry(
+                id=r["id"],
+                slug=r.get("slug") or "",
+                title=r["title"],
+                type=r.get("type") or "UNKNOWN",
+                category=r.get("category"),
+                phonetic_key=self.phonetic_key(r["title"]),
+                aliases=sorted(set(aliases.get(r["id"], []))),
+                description=str(r.get("description") or ""),
+                frequency=int(r.get("frequency") or 1)
+            )
+            for r in entities.to_dict("records")
+        ]
+
+        # Reference vectors for the candidate ranking of the next documents (one embedding batch)
+        vectors = await self._embed([self._description_text(e) for e in entries])
+        if vectors is not None:
+            for entry, vector in zip(entries, vectors):
+                entry.description_embedding = vector.tolist()
+
+        await self.repo.upsert_entries(entries)
+
+    async def _rank_by_description(
+        self,
+        ambiguous: List[Tuple[EntityModel, List[RegistryEntry]]]
+    ) -> List[Tuple[EntityModel, List[RegistryEntry]]]:
+        """
+        Orders each entity's candidates by description similarity and drops those below
+        min_similarity. Candidates registered without a vector are kept, after the others.
+        """
+        vectors = await self._embed([self._description_text(entity) for entity, _ in ambiguous])
+        if vectors is None:
+            return ambiguous
+
+        ranked = []
+        for (entity, candidates), vector in zip(ambiguous, vectors):
+            scored = []
+            for c in candidates:
+                score = float(np.dot(vector, c.description_embedding)) if c.description_embedding else None
+                if score is None or score >= self.min_similarity:
+                    scored.append((-1.0 if score is None else score, c))
+            scored.sort(key=lambda item: item[0], reverse=True)
+
+            if scored:
+                ranked.append((entity, [c for _, c in scored]))
+            else:
+                logger.debug(f"🗂️ [REGISTRY EMBEDDING] '{entity.title}': no candidate above {self.min_similarity}, kept as new.")
+        return ranked
+
+    async def _embed(self, texts: List[str]) -> Optional[np.ndarray]:
+        """Normalized vectors of the texts, None without embedder or when the model fails."""
+        if self.embedder is None or not texts:
+            return None
+        try:
+            return await self.embedder.embed(texts)
+        except Exception as e:
+            logger.warning(f"⚠️ Registry description embedding failed, continuing without vectors: {e}")
+            return None
+
+    def _deterministic_match(self, slug: str, phonetic: str, candidates: List[RegistryEntry]) -> str | None:
+        """
+        Applies the CoreResolver rules against registry candidates.
+        Returns a registry id only when exactly one candidate qualifies.
+        """
+        exact = [c for c in candidates if c.slug == slug or slug in c.aliases]
+        if len(exact) == 1:
+            return exact[0].id
+        if exact:
+            return None
+
+        lexical = [
+            c for c in candidates
+            if phonetic and c.phonetic_key == phonetic and ratio(slug, c.slug) >= self.similarity_threshold
+        ]
+        return lexical[0].id if len(lexical) == 1 else None
+
+    @staticmethod
+    def _description_text(item) -> str:
+        """Text embedded for an entity or a registry entry: the title and its description."""
+        description = str(item.description or "").strip()
+        return f"{item.title}: {description}" if description else str(item.title)
+
+    @staticmethod
+    def _to_entity(entry: RegistryEntry) -> EntityModel:
+        """Presents a registry entry as an EntityModel for the LLM prompts."""
+        return EntityModel(
+            id=entry.id,
+            title=entry.title,
+            slug=entry.slug,
+            type=entry.type,
+            category=entry.category,
+            description=entry.description,
+            frequency=entry.frequency
+        )
+
+    @staticmethod
+    def phonetic_key(title: str) -> str:
+        """Primary Double Metaphone code, as used by the CoreResolver."""
+        return dmetaphone(str(title))[0] if title else ""
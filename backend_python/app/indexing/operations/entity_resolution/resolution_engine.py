@@ -1,9 +1,13 @@
 from app.indexing.operations.entity_resolution.identity_tracker import IdentityTracker
 from app.indexing.operations.entity_resolution.llm_resolver import LLMResolver
 from app.indexing.operations.entity_resolution.core_resolver import CoreResolver
+from app.indexing.operations.entity_resolution.registry_resolver import RegistryResolver
 from app.core.data_model.entity import EntityModel
+from app.indexing.operations.graph.aggregation_utils import (
+    columnar_aggregate, JOIN_UNIQUE, UNION_LISTS, MERGE_DICTS
+)
 
-from typing import Tuple, List, Dict
+from typing import Tuple, List, Dict, Optional
 import pandas as pd
 import logging
 
@@ -16,19 +20,28 @@ class EntityResolutionEngine:
     This engine executes a multi-stage process to ensure graph integrity:
     1. Deterministic Resolution (Core): Fast, phonetic-based clustering and exact matching.
     2. Semantic Resolution (LLM): Context-aware anchoring and complex duplicate merging.
-    3. Identity Consolidation: Resolving transitive chains of renames.
-    4. Physical Merging: Aggregating descriptions and metadata into a single record per identity.
+    3. Registry Resolution (optional): Linking survivors to identities known from previous documents.
+    4. Identity Consolidation: Resolving transitive chains of renames.
+    5. Physical Merging: Aggregating descriptions and metadata into a single record per identity.
     """
-    def __init__(self, core_resolver: CoreResolver, llm_resolver: LLMResolver):
+    def __init__(
+        self, 
+        core_resolver: CoreResolver, 
+        llm_resolver: LLMResolver,
+        registry_resolver: Optional[RegistryResolver] = None
+    ):
         """
-        Initializes the engine with its two specialized resolution layers.
+        Initializes the engine with its specialized resolution layers.
         
         Args:
             core_resolver: Handles algorithmic and encyclopedia-based matching.
             llm_resolver: Handles semantic clusters and anchoring ambiguities via AI.
+            registry_resolver: Optional cross-document layer. When None, resolution 
+                stays scoped to the current document.
         """
         self.core = core_resolver
         self.llm = llm_resolver
+        self.registry = registry_resolver
 
     async def run(self, entities: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, str]]:
         """
@@ -55,6 +68,9 @@ class EntityResolutionEngine:
         initial_count = len(entities)
         logger.info(f"🚀 Entity Resolution Start: {initial_count} raw entities.")
         tracker = IdentityTracker()
+
+        # Original slugs, kept to register every variant as an alias of its final identity
+        initial_slugs = dict(zip(entities['id'], entities['slug'])) if 'slug' in entities.columns else {}
     
         # --- 1. CORE RESOLUTION (Phonetic & Exact) ---
         try:
@@ -69,6 +85,7 @@ class EntityResolutionEngine:
             logger.error(f"❌ Core Resolution Error: {e}")
         
         # --- 2. SEMANTIC RESOLUTION (LLM) ---
+        llm_mappings = {}
         try:
             id_to_title = dict(zip(entities['id'], entities['title']))
             entities, llm_mappings = await self.llm.llm_resolve(entities)
@@ -80,6 +97,19 @@ class EntityResolutionEngine:
         except Exception as e:
             logger.error(f"❌ LLM Resolution Error: {e}")
 
+        # --- 2b. REGISTRY RESOLUTION (Cross-document) ---
+        # Only the survivors of the in-document merges are looked up
+        if self.registry:
+            try:
+                survivors = entities[~entities['id'].isin(llm_mappings.keys())]
+                registry_mappings = await self.registry.resolve(survivors)
+                for old_id, new_id in registry_mappings.items():
+                    tracker.add_mapping(old_id, new_id)
+
+                logger.info(f"🔹 Registry: {len(registry_mappings)} entities linked to known identities.")
+            except Exception as e:
+                logger.error(f"❌ Registry Resolution Error: {e}")
+
         # --- 3. ENCYCLOPEDIA ANCHORING ---
         anchoring_count = 0
         for row in entities.itertuples():
@@ -94,14 +124,25 @@ class EntityResolutionEngine:
         final_map = tracker.resolve()
 
         # --- 5. PHYSICAL UPDATE ---
-        # We apply the explicit mapping to the 'id' column
+        # We apply the explicit mapping to the 'id' column (vectorized, one lookup per distinct id)
         if final_map:
-            entities['id'] = entities['id'].map(final_map).fillna(entities['id'])
+            entities['id'] = tracker.remap(entities['id'])
 
         # --- 6. PHYSICAL AGGREGATION ---
         # Consolidate objects sharing the same ID
         final_entities = self._aggregate_entities(entities)
 
+        # --- 7. REGISTRATION ---
+        # The resolved identities become candidates for the next documents
+        if self.registry:
+            aliases: Dict[str, List[str]] = {}
+            for final_id, slug in zip(tracker.find_many(initial_slugs.keys()), initial_slugs.values()):
+                aliases.setdefault(final_id, []).append(slug)
+            try:
+                await self.registry.register(final_entities, aliases)
+            except Exception as e:
+                logger.error(f"❌ Registry Registration Error: {e}")
+
         diff = initial_count - len(final_entities)
         logger.info(f"🔗 Final Map: {len(final_map)} total redirections.")
         logger.info(f"✅ Resolution Complete: {initial_count} -> {len(final_entities)} (Merged {diff} duplicates).")
@@ -112,49 +153,26 @@ class EntityResolutionEngine:
         """
         Physically merges duplicate EntityModel objects into unified records.
         
-        This method performs a GroupBy operation using Pandas to handle the 
-        complex logic of merging source lists and descriptions efficiently.
+        The GroupBy is columnar (see columnar_aggregate): descriptions, source_ids and
+        community_ids are deduplicated over the whole frame at once instead of through
+        one Python lambda call per group.
         """
         if entities_df.empty:
             return []
 
-        def merge_descriptions(series):
-            # Cleanly merge description strings, avoiding empty values and duplicates
-            return " | ".join(set(filter(None, series.astype(str))))
-
-        def merge_sources(series):
-            # Flatten lists of source_ids and keep unique values
-            combined = []
-            for s_list in series:
-                if isinstance(s_list, list): combined.extend(s_list)
-            return list(set(combined))
-
-        def merge_attributes(series):
-            # Merge dictionary attributes (last one wins for overlapping keys)
-            final_attr = {}
-            for attr_dict in series:
-                if isinstance(attr_dict, dict):
-                    final_attr.update(attr_dict)
-            return final_attr
-
-        def merge_communities(series):
-            # Union of community ID lists
-            combined = set()
-            for c_list in series:
-                if isinstance(c_list, list): combined.update(c_list)
-            return list(combined)
-
         agg_rules = {
             "title": "first",
-            "description": merge_descriptions,
-            "source_ids": merge_sources, 
+            "slug": "first",
+            "type": "first",
+            "description": JOIN_UNIQUE,     # Distinct, non-empty descriptions
+            "source_ids": UNION_LISTS,      # Flattened, unique source_ids
             "frequency": "sum",
             "rank": "max",
             "category": "first",
             "canonical_id": "first",
             "review_status": "first",
-            "attributes": merge_attributes,
-            "community_ids": merge_communities
+            "attributes": MERGE_DICTS,      # Last one wins for overlapping keys
+            "community_ids": UNION_LISTS
         }
         
-        return entities_df.groupby(["id"], sort=False).agg(agg_rules).reset_index()
\ No newline at end of file
+        return columnar_aggregate(entities_df, ["id"], agg_rules)
@@ -0,0 +1,103 @@
+import hashlib
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.data_model.entity import EntityModel
+from app.core.data_model.resolution import ResolutionVerdict
+from app.services.database.resolution_verdict_repository import ResolutionVerdictRepository
+
+logger = logging.getLogger(__name__)
+
+class ResolutionMemo:
+    """
+    Memo of the pairwise decisions taken by the LLMResolver.
+
+    LLM prompts change as soon as a cluster gains a member or is reordered, so the
+    response cache rarely hits across ingestions. The pairwise questions underneath
+    ("is ABU_BAKR the same as ABU_BAKR_AL_SIDDIQ?") do recur, though. They are keyed here
+    by the canonicalized (slug, category) pair plus a hash of each description, so that
+    known answers can pre-merge or prune clusters before any LLM call.
+
+    The memo is best-effort: storage errors are logged and treated as cache misses.
+    """
+
+    def __init__(self, repo: ResolutionVerdictRepository):
+        self.repo = repo
+
+    # --- KEYS ---
+
+    @staticmethod
+    def fingerprint(slug: Optional[str], category: Optional[str], description: Optional[str]) -> str:
+        """
+        Stable identity of one side of a question.
+
+        The description is normalized (fragments split on '|', stripped, deduplicated
+        and sorted) so that the aggregation order does not change the key.
+        """
+        fragments = sorted({f.strip() for f in str(description or "").split("|") if f.strip()})
+        desc_hash = hashlib.sha256(" | ".join(fragments).encode("utf-8")).hexdigest()[:16]
+        raw = f"{slug or ''}|{category or ''}|{desc_hash}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def entity_key(self, entity: EntityModel) -> str:
+        return self.fingerprint(entity.slug, entity.category, entity.description)
+
+    def candidate_key(self, candidate: Dict) -> str:
+        """Fingerprint of an Encyclopedia candidate (model_dump() dict)."""
+        return self.fingerprint(candidate.get("slug"), candidate.get("category"), candidate.get("core_summary"))
+
+    @staticmethod
+    def pair_key(key_a: str, key_b: str) -> str:
+        """Order-independent key of a pair of fingerprints."""
+        left, right = sorted((key_a, key_b))
+        return hashlib.sha256(f"{left}::{right}".encode("utf-8")).hexdigest()
+
+    # --- STORAGE ---
+
+    async def lookup(self, pairs: Iterable[Tuple[str, str]]) -> Dict[str, ResolutionVerdict]:
+        """
+        Known verdicts for the given (key_a, key_b) pairs, indexed by pair_key.
+        """
+        pair_keys = [self.pair_key(a, b) for a, b in pairs if a != b]
+        if not pair_keys:
+            return {}
+        try:
+            known = await self.repo.get_verdicts(pair_keys)
+            if known:
+                logger.debug(f"🧾 Memo: {len(known)}/{len(pair_keys)} pairs already decided.")
+            return known
+        except Exception as e:
+            logger.error(f"❌ Resolution memo lookup failed: {e}")
+            return {}
+
+    async def record(self, verdicts: List[ResolutionVerdict]):
+        """Persists new verdicts (errors are logged, never raised)."""
+        if not verdicts:
+            return
+        try:
+            await self.repo.save_verdicts(verdicts)
+        except Exception as e:
+            logger.error(f"❌ Failed to memorize {len(verdicts)} resolution verdicts: {e}")
+
+    def make_verdict(
+        self,
+        key_a: str, slug_a: str,
+        key_b: str, slug_b: str,
+        category: Optional[str],
+        merge: bool,
+        target_key: Optional[str] = None,
+        source: str = "CLUSTER"
+    ) -> ResolutionVerdict:
+        """Builds a verdict with its sides in canonical (sorted) order."""
+        (left_key, left_slug), (right_key, right_slug) = sorted([(key_a, slug_a or ""), (key_b, slug_b or "")])
+        return ResolutionVerdict(
+            pair_key=self.pair_key(key_a, key_b),
+            left_key=left_key,
+            right_key=right_key,
+            left_slug=left_slug,
+            right_slug=right_slug,
+            category=category,
+            verdict="MERGE" if merge else "DISTINCT",
+            target_key=target_key if merge else None,
+            source=source
+        )
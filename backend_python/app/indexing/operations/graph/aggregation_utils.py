@@ -0,0 +1,145 @@
+import logging
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Custom reducers understood by columnar_aggregate (anything else is passed to pandas)
+JOIN_UNIQUE = "join_unique"    # Distinct non-empty strings, joined with " | "
+UNION_LISTS = "union_lists"    # Distinct items of list cells, flattened
+MERGE_DICTS = "merge_dicts"    # dict.update in row order (last one wins)
+
+DESCRIPTION_SEPARATOR = " | "
+
+
+def columnar_aggregate(
+    df: pd.DataFrame,
+    by: Sequence[str],
+    rules: Dict[str, str],
+    sep: str = DESCRIPTION_SEPARATOR
+) -> pd.DataFrame:
+    """
+    Groups a frame and reduces each column without per-group Python lambdas.
+
+    Native reducers ('first', 'sum', 'max', ...) go through a single pandas agg.
+    The custom ones work on the whole column at once:
+    - JOIN_UNIQUE / UNION_LISTS: values (exploded for lists) are factorized to integer
+      codes, sorted by (group, code) and deduplicated by comparing neighbours, so no
+      Python set is built per group. Items keep their first-appearance order and each
+      group then costs a single string join / list build.
+    - MERGE_DICTS: only rows carrying a non-empty dict are visited.
+
+    Groups come out in first-appearance order (sort=False), like the legacy groupby.
+
+    Args:
+        df: Frame to aggregate.
+        by: Grouping columns.
+        rules: {column: reducer}. Columns absent from `df` are skipped.
+        sep: Separator used by JOIN_UNIQUE.
+
+    Returns:
+        One row per group, with the grouping columns as regular columns.
+    """
+    by = list(by)
+    rules = {c: r for c, r in rules.items() if c in df.columns and c not in by}
+
+    grouped = df.groupby(by, sort=False)
+    codes = grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+    n_groups = grouped.ngroups
+
+    native = {c: r for c, r in rules.items() if r not in (JOIN_UNIQUE, UNION_LISTS, MERGE_DICTS)}
+    if native:
+        out = grouped.agg(native).reset_index()
+    else:
+        out = grouped.size().reset_index()[by]
+
+    for col, rule in rules.items():
+        if rule == JOIN_UNIQUE:
+            out[col] = _join_unique(df[col], codes, n_groups, sep)
+        elif rule == UNION_LISTS:
+            out[col] = _union_lists(df[col], codes, n_groups)
+        elif rule == MERGE_DICTS:
+            out[col] = _merge_dicts(df[col], codes, n_groups)
+
+    return out[by + list(rules.keys())]
+
+
+def _dedup_sorted(group_codes: np.ndarray, value_codes: np.ndarray, positions: np.ndarray):
+    """
+    Keeps the first occurrence of every (group, value) pair.
+
+    Sorting by (group, value, position) puts duplicates next to each other; a
+    neighbour comparison marks the first of each run. The survivors are then put
+    back in (group, position) order to preserve first appearance.
+    """
+    order = np.lexsort((positions, value_codes, group_codes))
+    g, v, p = group_codes[order], value_codes[order], positions[order]
+
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = (g[1:] != g[:-1]) | (v[1:] != v[:-1])
+    g, v, p = g[keep], v[keep], p[keep]
+
+    back = np.lexsort((p, g))
+    return g[back], v[back]
+
+
+def _join_unique(values: pd.Series, codes: np.ndarray, n_groups: int, sep: str) -> List[str]:
+    """Distinct non-empty strings of each group, joined once per group."""
+    raw = values.to_numpy(dtype=object)
+    mask = (codes >= 0) & pd.notna(raw)
+    strings = pd.Series(raw[mask], dtype=object).astype(str).to_numpy(dtype=object)
+    non_empty = strings != ""
+
+    positions = np.flatnonzero(mask)[non_empty]
+    strings = strings[non_empty]
+    result = [""] * n_groups
+    if len(strings) == 0:
+        return result
+
+    value_codes, uniques = pd.factorize(strings)
+    g, v = _dedup_sorted(codes[positions], value_codes, positions)
+
+    joined = pd.Series(np.asarray(uniques, dtype=object)[v]).groupby(g, sort=True).agg(sep.join)
+    for group, text in zip(joined.index, joined.to_numpy()):
+        result[group] = text
+    return result
+
+
+def _union_lists(values: pd.Series, codes: np.ndarray, n_groups: int) -> List[list]:
+    """Distinct items of the list cells of each group, in first-appearance order."""
+    cells = pd.Series(values.to_numpy(dtype=object), index=np.arange(len(values)))
+    cells = cells.where(cells.map(lambda x: isinstance(x, list)), None)
+    exploded = cells.explode().dropna()
+
+    result = [[] for _ in range(n_groups)]
+    if exploded.empty:
+        return result
+
+    positions = exploded.index.to_numpy(dtype=np.int64)
+    valid = codes[positions] >= 0
+    positions = positions[valid]
+    items = exploded.to_numpy(dtype=object)[valid]
+    if len(items) == 0:
+        return result
+
+    value_codes, uniques = pd.factorize(items)
+    g, v = _dedup_sorted(codes[positions], value_codes, positions)
+
+    uniques = np.asarray(uniques, dtype=object)
+    bounds = np.flatnonzero(np.diff(g)) + 1
+    for chunk_g, chunk_v in zip(np.split(g, bounds), np.split(v, bounds)):
+        result[chunk_g[0]] = uniques[chunk_v].tolist()
+    return result
+
+
+def _merge_dicts(values: pd.Series, codes: np.ndarray, n_groups: int) -> List[dict]:
+    """dict.update of the non-empty dicts of each group, in row order."""
+    raw = values.to_numpy(dtype=object)
+    result = [{} for _ in range(n_groups)]
+    for pos in np.flatnonzero(codes >= 0):
+        d = raw[pos]
+        if isinstance(d, dict) and d:
+            result[codes[pos]].update(d)
+    return result
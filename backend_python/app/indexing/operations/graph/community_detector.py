@@ -0,0 +1,289 @@
+import asyncio
+import hashlib
+import logging
+import uuid
+from typing import Dict, List, Optional
+
+import networkx as nx
+import pandas as pd
+
+from app.core.config.graph_config import (
+    COMMUNITY_ALGORITHM, COMMUNITY_BACKEND, COMMUNITY_MAX_LEVELS, COMMUNITY_MAX_CLUSTER_SIZE,
+    COMMUNITY_RESOLUTION, COMMUNITY_SEED, COMMUNITY_MIN_SIZE
+)
+from app.indexing.operations.graph.store_manager import GraphStoreManager
+from app.infrastructure.neo4j.client import Neo4jClient
+
+try:
+    from graspologic.partition import hierarchical_leiden
+except ImportError:  # Optional: Louvain (networkx) is always available
+    hierarchical_leiden = None
+
+logger = logging.getLogger(__name__)
+
+COMMUNITY_COLUMNS = [
+    "id", "title", "level", "parent", "children",
+    "entity_ids", "relationship_ids", "text_unit_ids", "size"
+]
+
+# A hierarchy is a list of levels, coarsest first; each level maps entity id -> community label.
+# Every community of level L + 1 is nested in one community of level L.
+Hierarchy = List[Dict[str, str]]
+
+class CommunityDetector:
+    """
+    Hierarchical community detection over the resolved entity graph.
+
+    Two backends produce the same hierarchy format:
+    - In-process (CPU): hierarchical Leiden (graspologic) or multi-level Louvain
+      (networkx), run in a worker thread on the entity / relationship frames.
+    - Neo4j GDS: Leiden or Louvain with intermediate communities, run on an
+      in-memory projection of the stored graph (no data leaves the database).
+
+    Partitions are seeded, and community ids derive from (level, sorted members):
+    an unchanged community keeps its id across runs.
+    """
+
+    def __init__(
+        self,
+        client: Optional[Neo4jClient] = None,
+        algorithm: str = COMMUNITY_ALGORITHM,
+        backend: str = COMMUNITY_BACKEND,
+        max_levels: int = COMMUNITY_MAX_LEVELS,
+        max_cluster_size: int = COMMUNITY_MAX_CLUSTER_SIZE,
+        resolution: float = COMMUNITY_RESOLUTION,
+        seed: int = COMMUNITY_SEED,
+        min_size: int = COMMUNITY_MIN_SIZE
+    ):
+        self.client = client
+        self.algorithm = algorithm
+        self.backend = backend
+        self.max_levels = max_levels
+        self.max_cluster_size = max_cluster_size
+        self.resolution = resolution
+        self.seed = seed
+        self.min_size = min_size
+
+    async def detect(self, entities_df: pd.DataFrame, relationships_df: pd.DataFrame, in_process: bool = False) -> pd.DataFrame:
+        """
+        Detects the community hierarchy.
+
+        Args:
+            entities_df: Resolved entities ('id', optional 'source_ids').
+            relationships_df: Resolved relationships ('source_id', 'target_id', optional 'weight').
+            in_process: Forces the in-process backend (e.g. on a subgraph, which GDS
+                would not see: it projects the whole stored graph).
+
+        Returns:
+            One row per community (COMMUNITY_COLUMNS), coarsest level first.
+        """
+        if entities_df.empty:
+            return pd.DataFrame(columns=COMMUNITY_COLUMNS)
+
+        if not in_process and await self._use_gds():
+            logger.info(f"🧩 Community detection ({self.algorithm}) through Neo4j GDS...")
+            hierarchy = await self._gds_hierarchy()
+        else:
+            logger.info(f"🧩 Community detection ({self._local_algorithm()}) in-process...")
+            graph = self.build_graph(entities_df, relationships_df)
+            hierarchy = await asyncio.to_thread(self.local_hierarchy, graph)
+
+        communities = self.build_communities(hierarchy, entities_df, relationships_df)
+        logger.info(f"✅ {len(communities)} communities over {communities['level'].nunique() if len(communities) else 0} levels.")
+        return communities
+
+    # --- IN-PROCESS ---
+
+    @staticmethod
+    def build_graph(entities_df: pd.DataFrame, relationships_df: pd.DataFrame) -> nx.Graph:
+        """Undirected weighted graph; parallel edges (A->B, B->A) add up their weights."""
+        graph = nx.Graph()
+        graph.add_nodes_from(sorted(entities_df["id"].astype(str).unique()))
+        if relationships_df.empty:
+            return graph
+
+        edges = relationships_df[["source_id", "target_id"]].astype(str)
+        edges = edges.assign(weight=relationships_df["weight"].fillna(1.0).astype(float) if "weight" in relationships_df else 1.0)
+        edges = edges[edges["source_id"].isin(graph.nodes) & edges["target_id"].isin(graph.nodes)]
+        edges = edges[edges["source_id"] != edges["target_id"]]
+
+        # Order-independent endpoints, so A->B and B->A are one edge
+        swap = edges["source_id"] > edges["target_id"]
+        edges.loc[swap, ["source_id", "target_id"]] = edges.loc[swap, ["target_id", "source_id"]].to_numpy()
+        edges = edges.groupby(["source_id", "target_id"], as_index=False)["weight"].sum()
+
+        graph.add_weighted_edges_from(edges.itertuples(index=False, name=None))
+        return graph
+
+    def local_hierarchy(self, graph: nx.Graph) -> Hierarchy:
+        """Runs the in-process algorithm and returns the hierarchy (coarsest level first)."""
+        if graph.number_of_nodes() == 0:
+            return []
+
+        if self._local_algorithm() == "leiden":
+            clusters = hierarchical_leiden(
+                graph,
+                max_cluster_size=self.max_cluster_size,
+                resolution=self.resolution,
+                random_seed=self.seed
+            )
+            levels: Dict[int, Dict[str, str]] = {}
+            for c in clusters:
+                levels.setdefault(c.level, {})[str(c.node)] = str(c.cluster)
+            return [levels[level] for level in sorted(levels)][:self.max_levels]
+
+        # Louvain yields its partitions finest first
+        partitions = list(nx.community.louvain_partitions(
+            graph, weight="weight", resolution=self.resolution, seed=self.seed
+        ))
+        hierarchy = []
+        for partition in reversed(partitions):
+            hierarchy.append({node: str(label) for label, members in enumerate(partition) for node in members})
+        return hierarchy[:self.max_levels]
+
+    def _local_algorithm(self) -> str:
+        if self.algorithm == "leiden" and hierarchical_leiden is None:
+            return "louvain"
+        return self.algorithm
+
+    # --- NEO4J GDS ---
+
+    async def _use_gds(self) -> bool:
+        if self.backend == "networkx" or self.client is None:
+            return False
+        try:
+            await self.client.execute_query("RETURN gds.version() AS version")
+            return True
+        except Exception:
+            if self.backend == "gds":
+                logger.warning("⚠️ Neo4j GDS is not available, falling back to in-process detection.")
+            return False
+
+    async def _gds_hierarchy(self) -> Hierarchy:
+        """Projects the stored graph, streams the intermediate communities, drops the projection."""
+        name = f"communities_{uuid.uuid4().hex[:8]}"
+        await self.client.execute_query(
+            """
+            CALL gds.graph.project($name, 'Entity', {
+                RELATED_TO: {orientation: 'UNDIRECTED', properties: {weight: {property: 'weight', defaultValue: 1.0}}}
+            })
+            """,
+            parameters={"name": name}
+        )
+        try:
+            procedure = "gds.leiden.stream" if self.algorithm == "leiden" else "gds.louvain.stream"
+            # Leiden only: resolution (gamma) and a fixed seed
+            options = ", gamma: $resolution, randomSeed: $seed" if self.algorithm == "leiden" else ""
+            records = await self.client.execute_query(
+                f"""
+                CALL {procedure}($name, {{
+                    relationshipWeightProperty: 'weight',
+                    includeIntermediateCommunities: true{options}
+                }})
+                YIELD nodeId, intermediateCommunityIds
+                RETURN gds.util.asNode(nodeId).id AS id, intermediateCommunityIds AS communities
+                """,
+                parameters={"name": name, "seed": self.seed, "resolution": self.resolution}
+            )
+        finally:
+            await self.client.execute_query("CALL gds.graph.drop($name, false)", parameters={"name": name})
+
+        # intermediateCommunityIds are listed finest first
+        depth = max((len(r["communities"]) for r in records), default=0)
+        hierarchy = [{} for _ in range(depth)]
+        for r in records:
+            for level, label in enumerate(reversed(r["communities"])):
+                hierarchy[level][str(r["id"])] = str(label)
+        return hierarchy[:self.max_levels]
+
+    # --- COMMUNITY FRAME ---
+
+    def build_communities(
+        self,
+        hierarchy: Hierarchy,
+        entities_df: pd.DataFrame,
+        relationships_df: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        Turns a hierarchy into community rows, with parents, children, internal edges
+        and text units.
+
+        Communities smaller than min_size are dropped, and so is a sub-community with
+        exactly the members of its parent (its report would be a duplicate); its own
+        children are attached to the nearest kept ancestor.
+        """
+        text_units = self._text_units_by_entity(entities_df)
+        edge_keys, edge_sources, edge_targets = self._edges(relationships_df)
+
+        rows: Dict[str, Dict] = {}  # community id -> row, insertion ordered (coarsest level first)
+        owner: Dict[str, str] = {}   # entity id -> its kept community at the previous level
+        for level, labels in enumerate(hierarchy):
+            groups: Dict[str, List[str]] = {}
+            for entity_id, label in labels.items():
+                groups.setdefault(label, []).append(entity_id)
+
+            # Largest first: stable, readable titles
+            ordered = sorted((sorted(m) for m in groups.values()), key=lambda m: (-len(m), m[0]))
+            level_owner: Dict[str, str] = {}
+            position = 0
+            for members in ordered:
+                if len(members) < self.min_size:
+                    continue
+                parent = owner.get(members[0])
+                if parent is not None and len(members) == len(rows[parent]["entity_ids"]):
+                    level_owner.update((m, parent) for m in members)
+                    continue
+
+                community_id = self.community_id(level, members)
+                level_owner.update((m, community_id) for m in members)
+                units = sorted({u for m in members for u in text_units.get(m, [])})
+                rows[community_id] = {
+                    "id": community_id,
+                    "title": f"Community {level}-{position}",
+                    "level": level,
+                    "parent": parent,
+                    "children": [],
+                    "entity_ids": members,
+                    "relationship_ids": [],
+                    "text_unit_ids": units,
+                    "size": len(units),
+                }
+                if parent is not None:
+                    rows[parent]["children"].append(community_id)
+                position += 1
+
+            # Internal edges: both endpoints in the same new community of this level
+            for key, src, tgt in zip(edge_keys, edge_sources, edge_targets):
+                community_id = level_owner.get(src)
+                if community_id is not None and community_id == level_owner.get(tgt) and rows[community_id]["level"] == level:
+                    rows[community_id]["relationship_ids"].append(key)
+            owner = level_owner
+
+        return pd.DataFrame(list(rows.values()), columns=COMMUNITY_COLUMNS)
+
+    @staticmethod
+    def community_id(level: int, members: List[str]) -> str:
+        """Deterministic id: an unchanged community keeps its id (and its cached report)."""
+        raw = f"{level}|" + ",".join(sorted(members))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _text_units_by_entity(entities_df: pd.DataFrame) -> Dict[str, List[str]]:
+        if "source_ids" not in entities_df:
+            return {}
+        return {
+            str(entity_id): list(units)
+            for entity_id, units in zip(entities_df["id"], entities_df["source_ids"])
+            if isinstance(units, (list, tuple))
+        }
+
+    @staticmethod
+    def _edges(relationships_df: pd.DataFrame):
+        if relationships_df.empty:
+            return [], [], []
+        keys = (
+            relationships_df["key"].tolist() if "key" in relationships_df
+            else GraphStoreManager._relationship_keys(relationships_df)
+        )
+        return keys, relationships_df["source_id"].astype(str).tolist(), relationships_df["target_id"].astype(str).tolist()
+
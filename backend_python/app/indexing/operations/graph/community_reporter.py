@@ -0,0 +1,261 @@
+import asyncio
+import hashlib
+import logging
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from app.core.config.graph_config import COMMUNITY_REPORT_CONCURRENCY, COMMUNITY_REPORT_MAX_INPUT_TOKENS
+from app.core.config.llm_config import LLM_TOKENIZER_NAME
+from app.core.data_model.community_report import CommunityReportModel
+from app.core.prompts.graph_prompts import COMMUNITY_REPORT_SYSTEM_PROMPT, COMMUNITY_REPORT_USER_PROMPT
+from app.indexing.operations.graph.store_manager import GraphStoreManager
+from app.services.database.community_repository import CommunityRepository
+from app.services.llm.service import LLMService
+from app.services.tokenizer_registry import TokenizerRegistry
+
+logger = logging.getLogger(__name__)
+
+# Any change to the prompts invalidates the stored reports
+COMMUNITY_REPORT_PROMPT_VERSION = hashlib.sha256(
+    (COMMUNITY_REPORT_SYSTEM_PROMPT + COMMUNITY_REPORT_USER_PROMPT).encode("utf-8")
+).hexdigest()[:12]
+
+REPORT_COLUMNS = [
+    "id", "community_id", "level", "title", "summary", "full_content", "findings", "rank", "context_hash"
+]
+
+class CommunityReportGenerator:
+    """
+    Generates one LLM report per community, bottom-up.
+
+    - Levels are processed from the finest to the coarsest: a community whose raw
+      context (entities + relationships) exceeds the token budget is described from
+      the reports of its sub-communities first, then from as much raw data as fits.
+    - Within a level, reports are generated concurrently under a semaphore.
+    - With a CommunityRepository, reports are cached by community id and context hash:
+      a community whose members and member summaries did not change is not re-sent.
+    """
+
+    def __init__(
+        self,
+        llm_service: LLMService,
+        max_concurrency: int = COMMUNITY_REPORT_CONCURRENCY,
+        store: Optional[CommunityRepository] = None,
+        max_input_tokens: int = COMMUNITY_REPORT_MAX_INPUT_TOKENS
+    ):
+        self.llm = llm_service
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.store = store
+        self.max_input_tokens = max_input_tokens
+
+    async def generate(
+        self,
+        communities_df: pd.DataFrame,
+        entities_df: pd.DataFrame,
+        relationships_df: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        Produces the reports of all the given communities.
+
+        Returns:
+            One row per community with a report (REPORT_COLUMNS); failed generations are absent.
+        """
+        if communities_df.empty:
+            return pd.DataFrame(columns=REPORT_COLUMNS)
+
+        entities = self._index_entities(entities_df)
+        relationships = self._index_relationships(relationships_df)
+        stored = await self._load_reports(communities_df["id"].tolist())
+
+        reports: Dict[str, CommunityReportModel] = {}
+        generated: List[CommunityReportModel] = []
+        for level in sorted(communities_df["level"].unique(), reverse=True):
+            pending = []
+            for row in communities_df[communities_df["level"] == level].itertuples(index=False):
+                context = self.build_context(row, entities, relationships, reports)
+                context_hash = self._context_hash(context)
+
+                known = stored.get(row.id)
+                if known and known.context_hash == context_hash:
+                    reports[row.id] = known
+                    continue
+                pending.append(self._ask_report(row, context, context_hash))
+
+            for report in await asyncio.gather(*pending):
+                if report:
+                    reports[report.community_id] = report
+                    generated.append(report)
+
+        logger.info(f"📰 Community reports: {len(generated)} generated, {len(reports) - len(generated)} reused.")
+        await self._save_reports(generated)
+
+        return pd.DataFrame([r.model_dump(include=set(REPORT_COLUMNS)) for r in reports.values()], columns=REPORT_COLUMNS)
+
+    # --- CONTEXT ---
+
+    def build_context(
+        self,
+        community,
+        entities: pd.DataFrame,
+        relationships: pd.DataFrame,
+        reports: Dict[str, CommunityReportModel]
+    ) -> str:
+        """
+        Renders the community for the LLM, within the token budget.
+
+        Entities are ordered by their number of internal relationships, relationships
+        by weight; sub-community reports come first when the raw data does not fit.
+        """
+        member_ids = [e for e in community.entity_ids if e in entities.index]
+        edges = relationships.loc[[k for k in community.relationship_ids if k in relationships.index]]
+        members = entities.loc[member_ids]
+
+        degree = pd.concat([edges["source_id"], edges["target_id"]]).value_counts() if not edges.empty else pd.Series(dtype=int)
+        members = members.assign(degree=members["id"].map(degree).fillna(0).astype(int))
+        members = members.sort_values(["degree", "id"], ascending=[False, True], kind="stable")
+        edges = edges.sort_values(["weight", "key"], ascending=[False, True], kind="stable") if not edges.empty else edges
+
+        titles = entities["title"].to_dict()
+        entity_lines = [
+            f"- {row.title} ({row.type}): {row.description}"
+            for row in members.itertuples(index=False)
+        ]
+        edge_lines = [
+            f"- {titles.get(row.source_id, row.source_id)} -> {titles.get(row.target_id, row.target_id)}: {row.description} (weight {row.weight:g})"
+            for row in edges.itertuples(index=False)
+        ]
+
+        raw_tokens = self._estimate_tokens(entity_lines + edge_lines)
+        sections = []
+        budget = self.max_input_tokens
+
+        children = [reports[c] for c in (community.children or []) if c in reports]
+        if raw_tokens > budget and children:
+            child_lines = [f"- {r.title}: {r.summary}" for r in sorted(children, key=lambda r: -r.rank)]
+            child_lines = self._fit(child_lines, budget)
+            sections.append("-----Sub-community reports-----\n" + "\n".join(child_lines))
+            budget -= self._estimate_tokens(child_lines)
+
+        # Entities get at most half of the remaining budget when relationships compete for it
+        entity_lines = self._fit(entity_lines, budget // 2 if edge_lines else budget)
+        budget -= self._estimate_tokens(entity_lines)
+        edge_lines = self._fit(edge_lines, budget)
+
+        sections.append("-----Entities-----\n" + "\n".join(entity_lines))
+        if edge_lines:
+            sections.append("-----Relationships-----\n" + "\n".join(edge_lines))
+        return "\n\n".join(sections)
+
+    # --- LLM ---
+
+    async def _ask_report(self, community, context: str, context_hash: str) -> Optional[CommunityReportModel]:
+        async with self.semaphore:
+            logger.info(f"🤖 Writing report of '{community.title}' ({len(community.entity_ids)} entities)...")
+            try:
+                result = await self.llm.ask_json(
+                    system_prompt=COMMUNITY_REPORT_SYSTEM_PROMPT,
+                    user_prompt=COMMUNITY_REPORT_USER_PROMPT.format(context=context)
+                )
+            except Exception as e:
+                logger.error(f"❌ Failed to write the report of '{community.title}': {e}")
+                return None
+
+        if not isinstance(result, dict) or not result.get("summary"):
+            logger.warning(f"⚠️ Invalid report returned for '{community.title}'.")
+            return None
+
+        findings = [
+            {"summary": str(f.get("summary", "")), "explanation": str(f.get("explanation", ""))}
+            for f in result.get("findings") or [] if isinstance(f, dict)
+        ]
+        title = str(result.get("title") or community.title)
+        try:
+            rank = float(result.get("rating", 1.0))
+        except (TypeError, ValueError):
+            rank = 1.0
+
+        return CommunityReportModel(
+            id=community.id,
+            community_id=community.id,
+            level=int(community.level),
+            title=title,
+            summary=str(result["summary"]),
+            full_content=self._render(title, str(result["summary"]), findings),
+            findings=findings,
+            rank=rank,
+            context_hash=context_hash,
+            size=community.size
+        )
+
+    @staticmethod
+    def _render(title: str, summary: str, findings: List[Dict[str, str]]) -> str:
+        """Markdown version of the report (what global search reads)."""
+        parts = [f"# {title}", summary]
+        parts += [f"## {f['summary']}\n\n{f['explanation']}" for f in findings]
+        return "\n\n".join(parts)
+
+    # --- STORE ---
+
+    async def _load_reports(self, community_ids: List[str]) -> Dict[str, CommunityReportModel]:
+        """Bulk read of the stored reports (a store failure only costs extra LLM calls)."""
+        if not self.store or not community_ids:
+            return {}
+        try:
+            return await self.store.get_reports(community_ids)
+        except Exception as e:
+            logger.error(f"❌ Community report lookup failed: {e}")
+            return {}
+
+    async def _save_reports(self, reports: List[CommunityReportModel]):
+        if not self.store or not reports:
+            return
+        try:
+            await self.store.save_reports(reports)
+        except Exception as e:
+            logger.error(f"❌ Failed to persist {len(reports)} community reports: {e}")
+
+    # --- HELPERS ---
+
+    @staticmethod
+    def _index_entities(entities_df: pd.DataFrame) -> pd.DataFrame:
+        entities = entities_df.drop_duplicates(subset="id").set_index("id", drop=False).rename_axis(None)
+        for column, default in (("title", ""), ("type", "UNKNOWN"), ("description", "")):
+            if column not in entities:
+                entities[column] = default
+        return entities
+
+    @staticmethod
+    def _index_relationships(relationships_df: pd.DataFrame) -> pd.DataFrame:
+        columns = ["key", "source_id", "target_id", "description", "weight"]
+        if relationships_df.empty:
+            return pd.DataFrame(columns=columns).set_index("key", drop=False).rename_axis(None)
+        rels = relationships_df.copy()
+        if "key" not in rels:
+            rels["key"] = GraphStoreManager._relationship_keys(rels)
+        if "weight" not in rels:
+            rels["weight"] = 1.0
+        rels["weight"] = rels["weight"].fillna(1.0).astype(float)
+        return rels[columns].drop_duplicates(subset="key").set_index("key", drop=False).rename_axis(None)
+
+    @classmethod
+    def _fit(cls, lines: List[str], budget: int) -> List[str]:
+        """Keeps the leading lines that fit in the token budget."""
+        kept, used = [], 0
+        counts = TokenizerRegistry.count_tokens(lines, LLM_TOKENIZER_NAME)
+        for line, count in zip(lines, counts):
+            tokens = count + 1  # Line break
+            if used + tokens > budget:
+                break
+            kept.append(line)
+            used += tokens
+        return kept
+
+    @staticmethod
+    def _estimate_tokens(lines: List[str]) -> int:
+        """Prompt tokens of the lines (LLM tokenizer, one per line break)."""
+        return sum(TokenizerRegistry.count_tokens(lines, LLM_TOKENIZER_NAME)) + len(lines)
+
+    @staticmethod
+    def _context_hash(context: str) -> str:
+        return hashlib.sha256(f"{COMMUNITY_REPORT_PROMPT_VERSION}\n{context}".encode("utf-8")).hexdigest()
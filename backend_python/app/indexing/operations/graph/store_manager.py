@@ -1,7 +1,9 @@
+import hashlib
 import logging
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from app.infrastructure.neo4j.client import Neo4jClient
+from app.infrastructure.neo4j.bulk_writer import Neo4jBulkWriter
 
 logger = logging.getLogger(__name__)
 
@@ -10,72 +12,393 @@ class GraphStoreManager:
     Manages the persistence of extracted graph data into Neo4j.
     
     This class transforms Pandas DataFrames (Entities and Relationships)
-    into optimized Cypher queries using batch processing (UNWIND).
+    into optimized Cypher queries using batch processing (UNWIND), written by
+    a Neo4jBulkWriter (bounded, concurrent, retried transactions).
+
+    Synchronization is incremental: every node and edge carries a content hash of
+    its persisted properties and the ids of the documents it comes from (doc_ids).
+    Only new or changed rows are written, and the edges a re-ingested document no
+    longer produces lose its provenance (and are deleted when it was the only one).
+    Each document's edge keys are kept on a (:Document {id}) node for that diff.
     """
 
-    def __init__(self, client: Neo4jClient):
+    ENTITY_PROPERTIES = ["title", "type", "description", "frequency"]
+    RELATIONSHIP_PROPERTIES = ["description", "weight"]
+    RELATIONSHIP_TYPE = "RELATED_TO"
+
+    def __init__(self, client: Neo4jClient, writer: Neo4jBulkWriter = None):
         self.client = client
+        self.writer = writer or Neo4jBulkWriter(client)
 
-    async def save_graph(self, entities_df: pd.DataFrame, relationships_df: pd.DataFrame):
+    async def save_graph(self, entities_df: pd.DataFrame, relationships_df: pd.DataFrame, doc_id: Optional[str] = None):
         """
         Main entry point to persist the entire graph batch.
         
         Args:
-            entities_df: Resolved entities with 'title' as the primary ID.
+            entities_df: Resolved entities with 'id' as the primary key (stable across documents).
             relationships_df: Re-mapped relationships between entities.
+            doc_id: The ingested document, recorded as provenance (enables orphan cleanup).
         """
         logger.info(f"📤 Pushing graph to Neo4j ({len(entities_df)} nodes, {len(relationships_df)} edges)...")
         
-        # 1. Ensure constraints exist before pushing
-        await self.client.ensure_constraints()
-
-        # 2. Push Nodes
+        # 1. Push Nodes (constraints and indexes are set up once at startup, see Neo4jSchemaManager)
         if not entities_df.empty:
-            await self._upsert_entities(entities_df)
+            await self._upsert_entities(entities_df, doc_id)
 
-        # 3. Push Relationships
+        # 2. Push Relationships
         if not relationships_df.empty:
-            await self._upsert_relationships(relationships_df)
+            await self._upsert_relationships(relationships_df, doc_id)
+
+        # 3. Drop the edges this document no longer produces
+        if doc_id:
+            await self._remove_orphan_relationships(relationships_df, doc_id)
 
         logger.info("✅ Graph successfully synchronized with Neo4j.")
 
-    async def _upsert_entities(self, df: pd.DataFrame):
+    async def _upsert_entities(self, df: pd.DataFrame, doc_id: Optional[str] = None):
         """
-        Persists entities using a batch UNWIND query.
+        Persists new or changed entities using a batch UNWIND query.
         
-        We use 'id' as the unique identifier (the resolved title or canonical ID).
+        We use 'id' as the unique identifier (the registry or canonical ID), so the same 
+        identity met in several documents lands on the same node whatever its title.
         """
-        # Prepare data: Neo4j prefers a list of dicts
-        data = df.to_dict(orient="records")
-        
+        # Prepare data: only the persisted columns travel
+        columns = ["id"] + [c for c in self.ENTITY_PROPERTIES if c in df.columns]
+        deduped = df.drop_duplicates(subset="id", keep="last")
+        nodes = deduped[columns].copy()
+        nodes["content_hash"] = self._content_hashes(nodes, columns[1:])
+        # Text units accumulate across documents (community provenance): outside of the hash,
+        # a row is changed when it brings units the node does not have yet
+        units = deduped["source_ids"] if "source_ids" in deduped.columns else [None] * len(deduped)
+        nodes["source_ids"] = [list(u) if isinstance(u, (list, tuple)) else [] for u in units]
+        nodes["doc_id"] = doc_id
+
+        existing = await self.client.execute_query(
+            """
+            UNWIND $ids AS id
+            MATCH (e:Entity {id: id})
+            RETURN e.id AS id, e.content_hash AS content_hash,
+                   ($doc_id IS NULL OR $doc_id IN coalesce(e.doc_ids, [])) AS tracked,
+                   coalesce(e.source_ids, []) AS source_ids
+            """,
+            parameters={"ids": nodes["id"].tolist(), "doc_id": doc_id}
+        )
+        nodes = self._changed_rows(nodes, existing, ["id"], accumulated="source_ids")
+        if nodes.empty:
+            logger.info("💤 Entity nodes already up to date.")
+            return
+
         query = """
         UNWIND $batch AS row
-        MERGE (e:Entity {id: row.title})
+        MERGE (e:Entity {id: row.id})
         SET e.title = row.title,
             e.type = row.type,
             e.description = row.description,
             e.frequency = row.frequency,
+            e.content_hash = row.content_hash,
+            e.source_ids = coalesce(e.source_ids, []) + [s IN row.source_ids WHERE NOT s IN coalesce(e.source_ids, [])],
+            e.doc_ids = CASE
+                WHEN row.doc_id IS NULL OR row.doc_id IN coalesce(e.doc_ids, []) THEN coalesce(e.doc_ids, [])
+                ELSE coalesce(e.doc_ids, []) + row.doc_id
+            END,
             e.updated_at = timestamp()
         """
-        await self.client.execute_query(query, parameters={"batch": data})
-        logger.debug(f"💎 Upserted {len(data)} Entity nodes.")
+        await self.writer.write(query, nodes.to_dict(orient="records"), label="Entity nodes")
 
-    async def _upsert_relationships(self, df: pd.DataFrame):
+    async def _upsert_relationships(self, df: pd.DataFrame, doc_id: Optional[str] = None):
         """
-        Persists relationships between existing entities.
+        Persists new or changed relationships between existing entities.
         
         Note: We assume entities already exist thanks to _upsert_entities.
+
+        Edges are identified by a compact deterministic key derived from
+        (source_id, target_id, type) and backed by a relationship index, so a merge is
+        an index lookup and the description stays an updatable property.
+
+        Rows are sorted by (source_id, target_id): each batch then covers a contiguous
+        range of source nodes, which limits the node locks shared by concurrent batches.
         """
-        data = df.to_dict(orient="records")
+        columns = ["source_id", "target_id"] + [c for c in self.RELATIONSHIP_PROPERTIES if c in df.columns]
+        edges = (
+            df[columns]
+            .drop_duplicates(subset=["source_id", "target_id"], keep="last")
+            .sort_values(["source_id", "target_id"], kind="stable")
+        )
+        edges["key"] = self._relationship_keys(edges)
+        edges["content_hash"] = self._content_hashes(edges, columns[2:])
+        edges["doc_id"] = doc_id
+
+        existing = await self.client.execute_query(
+            """
+            UNWIND $keys AS key
+            MATCH ()-[r:RELATED_TO {key: key}]->()
+            RETURN r.key AS key, r.content_hash AS content_hash,
+                   ($doc_id IS NULL OR $doc_id IN coalesce(r.doc_ids, [])) AS tracked
+            """,
+            parameters={"keys": edges["key"].tolist(), "doc_id": doc_id}
+        )
+        edges = self._changed_rows(edges, existing, ["key"])
+        if edges.empty:
+            logger.info("💤 Relationship edges already up to date.")
+            return
         
-        # We use MERGE to avoid duplicate edges between same nodes
+        # Legacy edges (merged on their description, without key) are replaced by the keyed one
         query = """
         UNWIND $batch AS row
-        MATCH (source:Entity {id: row.source})
-        MATCH (target:Entity {id: row.target})
-        MERGE (source)-[r:RELATED_TO {description: row.description}]->(target)
-        SET r.weight = row.weight,
-            r.source_id = row.source_id
-        """
-        await self.client.execute_query(query, parameters={"batch": data})
-        logger.debug(f"🔗 Upserted {len(data)} Relationship edges.")
\ No newline at end of file
+        MATCH (source:Entity {id: row.source_id})
+        MATCH (target:Entity {id: row.target_id})
+        CALL {
+            WITH source, target
+            MATCH (source)-[legacy:RELATED_TO]->(target)
+            WHERE legacy.key IS NULL
+            DELETE legacy
+        }
+        MERGE (source)-[r:RELATED_TO {key: row.key}]->(target)
+        SET r.description = row.description,
+            r.weight = row.weight,
+            r.source_id = row.source_id,
+            r.content_hash = row.content_hash,
+            r.doc_ids = CASE
+                WHEN row.doc_id IS NULL OR row.doc_id IN coalesce(r.doc_ids, []) THEN coalesce(r.doc_ids, [])
+                ELSE coalesce(r.doc_ids, []) + row.doc_id
+            END
+        """
+        await self.writer.write(query, edges.to_dict(orient="records"), label="Relationship edges")
+
+    async def _remove_orphan_relationships(self, df: pd.DataFrame, doc_id: str):
+        """
+        Removes the provenance of `doc_id` from the edges it no longer produces.
+        Edges left without any provenance are deleted.
+
+        The keys of the edges a document produces are recorded on its (:Document) node,
+        so the diff reads that single node instead of scanning every RELATED_TO edge.
+        """
+        previous = await self.client.execute_query(
+            """
+            MATCH (d:Document {id: $doc_id})
+            RETURN coalesce(d.relationship_keys, []) AS keys
+            """,
+            parameters={"doc_id": doc_id}
+        )
+        current = [] if df.empty else sorted(set(self._relationship_keys(df)))
+        known = set(current)
+        orphans = [
+            {"key": key, "doc_id": doc_id}
+            for key in (previous[0]["keys"] if previous else []) if key not in known
+        ]
+
+        if orphans:
+            query = """
+            UNWIND $batch AS row
+            MATCH ()-[r:RELATED_TO {key: row.key}]->()
+            SET r.doc_ids = [d IN r.doc_ids WHERE d <> row.doc_id]
+            WITH r WHERE size(r.doc_ids) = 0
+            DELETE r
+            """
+            await self.writer.write(query, orphans, label="orphan edges")
+
+        await self.writer.write(
+            """
+            UNWIND $batch AS row
+            MERGE (d:Document {id: row.id})
+            SET d.relationship_keys = row.keys,
+                d.updated_at = timestamp()
+            """,
+            [{"id": doc_id, "keys": current}],
+            label="document edge keys"
+        )
+
+    async def load_graph(self, entity_ids: Optional[List[str]] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Reads the stored entity graph: the whole corpus, or the subgraph induced by
+        `entity_ids` (those nodes and the edges between them).
+
+        Returns:
+            (entities_df, relationships_df), relationships carrying their edge key.
+        """
+        if entity_ids is None:
+            entities = await self.client.execute_query(
+                """
+                MATCH (e:Entity)
+                RETURN e.id AS id, e.title AS title, e.type AS type,
+                       e.description AS description, e.frequency AS frequency,
+                       coalesce(e.source_ids, []) AS source_ids
+                """
+            )
+            relationships = await self.client.execute_query(
+                """
+                MATCH (source:Entity)-[r:RELATED_TO]->(target:Entity)
+                WHERE r.key IS NOT NULL
+                RETURN r.key AS key, source.id AS source_id, target.id AS target_id,
+                       r.description AS description, r.weight AS weight
+                """
+            )
+        else:
+            entities = await self.client.execute_query(
+                """
+                UNWIND $ids AS id
+                MATCH (e:Entity {id: id})
+                RETURN e.id AS id, e.title AS title, e.type AS type,
+                       e.description AS description, e.frequency AS frequency,
+                       coalesce(e.source_ids, []) AS source_ids
+                """,
+                parameters={"ids": list(entity_ids)}
+            )
+            relationships = await self.client.execute_query(
+                """
+                UNWIND $ids AS id
+                MATCH (source:Entity {id: id})-[r:RELATED_TO]->(target:Entity)
+                WHERE r.key IS NOT NULL AND target.id IN $ids
+                RETURN r.key AS key, source.id AS source_id, target.id AS target_id,
+                       r.description AS description, r.weight AS weight
+                """,
+                parameters={"ids": list(entity_ids)}
+            )
+        entities_df = pd.DataFrame(entities, columns=["id", "title", "type", "description", "frequency", "source_ids"])
+        relationships_df = pd.DataFrame(relationships, columns=["key", "source_id", "target_id", "description", "weight"])
+        logger.info(f"📥 Loaded graph from Neo4j ({len(entities_df)} nodes, {len(relationships_df)} edges).")
+        return entities_df, relationships_df
+
+    async def count_entities(self) -> int:
+        records = await self.client.execute_query("MATCH (e:Entity) RETURN count(e) AS total")
+        return records[0]["total"] if records else 0
+
+    async def get_community_ids(self) -> List[str]:
+        records = await self.client.execute_query("MATCH (c:Community) RETURN c.id AS id")
+        return [r["id"] for r in records]
+
+    async def save_communities(
+        self,
+        communities_df: pd.DataFrame,
+        reports_df: pd.DataFrame,
+        stale_ids: Optional[List[str]] = None
+    ):
+        """
+        Persists communities as (:Community) nodes carrying their report, linked to
+        their members (IN_COMMUNITY) and to their parent (CHILD_OF).
+
+        Community ids derive from their membership, so an existing community never
+        changes members: edges are only merged, and the communities that no longer
+        exist (stale_ids) are detach-deleted with their edges.
+        """
+        if stale_ids:
+            await self.writer.write(
+                """
+                UNWIND $batch AS row
+                MATCH (c:Community {id: row.id})
+                DETACH DELETE c
+                """,
+                [{"id": i} for i in stale_ids],
+                label="stale communities"
+            )
+
+        if communities_df.empty:
+            return
+
+        nodes = communities_df[["id", "title", "level", "size"]].copy()
+        if not reports_df.empty:
+            report_columns = reports_df[["community_id", "title", "summary", "full_content", "rank"]].rename(
+                columns={"community_id": "id", "title": "report_title"}
+            )
+            nodes = nodes.merge(report_columns, on="id", how="left")
+        nodes = nodes.astype(object).where(nodes.notna(), None)
+
+        await self.writer.write(
+            """
+            UNWIND $batch AS row
+            MERGE (c:Community {id: row.id})
+            SET c.title = coalesce(row.report_title, row.title),
+                c.level = row.level,
+                c.size = row.size,
+                c.summary = row.summary,
+                c.full_content = row.full_content,
+                c.rank = row.rank,
+                c.updated_at = timestamp()
+            """,
+            nodes.to_dict(orient="records"),
+            label="Community nodes"
+        )
+
+        members = communities_df[["id", "entity_ids"]].explode("entity_ids").dropna()
+        await self.writer.write(
+            """
+            UNWIND $batch AS row
+            MATCH (e:Entity {id: row.entity_id})
+            MATCH (c:Community {id: row.community_id})
+            MERGE (e)-[:IN_COMMUNITY]->(c)
+            """,
+            [{"entity_id": e, "community_id": c} for c, e in zip(members["id"], members["entity_ids"])],
+            label="community memberships"
+        )
+
+        hierarchy = communities_df.dropna(subset=["parent"])
+        await self.writer.write(
+            """
+            UNWIND $batch AS row
+            MATCH (child:Community {id: row.id})
+            MATCH (parent:Community {id: row.parent})
+            MERGE (child)-[:CHILD_OF]->(parent)
+            """,
+            hierarchy[["id", "parent"]].to_dict(orient="records"),
+            label="community hierarchy"
+        )
+
+        # Denormalized copy on the entities, for retrieval filters
+        by_entity = members.groupby("entity_ids", sort=False)["id"].agg(list)
+        await self.writer.write(
+            """
+            UNWIND $batch AS row
+            MATCH (e:Entity {id: row.id})
+            SET e.community_ids = row.community_ids
+            """,
+            [{"id": e, "community_ids": ids} for e, ids in by_entity.items()],
+            label="entity community ids"
+        )
+
+    @classmethod
+    def _relationship_keys(cls, df: pd.DataFrame) -> List[str]:
+        """Deterministic edge identity: sha256(source_id | target_id | type), truncated."""
+        return [
+            hashlib.sha256(f"{src}|{tgt}|{cls.RELATIONSHIP_TYPE}".encode("utf-8")).hexdigest()[:24]
+            for src, tgt in zip(df["source_id"], df["target_id"])
+        ]
+
+    @staticmethod
+    def _content_hashes(df: pd.DataFrame, columns: List[str]) -> List[str]:
+        """Vectorized 64-bit hash of the persisted properties, one per row (hex)."""
+        if not columns:
+            return ["0"] * len(df)
+        hashes = pd.util.hash_pandas_object(df[columns].astype(str), index=False)
+        return [format(h, "016x") for h in hashes.to_numpy()]
+
+    @staticmethod
+    def _changed_rows(
+        df: pd.DataFrame,
+        existing: List[Dict[str, Any]],
+        keys: List[str],
+        accumulated: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Keeps the rows to write: unknown in the graph, different hash, not yet
+        attributed to the current document, or (for the `accumulated` list column,
+        unioned on write) carrying values the stored element does not have.
+        """
+        if not existing:
+            return df
+
+        stored = pd.DataFrame(existing)
+        merged = df.merge(stored, on=keys, how="left", suffixes=("", "_stored"))
+        unchanged = (merged["content_hash_stored"] == merged["content_hash"]) & merged["tracked"].fillna(False).astype(bool)
+
+        stored_column = f"{accumulated}_stored"
+        if accumulated and stored_column in merged.columns:
+            covered = [
+                isinstance(known, list) and set(values).issubset(known)
+                for values, known in zip(merged[accumulated], merged[stored_column])
+            ]
+            unchanged &= pd.Series(covered, index=merged.index)
+
+        skipped = int(unchanged.sum())
+        if skipped:
+            logger.info(f"💤 {skipped}/{len(df)} rows unchanged, skipped.")
+        return merged.loc[~unchanged, df.columns.tolist()]
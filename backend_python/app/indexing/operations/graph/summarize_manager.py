@@ -2,19 +2,47 @@
 # Licensed under the MIT License
 
 import asyncio
+import hashlib
 import pandas as pd
-from typing import List, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from app.services.llm.service import LLMService
-from app.core.config.graph_config import MAX_SUMMARY_LENGTH, ENTITY_BATCH_SIZE, MAX_INPUT_TOKENS #TODO
+from app.core.config.graph_config import (
+    MAX_SUMMARY_LENGTH, ENTITY_BATCH_SIZE, MAX_INPUT_TOKENS, #TODO
+    SUMMARY_BATCH_TOKEN_BUDGET, SUMMARY_BATCH_MAX_ITEMS, SUMMARY_BATCH_ITEM_MAX_TOKENS
+)
 from app.core.prompts.graph_prompts import (
                 ENTITY_SUMMARIZE_SYSTEM_PROMPT, 
                 RELATIONSHIP_SUMMARIZE_SYSTEM_PROMPT,
-                COMMON_SUMMARIZE_USER_PROMPT
+                COMMON_SUMMARIZE_USER_PROMPT,
+                INCREMENTAL_SUMMARIZE_USER_PROMPT,
+                BATCH_SUMMARIZE_USER_PROMPT
             )
+from app.core.data_model.summary import DescriptionSummary
+from app.services.database.summary_repository import SummaryRepository
+from app.services.tokenizer_registry import TokenizerRegistry
+from app.core.config.llm_config import LLM_TOKENIZER_NAME
 
 import logging
 logger = logging.getLogger(__name__)
 
+# Any change to the prompts (or to the length limit) invalidates the stored summaries
+SUMMARY_PROMPT_VERSION = hashlib.sha256("\n".join([
+    ENTITY_SUMMARIZE_SYSTEM_PROMPT,
+    RELATIONSHIP_SUMMARIZE_SYSTEM_PROMPT,
+    COMMON_SUMMARIZE_USER_PROMPT,
+    INCREMENTAL_SUMMARIZE_USER_PROMPT,
+    BATCH_SUMMARIZE_USER_PROMPT,
+    str(MAX_SUMMARY_LENGTH)
+]).encode("utf-8")).hexdigest()[:12]
+
+class SummaryJob(NamedTuple):
+    """One pending LLM summarization (position = row position in the frame)."""
+    position: int
+    identifier: str
+    fragments: List[str]
+    previous_summary: Optional[str] = None
+
+
 class SummarizeManager: 
     """
     Orchestrates the consolidation of multiple descriptions for entities and relationships.
@@ -22,17 +50,27 @@ class SummarizeManager:
     After the extraction and resolution phases, a single entity might have accumulated 
     several fragmented descriptions from different text units. This manager flattens 
     those fragments into a single, cohesive, and grounded summary using a LLM.
+
+    With a SummaryRepository, results are durable: an object whose fragment set did not
+    change is never summarized again, and an object that only gained fragments gets its
+    stored summary updated with the new ones instead of a full re-summarization.
+
+    Small jobs are packed into multi-subject prompts (up to a token budget) answered
+    as a JSON object, which divides the number of calls and of repeated system-prompt
+    tokens; subjects missing from the answer fall back to their own call.
     """
-    def __init__(self, llm_service: LLMService, num_threads: int = ENTITY_BATCH_SIZE):
+    def __init__(self, llm_service: LLMService, num_threads: int = ENTITY_BATCH_SIZE, store: Optional[SummaryRepository] = None):
         """
         Initializes the manager with a concurrency semaphore.
         
         Args:
             llm_service: The service used to communicate with the LLM.
             num_threads: Maximum number of concurrent LLM requests allowed (rate limiting).
+            store: Durable summary store (optional).
         """
         self.llm = llm_service
         self.semaphore = asyncio.Semaphore(num_threads)
+        self.store = store
 
     async def summarize_all(self, entities_df: pd.DataFrame, relationships_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
@@ -64,7 +102,7 @@ class SummarizeManager:
 
         # Maintain index order to ensure alignment after async gathering
         indices = df.index.tolist()
-        tasks = []
+        identifiers, object_ids, fragments = [], [], []
         
         for idx in indices:
             row = df.loc[idx]
@@ -72,67 +110,259 @@ class SummarizeManager:
             # Determine identifier based on object type
             if is_entity:
                 identifier = row.title
+                object_id = getattr(row, 'id', None) or row.title
             else:
                 # Fallback to defaults if slug columns are missing (this should not happen)
                 src = getattr(row, 'source_slug', 'SOURCE')
                 tgt = getattr(row, 'target_slug', 'TARGET')
                 identifier = f"{src} -> {tgt}"
-            
-            tasks.append(self._throttled_summarize(identifier, row.description, is_entity))
-        
+                object_id = f"{getattr(row, 'source_id', src)}->{getattr(row, 'target_id', tgt)}"
+
+            identifiers.append(identifier)
+            object_ids.append(str(object_id))
+            fragments.append(self._clean_fragments(row.description))
+
+        # Only multi-fragment objects need the LLM, hence the store
+        stored = await self._load_summaries([oid for oid, f in zip(object_ids, fragments) if len(f) > 1])
+
+        # Plan: what is already known, what needs the LLM
+        summaries: List[Optional[str]] = [None] * len(indices)
+        jobs: List[SummaryJob] = []
+        for position, (identifier, object_id, frags) in enumerate(zip(identifiers, object_ids, fragments)):
+            summary, job = self._plan(position, identifier, frags, stored.get(object_id))
+            summaries[position] = summary
+            if job:
+                jobs.append(job)
+
         # Execute tasks concurrently while preserving order
-        results = await asyncio.gather(*tasks)
+        answers = await self._run_jobs(jobs, is_entity)
+
+        records = []
+        for job in jobs:
+            position = job.position
+            summary = answers.get(position)
+            if summary is None:
+                summaries[position] = " ".join(fragments[position][:2]) # Fallback : We join the first two descriptions in a single string
+                continue
+            summaries[position] = summary
+            records.append(DescriptionSummary(
+                object_id=object_ids[position],
+                prompt_version=SUMMARY_PROMPT_VERSION,
+                fragments_hash=self._fragments_hash(fragments[position]),
+                fragments=fragments[position],
+                summary=summary
+            ))
         
         # Update descriptions via positional index mapping
-        df.loc[indices, "description"] = results
+        df.loc[indices, "description"] = summaries
+
+        await self._save_summaries(records)
         return df
 
-    async def _throttled_summarize(self, identifier: str, descriptions: List[str], is_entity: bool) -> str:        
+    def _plan(
+        self,
+        position: int,
+        identifier: str,
+        fragments: List[str],
+        stored: Optional[DescriptionSummary]
+    ) -> Tuple[Optional[str], Optional[SummaryJob]]:
         """
-        Core logic for synthesizing descriptions with concurrency control.
-        
-        Optimization:
-        1. Returns early if the description list is empty or already contains a single item.
-        2. Deduplicates and sorts the input descriptions to maximize cache hits and 
-           ensure output stability.
-        3. Wraps the LLM call in an 'async with self.semaphore' block to prevent 
-           RateLimitErrors.
+        Decides how an object gets its summary, returning (known summary, job to run).
+
+        1. Zero or one fragment -> used as-is.
+        2. Same fragment set as the stored one -> stored summary, no call.
+        3. Stored fragments are a subset of the new set -> incremental update with the new fragments.
+        4. Otherwise -> full summarization.
         """
-       
-        if not descriptions: 
-            return ""
-        
+        if len(fragments) <= 1:
+            return (fragments[0] if fragments else ""), None
 
-        
-        if isinstance(descriptions, str):
-            desc_list = [d.strip() for d in descriptions.split("|") if d.strip()]
-        elif isinstance(descriptions, list): #Fallback
-            desc_list = descriptions
-        else: #Fallback 2
-            desc_list = [str(descriptions)]
+        if stored and stored.fragments_hash == self._fragments_hash(fragments):
+            logger.debug(f"📝 Stored summary reused for '{identifier}'.")
+            return stored.summary, None
 
-        # Grounding optimization: If only one description exists, no synthesis needed
-        unique_descriptions = sorted(set(filter(None, desc_list)))
-        
-        if len(unique_descriptions) <= 1:
-            return unique_descriptions[0] if unique_descriptions else ""
-        
+        if stored and stored.summary and set(stored.fragments) < set(fragments):
+            known = set(stored.fragments)
+            new_fragments = [f for f in fragments if f not in known]
+            return None, SummaryJob(position, identifier, new_fragments, stored.summary)
+
+        return None, SummaryJob(position, identifier, fragments)
+
+    async def _run_jobs(self, jobs: List[SummaryJob], is_entity: bool) -> Dict[int, Optional[str]]:
+        """
+        Runs the jobs: small full summaries in packed prompts, the others one by one,
+        then a per-item retry for every subject a batch did not answer.
+
+        Returns:
+            {position: summary or None on failure}.
+        """
+        if not jobs:
+            return {}
+
+        tokens = self._count_tokens([j for j in jobs if j.previous_summary is None])
+        small = [j for j in jobs if j.position in tokens and tokens[j.position] <= SUMMARY_BATCH_ITEM_MAX_TOKENS]
+        batches = [b for b in self._pack(small, tokens) if len(b) > 1]
+        batched_positions = {j.position for b in batches for j in b}
+        single = [j for j in jobs if j.position not in batched_positions]
+
+        batch_answers, single_answers = await asyncio.gather(
+            asyncio.gather(*[self._ask_batch(b, is_entity) for b in batches]),
+            asyncio.gather(*[self._ask_job(j, is_entity) for j in single])
+        )
+
+        answers: Dict[int, Optional[str]] = dict(zip([j.position for j in single], single_answers))
+        missing = []
+        for batch, batch_answer in zip(batches, batch_answers):
+            for job in batch:
+                if job.position in batch_answer:
+                    answers[job.position] = batch_answer[job.position]
+                else:
+                    missing.append(job)
+
+        if batches:
+            logger.info(
+                f"📦 {len(batched_positions)} summaries packed into {len(batches)} prompts "
+                f"({len(single)} single calls, {len(missing)} retries)."
+            )
+
+        if missing:
+            retries = await asyncio.gather(*[self._ask_job(j, is_entity) for j in missing])
+            answers.update(zip([j.position for j in missing], retries))
+
+        return answers
+
+    def _pack(self, jobs: List[SummaryJob], job_tokens: Dict[int, int]) -> List[List[SummaryJob]]:
+        """Greedy packing in input order, bounded by the token budget and the item count."""
+        batches, current, current_tokens = [], [], 0
+        for job in jobs:
+            tokens = job_tokens[job.position]
+            if current and (current_tokens + tokens > SUMMARY_BATCH_TOKEN_BUDGET or len(current) >= SUMMARY_BATCH_MAX_ITEMS):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(job)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _ask_batch(self, batch: List[SummaryJob], is_entity: bool) -> Dict[int, str]:
+        """
+        One LLM call for several subjects, demultiplexed from the JSON answer.
+        Subjects use short keys (S0, S1, ...) so the model cannot alter them.
+
+        Returns:
+            {position: summary} for every subject correctly answered.
+        """
+        keys = {f"S{i}": job for i, job in enumerate(batch)}
+        subjects = "\n\n".join(
+            f"[{key}] Subject: {job.identifier}\nDescription List:\n- " + "\n- ".join(job.fragments)
+            for key, job in keys.items()
+        )
+
+        system_p = (ENTITY_SUMMARIZE_SYSTEM_PROMPT if is_entity 
+                    else RELATIONSHIP_SUMMARIZE_SYSTEM_PROMPT).format(max_length=MAX_SUMMARY_LENGTH)
+        user_p = BATCH_SUMMARIZE_USER_PROMPT.format(subjects=subjects)
+
+        async with self.semaphore:
+            logger.info(f"🤖 Summarizing {len(batch)} subjects in one prompt...")
+            try:
+                result = await self.llm.ask_json(system_prompt=system_p, user_prompt=user_p)
+            except Exception as e:
+                logger.error(f"❌ Batched summarization failed ({len(batch)} subjects): {e}")
+                return {}
+
+        if not isinstance(result, dict):
+            logger.warning("⚠️ Batched summarization did not return a JSON object.")
+            return {}
+
+        answers = {}
+        for key, job in keys.items():
+            summary = result.get(key)
+            if isinstance(summary, str) and summary.strip():
+                answers[job.position] = summary.strip()
+        return answers
+
+    async def _ask_job(self, job: SummaryJob, is_entity: bool) -> Optional[str]:
+        return await self._ask_summary(job.identifier, job.fragments, is_entity, job.previous_summary)
+
+    async def _ask_summary(
+        self,
+        identifier: str,
+        fragments: List[str],
+        is_entity: bool,
+        previous_summary: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Single throttled LLM call. With a previous summary, only the new fragments are
+        sent and folded into it. Returns None on failure.
+        """
         async with self.semaphore:
-            logger.info(f"🤖 Summarizing '{identifier}' ({len(descriptions)} fragments)...")
+            mode = "Updating" if previous_summary else "Summarizing"
+            logger.info(f"🤖 {mode} '{identifier}' ({len(fragments)} fragments)...")
 
             
             # Selection of the prompt according to the nature of the object
             system_p = (ENTITY_SUMMARIZE_SYSTEM_PROMPT if is_entity 
                         else RELATIONSHIP_SUMMARIZE_SYSTEM_PROMPT).format(max_length=MAX_SUMMARY_LENGTH)
             
-            user_p = COMMON_SUMMARIZE_USER_PROMPT.format(
-                target_name=identifier,
-                description_list="\n- ".join(unique_descriptions)
-            )
+            if previous_summary:
+                user_p = INCREMENTAL_SUMMARIZE_USER_PROMPT.format(
+                    target_name=identifier,
+                    current_summary=previous_summary,
+                    description_list="\n- ".join(fragments)
+                )
+            else:
+                user_p = COMMON_SUMMARIZE_USER_PROMPT.format(
+                    target_name=identifier,
+                    description_list="\n- ".join(fragments)
+                )
             
             try:
-                summary = await self.llm.ask_text(system_prompt=system_p, user_prompt=user_p)
-                return summary
+                return await self.llm.ask_text(system_prompt=system_p, user_prompt=user_p)
             except Exception as e:
                 logger.error(f"❌ Failed to summarize '{identifier}': {e}")
-                return " ".join(unique_descriptions[:2]) # Fallback : We join the first two descriptions in a single string
\ No newline at end of file
+                return None
+
+    async def _load_summaries(self, object_ids: List[str]) -> Dict[str, DescriptionSummary]:
+        """Bulk read of the stored summaries (a store failure only costs extra LLM calls)."""
+        if not self.store or not object_ids:
+            return {}
+        try:
+            return await self.store.get_summaries(object_ids, SUMMARY_PROMPT_VERSION)
+        except Exception as e:
+            logger.error(f"❌ Summary store lookup failed: {e}")
+            return {}
+
+    async def _save_summaries(self, records: List[DescriptionSummary]):
+        if not self.store or not records:
+            return
+        try:
+            await self.store.save_summaries(records)
+        except Exception as e:
+            logger.error(f"❌ Failed to persist {len(records)} summaries: {e}")
+
+    @staticmethod
+    def _clean_fragments(descriptions) -> List[str]:
+        """Splits, strips, deduplicates and sorts description fragments."""
+        if not isinstance(descriptions, (str, list)) and pd.isna(descriptions):
+            return []
+
+        if isinstance(descriptions, str):
+            desc_list = [d.strip() for d in descriptions.split("|") if d.strip()]
+        elif isinstance(descriptions, list): #Fallback
+            desc_list = [str(d).strip() for d in descriptions]
+        else: #Fallback 2
+            desc_list = [str(descriptions)]
+
+        return sorted(set(filter(None, desc_list)))
+
+    @staticmethod
+    def _count_tokens(jobs: List[SummaryJob]) -> Dict[int, int]:
+        """Prompt tokens of each job's subject and fragments (LLM tokenizer, one batched call)."""
+        texts = [f"{job.identifier}\n" + "\n".join(f"- {f}" for f in job.fragments) for job in jobs]
+        counts = TokenizerRegistry.count_tokens(texts, LLM_TOKENIZER_NAME)
+        return {job.position: count for job, count in zip(jobs, counts)}
+
+    @staticmethod
+    def _fragments_hash(fragments: List[str]) -> str:
+        return hashlib.sha256("\x1f".join(fragments).encode("utf-8")).hexdigest()
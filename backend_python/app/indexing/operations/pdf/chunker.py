@@ -1,7 +1,7 @@
 from docling.chunking import HybridChunker
 from docling_core.transforms.chunker.tokenizer.huggingface import HuggingFaceTokenizer
-from transformers import AutoTokenizer
 from app.core.config.ingestion_config import CHUNK_SIZE, CHUNK_OVERLAP
+from app.services.tokenizer_registry import TokenizerRegistry
 
 import logging
 logger = logging.getLogger(__name__)
@@ -17,10 +17,10 @@ class DocumentChunker:
 
     def __init__(self):
         """
-        Initializes the chunker with the BGE-M3 tokenizer for precise token counting.
+        Initializes the chunker with the shared embedding tokenizer for precise token counting.
         """ #TODO it is not working, the tokens limit are not respected by the chunker, not a real problem because of the text_splitter though...
 
-        self.hf_tokenizer = AutoTokenizer.from_pretrained("BAAI/bge-m3")
+        self.hf_tokenizer = TokenizerRegistry.get()
         self.tokenizer = HuggingFaceTokenizer(tokenizer=self.hf_tokenizer)
         self.chunker = HybridChunker(
             tokenizer=self.tokenizer,
@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+from app.core.config.ingestion_config import (
+    CONVERSION_MAX_TASKS_PER_WORKER, CONVERSION_USE_PROCESS_POOL, CONVERSION_WORKERS, CONVERTER_WARM_ON_STARTUP,
+    STREAMING_CONVERSION, STREAMING_WINDOW_PAGES
+)
+from app.core.data_model.text_units import TextUnit
+from app.indexing.operations.pdf.chunker import DocumentChunker
+from app.indexing.operations.pdf.loader import DocumentLoader
+from app.indexing.operations.pdf.sharding import (
+    PageRange, Segment, classify_pages, page_count, plan_segments, plan_windows, stitch_units
+)
+from app.indexing.operations.pdf.spatial_processor import SpatialProcessor
+from app.indexing.operations.storage_processor import ImageStorageProcessor
+from app.indexing.operations.text.metadata_refiner import MetadataRefiner
+from app.indexing.operations.text.text_splitter import TextSplitter
+from app.services.storage.minio_storage import MinioStorage
+from app.services.tokenizer_registry import TokenizerRegistry
+
+logger = logging.getLogger(__name__)
+
+def build_text_units(
+    file_path: str,
+    identity_text: Optional[str] = None,
+    segments: Optional[List[Segment]] = None
+) -> List[TextUnit]:
+    """
+    CPU-bound part of the TextUnit workflow (blocking, runs inside a conversion worker).
+    Segments are planned from the per-page OCR classification unless given.
+
+    Returns:
+        List[TextUnit]: Units ready for asset persistence (empty when chunking fails).
+    """
+    segments = segments or plan_segments(classify_pages(file_path))
+    units = stitch_units([convert_segment(file_path, page_range, do_ocr) for page_range, do_ocr in segments])
+    return finalize_units(units, identity_text) if units else []
+
+
+def convert_segment(file_path: str, page_range: Optional[PageRange] = None, do_ocr: bool = False) -> List[TextUnit]:
+    """
+    Converts one segment. In streaming mode, the segment is converted as consecutive
+    windows of STREAMING_WINDOW_PAGES pages: each window's figures are uploaded and its
+    document released before the next one starts, so the worker's peak memory depends
+    on the window size, not on the page count. Only the TextUnits are kept.
+    """
+    if not STREAMING_CONVERSION:
+        return convert_units(file_path, page_range, do_ocr)
+
+    first, last = page_range or (1, page_count(file_path))
+    windows = plan_windows(first, last, STREAMING_WINDOW_PAGES)
+    if len(windows) == 1:
+        return convert_units(file_path, page_range, do_ocr)
+
+    logger.info(f"🌊 Streaming conversion of pages {first}-{last} in {len(windows)} windows.")
+    return stitch_units([convert_units(file_path, window, do_ocr) for window in windows])
+
+
+def convert_units(file_path: str, page_range: Optional[PageRange] = None, do_ocr: bool = False) -> List[TextUnit]:
+    """
+    1. Technical Conversion: PDF (or one page range of it) to structured Document (Docling),
+       with OCR only when the pages of the range need it.
+    2. Layout-Aware Chunking: Initial breakdown respecting document geometry.
+    3. Spatial Enrichment: Anchoring images/tables to text via BBox analysis.
+    4. Asset Persistence: Rendering the linked images and offloading them to MinIO storage.
+    """
+    # 1. Technical Loading & Conversion
+    # Warm converter leased from the process-wide pool (no model reload per file)
+    pages = f" (pages {page_range[0]}-{page_range[1]}, OCR: {do_ocr})" if page_range else f" (OCR: {do_ocr})"
+    with DocumentLoader.get_converter(DocumentLoader.get_options(do_ocr)) as converter:
+        logger.info(f"⏳ Converting PDF to structured format (Docling){pages}...")
+        if page_range:
+            # Page numbers and bboxes stay those of the original file
+            result = converter.convert(file_path, page_range=page_range)
+        else:
+            result = converter.convert(file_path)
+    doc = result.document
+    logger.info(f"✅ Technical conversion successful{pages}.")
+
+    # 2. Layout-Aware Chunking
+    chunker = DocumentChunker()
+    dl_chunks = chunker.chunk(doc)
+    if not dl_chunks:
+        logger.error(f"❌ DocumentChunker returned 0 chunks for {file_path}{pages}.")
+        return []
+
+    # 3. Spatial Enrichment (Images & Tables)
+    spatial_proc = SpatialProcessor()
+    units = spatial_proc.enrich_with_spatial_data(doc, dl_chunks)
+    logger.info(f"📍 Spatial enrichment completed: {len(units)} units created.")
+
+    # 4. Asset Persistence: linked pictures rendered one at a time while the document is alive,
+    # uploaded to MinIO, and only their URLs leave the worker
+    has_images = any(unit.metadata.get("docling_images") for unit in units)
+    if has_images:
+        logger.info("☁️ Persisting visual assets to MinIO...")
+    storage_proc = ImageStorageProcessor(MinioStorage() if has_images else None, doc=doc)
+    return asyncio.run(storage_proc.process(units))
+
+
+def finalize_units(units: List[TextUnit], identity_text: Optional[str] = None) -> List[TextUnit]:
+    """
+    5. Metadata Refinement: Cleaning titles and propagating contextual headings.
+    6. Token Safety Splitting: Ensuring units fit within embedding context windows.
+    """
+    # 5. Metadata Refinement (Headings & Heritage)
+    valid_titles = MetadataRefiner.extract_titles_from_identity(identity_text) if identity_text else []
+    refiner = MetadataRefiner(valid_titles=valid_titles)
+    refined_units = refiner.refine_units(units)
+
+    # 6. Final Sub-splitting (Token limits management)
+    # We use a tighter limit (800) here to be safe for diverse embedding models
+    splitter = TextSplitter(max_tokens=800, overlap=120)
+    return splitter.split_units(refined_units)
+
+
+def _init_worker():
+    """Conversion worker startup: logging, then the Docling models and the tokenizer loaded once for the worker's lifetime."""
+    logging.basicConfig(level=logging.INFO, format=f"[conversion-{os.getpid()}] %(levelname)s %(name)s: %(message)s")
+    if CONVERTER_WARM_ON_STARTUP:
+        try:
+            DocumentLoader.warm_up()
+            TokenizerRegistry.get()  # Chunker and splitter tokenizer
+        except Exception as e:
+            logger.error(f"❌ Worker warm-up failed, converters will be built on first use: {e}")
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class ConversionExecutor:
+    """
+    Runs the CPU-bound conversion and chunking stages outside the event loop.
+
+    Docling conversion holds the GIL for minutes on large PDFs: in the API process
+    it would freeze every other request, health checks included. Documents are
+    therefore converted in a dedicated pool of worker processes, each one keeping
+    its own warm converters; several documents convert in parallel on multi-core
+    hosts and the resulting TextUnits come back pickled (with image URLs, never
+    image bitmaps: pictures are uploaded from the worker that holds the document).
+
+    Workers are started with 'spawn' (no forked copy of the API's event loop or
+    connections) and recycled after CONVERSION_MAX_TASKS_PER_WORKER documents to
+    cap native memory growth. With CONVERSION_USE_PROCESS_POOL disabled, the stages
+    run in a thread instead (same API, no parallelism).
+
+    Large PDFs (SHARD_MIN_PAGES and more) are split into page ranges converted by
+    several workers at once, so a single book uses every worker instead of one core.
+    Ranges of scanned pages are converted with OCR, the others without.
+    """
+
+    _executor: Optional[Executor] = None
+
+    @classmethod
+    def get_executor(cls) -> Executor:
+        if cls._executor is None:
+            cls._executor = ProcessPoolExecutor(
+                max_workers=CONVERSION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                max_tasks_per_child=CONVERSION_MAX_TASKS_PER_WORKER,
+            )
+            logger.info(f"🏭 Conversion process pool started ({CONVERSION_WORKERS} workers).")
+        return cls._executor
+
+    @classmethod
+    async def run(cls, file_path: str, identity_text: Optional[str] = None) -> List[TextUnit]:
+        """Converts, chunks and splits a document without blocking the event loop."""
+        if not CONVERSION_USE_PROCESS_POOL:
+            return await asyncio.to_thread(build_text_units, file_path, identity_text)
+
+        loop = asyncio.get_running_loop()
+        try:
+            segments = plan_segments(await asyncio.to_thread(classify_pages, file_path))
+            if len(segments) == 1:
+                return await loop.run_in_executor(cls.get_executor(), build_text_units, file_path, identity_text, segments)
+
+            # Large book or mixed digital / scanned pages: segments converted in parallel, stitched in page order
+            logger.info(f"🪓 Converting {file_path} as {len(segments)} page-range segments.")
+            executor = cls.get_executor()
+            shards = await asyncio.gather(*[
+                loop.run_in_executor(executor, convert_segment, file_path, page_range, do_ocr)
+                for page_range, do_ocr in segments
+            ])
+            units = stitch_units(list(shards))
+            if not units:
+                return []
+            return await loop.run_in_executor(executor, finalize_units, units, identity_text)
+        except BrokenProcessPool:
+            # A worker died (OOM kill, native crash): the next document gets a fresh pool
+            logger.error(f"💥 Conversion worker crashed on {file_path}, restarting the pool.")
+            cls.shutdown(wait=False)
+            raise
+
+    @classmethod
+    async def warm_up(cls):
+        """Starts the workers (and their model loading) ahead of the first upload."""
+        if not CONVERSION_USE_PROCESS_POOL:
+            await asyncio.to_thread(DocumentLoader.warm_up)
+            return
+        loop = asyncio.get_running_loop()
+        executor = cls.get_executor()
+        pids = await asyncio.gather(*[loop.run_in_executor(executor, _ping) for _ in range(CONVERSION_WORKERS)])
+        logger.info(f"🔥 Conversion workers ready: {sorted(set(pids))}")
+
+    @classmethod
+    def shutdown(cls, wait: bool = True):
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=wait, cancel_futures=True)
+            cls._executor = None
@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
+
+from app.core.config.ingestion_config import CONVERTER_POOL_MAX, CONVERTER_POOL_MAX_IDLE
+
+import logging
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class ConverterOptions:
+    """Pipeline options that require a distinct converter (the pool key)."""
+    do_ocr: bool = False
+    do_table_structure: bool = True
+    generate_page_images: bool = True
+    generate_picture_images: bool = False
+
+    def label(self) -> str:
+        return (
+            f"OCR: {self.do_ocr}, Tables: {self.do_table_structure}, "
+            f"Page images: {self.generate_page_images}, Picture images: {self.generate_picture_images}"
+        )
+
+
+class ConverterPool:
+    """
+    Keeps warm converters across ingestions, keyed by their pipeline options.
+
+    Building a Docling DocumentConverter and its first pipeline loads the layout,
+    table-structure and OCR models, which costs seconds; a pooled converter pays it
+    once per process. A converter is leased to one conversion at a time.
+
+    Memory is bounded by `max_converters` (idle + leased, all option sets). When
+    the limit is reached, an idle converter of another option set is evicted (least
+    recently used first); if every converter is leased, the caller waits.
+
+    clear() starts a new generation: idle converters are dropped at once, leased
+    ones when they are returned, so no converter built before the clear is reused.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[ConverterOptions], Any],
+        max_converters: int = CONVERTER_POOL_MAX,
+        max_idle_per_options: int = CONVERTER_POOL_MAX_IDLE
+    ):
+        """
+        Args:
+            factory: Builds a ready-to-use (initialized) converter for the given options.
+            max_converters: Upper bound on the converters alive at once.
+            max_idle_per_options: Idle converters kept for one option set.
+        """
+        self.factory = factory
+        self.max_converters = max(1, max_converters)
+        self.max_idle_per_options = max(1, max_idle_per_options)
+
+        self._idle: "OrderedDict[ConverterOptions, List[Any]]" = OrderedDict()
+        self._alive = 0
+        self._generation = 0
+        self._condition = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        """Converters alive (idle + leased)."""
+        return self._alive
+
+    def idle_count(self, options: ConverterOptions = None) -> int:
+        with self._condition:
+            if options is not None:
+                return len(self._idle.get(options, []))
+            return sum(len(v) for v in self._idle.values())
+
+    @contextmanager
+    def lease(self, options: ConverterOptions) -> Iterator[Any]:
+        """Lends a converter for the given options, returned to the pool on exit."""
+        converter, generation = self._acquire(options)
+        try:
+            yield converter
+        finally:
+            # A failed conversion (corrupt file) leaves the converter reusable
+            self._release(options, converter, generation)
+
+    def warm(self, options_list: Iterable[ConverterOptions]):
+        """Builds one idle converter per option set (application startup)."""
+        for options in options_list:
+            if self.idle_count(options):
+                continue
+            start = time.perf_counter()
+            with self.lease(options):
+                pass
+            logger.info(f"🔥 Docling converter warmed ({options.label()}) in {time.perf_counter() - start:.1f}s.")
+
+    def clear(self):
+        """Drops every idle converter (leased ones are dropped on return)."""
+        with self._condition:
+            self._generation += 1
+            dropped = sum(len(v) for v in self._idle.values())
+            self._idle.clear()
+            self._alive -= dropped
+            self._condition.notify_all()
+
+    def _acquire(self, options: ConverterOptions) -> Tuple[Any, int]:
+        """A converter for the options and the pool generation it belongs to."""
+        with self._condition:
+            while True:
+                idle = self._idle.get(options)
+                if idle:
+                    self._idle.move_to_end(options)
+                    return idle.pop(), self._generation
+                if self._alive < self.max_converters or self._evict_one():
+                    self._alive += 1
+                    generation = self._generation
+                    break
+                logger.debug(f"⏳ Converter pool exhausted ({self._alive} alive), waiting...")
+                self._condition.wait()
+
+        # Built outside the lock: model loading takes seconds
+        try:
+            logger.info(f"⚙️ Building Docling converter ({options.label()})")
+            return self.factory(options), generation
+        except BaseException:
+            self._discard()
+            raise
+
+    def _release(self, options: ConverterOptions, converter: Any, generation: int):
+        with self._condition:
+            idle = self._idle.setdefault(options, [])
+            self._idle.move_to_end(options)
+            if generation == self._generation and len(idle) < self.max_idle_per_options:
+                idle.append(converter)
+            else:
+                self._alive -= 1
+            self._condition.notify()
+
+    def _discard(self):
+        with self._condition:
+            self._alive -= 1
+            self._condition.notify()
+
+    def _evict_one(self) -> bool:
+        """Drops the least recently used idle converter. Caller holds the lock."""
+        for key, idle in self._idle.items():
+            if idle:
+                idle.pop(0)
+                self._alive -= 1
+                logger.debug(f"♻️ Evicted an idle converter ({key.label()}) to stay within the pool limit.")
+                return True
+        return False
@@ -1,8 +1,13 @@
-import fitz
+from contextlib import contextmanager
+from typing import Iterator
+
 from docling.datamodel.base_models import InputFormat
 from docling.datamodel.pipeline_options import PdfPipelineOptions
 from docling.document_converter import DocumentConverter, PdfFormatOption
 
+from app.core.config.ingestion_config import CONVERTER_WARM_OCR, STREAMING_CONVERSION
+from app.indexing.operations.pdf.converter_pool import ConverterOptions, ConverterPool
+
 import logging
 logger = logging.getLogger(__name__)
 
@@ -10,64 +15,77 @@ class DocumentLoader:
     """
     Handles the technical conversion of raw files into structured Docling documents.
     
-    This loader acts as the ingestion gateway, determining the necessary 
-    processing depth (Standard vs. OCR) based on the document's internal structure.
+    This loader acts as the ingestion gateway: each page range is converted with
+    the processing depth (Standard vs. OCR) its pages require, as decided per page
+    by sharding.classify_pages.
+
+    Converters come from a process-wide pool: their models are loaded once
+    (ideally at startup, see warm_up) and reused by every ingestion.
     """
+
+    _pool: ConverterPool = None
     
     @staticmethod
-    def needs_ocr(file_path: str) -> bool:
+    def build_converter(options: ConverterOptions) -> DocumentConverter:
         """
-        Detects if a PDF is likely a scan by analyzing its native text content.
-        
-        It inspects the first 3 pages. If the average text density is below 
-        a certain threshold, it assumes OCR is required to extract meaning.
-        
-        Args:
-            file_path: Path to the PDF file.
-        Returns:
-            bool: True if OCR should be enabled, False otherwise.
+        Builds a DocumentConverter and loads its PDF pipeline models right away,
+        so that the first conversion does not pay for them.
         """
-        try:
-            with fitz.open(file_path) as doc:
-                # We analyze the first few pages to form a representative sample
-                for page in list(doc)[:3]: 
-                    text_content = page.get_text().strip()
-                    if len(text_content) > 50:
-                        logger.debug(f"📄 Native text found on page {page.number}. OCR not strictly required.")
-                        return False
-            
-            logger.warning(f"📸 No significant native text found in {file_path}. Enabling OCR mode.")
-            return True
-        except Exception as e:
-            logger.error(f"❌ Error during OCR detection for {file_path}: {e}")
-            return False
+        pipeline_options = PdfPipelineOptions()
+        pipeline_options.do_ocr = options.do_ocr
+        pipeline_options.do_table_structure = options.do_table_structure
+        # Downstream figure extraction needs either the page bitmaps (kept for the whole
+        # document) or the figures cropped during conversion (page bitmaps released per batch)
+        pipeline_options.generate_page_images = options.generate_page_images
+        pipeline_options.generate_picture_images = options.generate_picture_images
+
+        converter = DocumentConverter(
+            format_options={
+                InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)
+            }
+        )
+        converter.initialize_pipeline(InputFormat.PDF)
+        return converter
+
+    @classmethod
+    def get_pool(cls) -> ConverterPool:
+        if cls._pool is None:
+            cls._pool = ConverterPool(factory=cls.build_converter)
+        return cls._pool
 
     @classmethod
-    def get_converter(cls, file_path: str) -> DocumentConverter:
+    @contextmanager
+    def get_converter(cls, options: ConverterOptions) -> Iterator[DocumentConverter]:
         """
-        Configures and returns a DocumentConverter tailored to the specific file.
-        
-        The configuration includes table structure recognition and image 
-        generation, while dynamically toggling the OCR engine based on 
-        the file's nature.
-        
+        Lends a warm DocumentConverter configured with the given pipeline options.
+
+        Usage:
+            with DocumentLoader.get_converter(DocumentLoader.get_options(do_ocr=True)) as converter:
+                result = converter.convert(path, page_range=(12, 40))
+
         Args:
-            file_path: Path to the document to be converted.
-        Returns:
-            A configured DocumentConverter instance.
+            options: Pipeline options of the pages to convert (OCR on/off, tables, page images).
+        Yields:
+            A configured DocumentConverter instance, returned to the pool afterwards.
         """
-        ocr_enabled = cls.needs_ocr(file_path)
-        
-        logger.info(f"⚙️ Configuring Docling pipeline (OCR: {ocr_enabled}, Tables: True)")
-        
-        options = PdfPipelineOptions()
-        options.do_ocr = ocr_enabled
-        options.do_table_structure = True
-        options.generate_page_images = True # Required for downstream image/figure extraction
-        
         # Note: OCR might significantly increase processing time
-        return DocumentConverter(
-            format_options={
-                InputFormat.PDF: PdfFormatOption(pipeline_options=options)
-            }
-        )
\ No newline at end of file
+        with cls.get_pool().lease(options) as converter:
+            yield converter
+
+    @staticmethod
+    def get_options(do_ocr: bool = False) -> ConverterOptions:
+        """
+        Pipeline options of a conversion. In streaming mode, figures are cropped while
+        each page is processed and page bitmaps are not retained in the document.
+        """
+        if STREAMING_CONVERSION:
+            return ConverterOptions(do_ocr=do_ocr, generate_page_images=False, generate_picture_images=True)
+        return ConverterOptions(do_ocr=do_ocr)
+
+    @classmethod
+    def warm_up(cls):
+        """Preloads the converters used by most ingestions (blocking: run it off the event loop)."""
+        options = [cls.get_options(do_ocr=False)]
+        if CONVERTER_WARM_OCR:
+            options.append(cls.get_options(do_ocr=True))
+        cls.get_pool().warm(options)
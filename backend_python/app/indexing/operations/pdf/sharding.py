@@ -0,0 +1,164 @@
+import logging
+from typing import List, Optional, Tuple
+
+import fitz
+
+from app.core.config.ingestion_config import (
+    OCR_MIN_IMAGE_COVERAGE, OCR_MIN_TEXT_CHARS, OCR_MIN_TEXT_RUN, SHARD_MIN_PAGES, SHARD_PAGES
+)
+from app.core.data_model.text_units import TextUnit
+
+logger = logging.getLogger(__name__)
+
+PageRange = Tuple[int, int]
+# A page range converted with one pipeline: (range or None for the whole file, OCR enabled)
+Segment = Tuple[Optional[PageRange], bool]
+
+def page_count(file_path: str) -> int:
+    with fitz.open(file_path) as doc:
+        return doc.page_count
+
+
+def plan_page_ranges(
+    num_pages: int,
+    min_pages: int = SHARD_MIN_PAGES,
+    pages_per_shard: int = SHARD_PAGES
+) -> List[Optional[PageRange]]:
+    """
+    Splits a document into contiguous page ranges (1-based, inclusive, as Docling's
+    `page_range`). Documents under `min_pages` are not sharded: [None].
+    A short tail is merged into the previous shard.
+    """
+    if num_pages < max(min_pages, 2) or pages_per_shard <= 0:
+        return [None]
+
+    starts = list(range(1, num_pages + 1, pages_per_shard))
+    if len(starts) > 1 and num_pages - starts[-1] + 1 < pages_per_shard // 2:
+        starts.pop()
+    ends = [s - 1 for s in starts[1:]] + [num_pages]
+    return list(zip(starts, ends))
+
+
+def plan_windows(first: int, last: int, window_pages: int) -> List[PageRange]:
+    """Consecutive windows of at most `window_pages` pages covering [first, last]."""
+    window_pages = max(1, window_pages)
+    return [(start, min(start + window_pages - 1, last)) for start in range(first, last + 1, window_pages)]
+
+
+def classify_pages(
+    file_path: str,
+    min_text_chars: int = OCR_MIN_TEXT_CHARS,
+    min_image_coverage: float = OCR_MIN_IMAGE_COVERAGE
+) -> List[bool]:
+    """
+    Decides, page by page, whether OCR is needed.
+
+    A page needs OCR when it has (almost) no native text and most of it is covered
+    by images: a scanned page or a photographed manuscript. Blank pages and digital
+    pages with illustrations do not.
+
+    Returns:
+        One flag per page (True = OCR). Empty when the file cannot be inspected.
+    """
+    flags = []
+    try:
+        with fitz.open(file_path) as doc:
+            for page in doc:
+                text_chars = len(page.get_text().strip())
+                if text_chars >= min_text_chars:
+                    flags.append(False)
+                    continue
+                page_area = abs(page.rect) or 1.0
+                image_area = sum(abs(fitz.Rect(info["bbox"]) & page.rect) for info in page.get_image_info())
+                flags.append(image_area / page_area >= min_image_coverage)
+    except Exception as e:
+        logger.error(f"❌ Error during OCR detection for {file_path}: {e}")
+        return []
+
+    if any(flags):
+        logger.info(f"📸 {sum(flags)}/{len(flags)} pages of {file_path} need OCR.")
+    return flags
+
+
+def plan_segments(
+    ocr_flags: List[bool],
+    min_pages: int = SHARD_MIN_PAGES,
+    pages_per_shard: int = SHARD_PAGES,
+    min_text_run: int = OCR_MIN_TEXT_RUN
+) -> List[Segment]:
+    """
+    Groups pages into contiguous segments converted with one pipeline each: OCR runs
+    only on the segments made of scanned pages. A digital run shorter than
+    `min_text_run` between scans is OCRed with them rather than becoming its own
+    segment. Large documents are additionally cut into shards (plan_page_ranges).
+
+    Returns:
+        [(None, ocr)] when a single pipeline covers the whole file, else the
+        (page range, ocr) segments in page order.
+    """
+    num_pages = len(ocr_flags)
+    if not num_pages:
+        return [(None, False)]
+
+    # Runs of consecutive pages with the same flag: [start, end, ocr] (1-based, inclusive)
+    runs = []
+    for page_no, ocr in enumerate(ocr_flags, start=1):
+        if runs and runs[-1][2] == ocr:
+            runs[-1][1] = page_no
+        else:
+            runs.append([page_no, page_no, ocr])
+
+    # Short digital islands between scans are absorbed, then equal neighbors merged
+    for i, run in enumerate(runs):
+        is_island = 0 < i < len(runs) - 1 and not run[2]
+        if is_island and run[1] - run[0] + 1 < min_text_run:
+            run[2] = True
+    merged = []
+    for run in runs:
+        if merged and merged[-1][2] == run[2]:
+            merged[-1][1] = run[1]
+        else:
+            merged.append(list(run))
+
+    if len(merged) == 1:
+        ocr = merged[0][2]
+        return [(page_range, ocr) for page_range in plan_page_ranges(num_pages, min_pages, pages_per_shard)]
+
+    segments: List[Segment] = []
+    shard = pages_per_shard if num_pages >= min_pages else num_pages
+    for start, end, ocr in merged:
+        for offset_range in plan_page_ranges(end - start + 1, min_pages=2, pages_per_shard=shard):
+            if offset_range is None:
+                segments.append(((start, end), ocr))
+            else:
+                segments.append(((start + offset_range[0] - 1, start + offset_range[1] - 1), ocr))
+    return segments
+
+
+def stitch_units(shards: List[List[TextUnit]]) -> List[TextUnit]:
+    """
+    Reassembles the units of page-range shards, in page order, as if the document
+    had been converted in one pass.
+
+    Page numbers and bboxes are already absolute (each shard is converted from the
+    original file with a page range). What a shard cannot know is the section it
+    starts in: its leading units without headings inherit the last headings of the
+    previous shard, as SpatialProcessor does within a shard. Unit ids are renumbered
+    over the whole document.
+    """
+    stitched: List[TextUnit] = []
+    for shard in shards:
+        previous_headings = stitched[-1].headings if stitched else []
+        inheriting = bool(previous_headings)
+
+        for unit in shard:
+            if inheriting and not unit.headings:
+                unit.headings = list(previous_headings)
+                unit.metadata["heading_full"] = " > ".join(previous_headings)
+            else:
+                inheriting = False
+            unit.id = f"chunk_{len(stitched)}"
+            stitched.append(unit)
+
+    logger.info(f"🧵 Stitched {len(shards)} shards into {len(stitched)} units.")
+    return stitched
@@ -1,10 +1,67 @@
 import re
-from typing import List, Dict, Any
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import List, Dict, Any, NamedTuple, Tuple
 from app.core.data_model.text_units import TextUnit
 
 import logging
 logger = logging.getLogger(__name__)
 
+# Tolerance of 100 units to 'glue' an image to its caption/text
+PROXIMITY_WINDOW = 100
+
+class ImageRef(NamedTuple):
+    """Lightweight pointer to a Docling picture, rendered only when it is uploaded."""
+    img_id: str
+    self_ref: str           # JSON pointer of the PictureItem in the document ('#/pictures/3')
+    page_no: int
+    bbox: Tuple[float, float, float, float]   # l, t, r, b
+
+
+class PictureIndex:
+    """
+    Per-page index of the document's pictures, sorted by their top coordinate.
+
+    Built once per document, so a chunk only looks at the pictures of its own pages
+    (binary search on the proximity window) instead of scanning every picture.
+    """
+
+    def __init__(self, doc):
+        self._tops: Dict[int, List[float]] = {}
+        self._refs: Dict[int, List[Tuple[int, ImageRef, Any]]] = {}
+
+        by_page = defaultdict(list)
+        for order, pic in enumerate(getattr(doc, "pictures", None) or []):
+            if not pic.prov:
+                continue
+            prov = pic.prov[0]
+            # Unique ID based on page and coordinates to avoid duplicate extraction
+            ref = ImageRef(
+                img_id=f"pg_{prov.page_no}_{prov.bbox.l}_{prov.bbox.t}",
+                self_ref=pic.self_ref,
+                page_no=prov.page_no,
+                bbox=(prov.bbox.l, prov.bbox.t, prov.bbox.r, prov.bbox.b),
+            )
+            by_page[prov.page_no].append((prov.bbox.t, order, ref, prov.bbox))
+
+        for page_no, entries in by_page.items():
+            entries.sort(key=lambda e: (e[0], e[1]))
+            self._tops[page_no] = [e[0] for e in entries]
+            self._refs[page_no] = [(order, ref, bbox) for _, order, ref, bbox in entries]
+
+    def __len__(self) -> int:
+        return sum(len(refs) for refs in self._refs.values())
+
+    def query(self, page_no: int, low: float = None, high: float = None) -> List[Tuple[int, ImageRef, Any]]:
+        """Pictures of a page whose top lies in [low, high] (the whole page without bounds)."""
+        refs = self._refs.get(page_no)
+        if not refs:
+            return []
+        if low is None:
+            return list(refs)
+        tops = self._tops[page_no]
+        return refs[bisect_left(tops, low):bisect_right(tops, high)]
+
 class SpatialProcessor:
     """
     Expert in spatial correlation between text chunks and visual elements.
@@ -31,6 +88,7 @@ class SpatialProcessor:
         enriched_units = []
         used_image_ids = set()
         current_active_headings = [] 
+        picture_index = PictureIndex(doc)
 
         for i, dl_chunk in enumerate(dl_chunks):
             # 1. Heading Management (Inheritance)
@@ -42,7 +100,7 @@ class SpatialProcessor:
             
             # 3. Image/Table Correlation
             images_found = SpatialProcessor._correlate_images(
-                doc, dl_chunk, chunk_pages, bbox, used_image_ids
+                picture_index, chunk_pages, bbox, used_image_ids
             )
             
             # 4. Table Detection (Markdown pattern matching)
@@ -61,56 +119,44 @@ class SpatialProcessor:
                 metadata={
                     "bbox": bbox,
                     "heading_full": " > ".join(current_active_headings),
-                    "docling_images": [True for _ in images_found] # Flag for presence
+                    "docling_images": images_found # ImageRefs, rendered at upload (ImageStorageProcessor)
                 }
             )
-            # Link PIL images to unit if your TextUnit model supports it, 
-            # otherwise encode to B64 here.
             enriched_units.append(unit)
         
         logger.info(f"✅ Spatial enrichment complete. {len(enriched_units)} units finalized.")
         return enriched_units
 
     @staticmethod
-    def _correlate_images(doc, dl_chunk, chunk_pages, bbox, used_image_ids) -> List[Any]:
+    def _correlate_images(picture_index: PictureIndex, chunk_pages, bbox, used_image_ids) -> List[ImageRef]:
         """
-        Extracts images located in immediate vertical proximity to a text chunk.
+        Finds the images located in immediate vertical proximity to a text chunk.
         
         Uses a 'proximity window' strategy: images within 100 units of the text's
-        vertical boundaries on the same page are considered contextually linked.
+        vertical boundaries on the same page are considered contextually linked;
+        a chunk on a single page takes every image of that page. Only the chunk's
+        pages are queried, and nothing is rendered here.
         """
         found = []
         c_min, c_max = bbox["top"], bbox["bottom"]
+        is_sole = len(chunk_pages) == 1 # If chunk covers full page
 
-        if not hasattr(doc, 'pictures') or not doc.pictures:
-            return found
+        candidates = []
+        for page_no in chunk_pages:
+            if is_sole:
+                candidates.extend(picture_index.query(page_no))
+            else:
+                candidates.extend(picture_index.query(page_no, c_min - PROXIMITY_WINDOW, c_max + PROXIMITY_WINDOW))
 
-        for pic in doc.pictures:
-            if not pic.prov: continue
-            
-            pic_prov = pic.prov[0]
-            # Unique ID based on page and coordinates to avoid duplicate extraction
-            img_id = f"pg_{pic_prov.page_no}_{pic_prov.bbox.l}_{pic_prov.bbox.t}"
-            
-            if img_id in used_image_ids: continue
-
-            if pic_prov.page_no in chunk_pages:
-                # Tolerance of 100 units to 'glue' the image to its caption/text
-                is_near = (c_min - 100) <= pic_prov.bbox.t <= (c_max + 100)
-                is_sole = len(chunk_pages) == 1 # If chunk covers full page
-                
-                if is_near or is_sole:
-                    if SpatialProcessor._is_image_a_table_duplicate(pic_prov.bbox, c_min, c_max):
-                        continue
-                    
-                    try:
-                        pil_image = pic.get_image(doc)
-                        if pil_image:
-                            found.append(pil_image)
-                            used_image_ids.add(img_id)
-                            logger.debug(f"🖼️ Linked image {img_id} to text via spatial proximity.")
-                    except Exception as e:
-                        logger.warning(f"⚠️ Failed to render correlated image {img_id}: {e}")
+        # Document order, as the pictures appear in the source
+        for _, ref, pic_bbox in sorted(candidates, key=lambda c: c[0]):
+            if ref.img_id in used_image_ids:
+                continue
+            if SpatialProcessor._is_image_a_table_duplicate(pic_bbox, c_min, c_max):
+                continue
+            found.append(ref)
+            used_image_ids.add(ref.img_id)
+            logger.debug(f"🖼️ Linked image {ref.img_id} to text via spatial proximity.")
         return found
 
     @staticmethod
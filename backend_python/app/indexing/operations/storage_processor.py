@@ -1,56 +1,90 @@
-from typing import List
+from typing import Any, List, Optional
 from app.core.data_model.text_units import TextUnit
 from PIL import Image
+from app.indexing.operations.pdf.spatial_processor import ImageRef
 from app.services.storage.base import BaseStorage
 
+import logging
+logger = logging.getLogger(__name__)
+
 class ImageStorageProcessor:
-    def __init__(self, storage_service: BaseStorage):
+    def __init__(self, storage_service: BaseStorage, doc: Optional[Any] = None):
+        """
+        Args:
+            storage_service: Stockage persistant des images.
+            doc: Document Docling source, requis pour rendre les ImageRef (rendu paresseux).
+        """
         self.storage = storage_service
+        self.doc = doc
 
     async def process(self, units: List[TextUnit]) -> List[TextUnit]:
         """
         Gère l'upload des images vers le stockage persistant et nettoie les binaires.
+
+        Les ImageRef ne sont rendues qu'ici, une par une, et libérées après l'upload :
+        seule une image à la fois est en mémoire.
         """
-        uploaded_cache = {} 
+        uploaded_cache = {}
 
         for unit in units:
+            if "docling_images" not in unit.metadata:
+                continue # Déjà traitée (ex. par le worker de conversion)
+
             docling_pics = unit.metadata.get("docling_images", [])
             urls = []
 
             for pic in docling_pics:
-                pic_id = id(pic)
-                
+                pic_id = pic.img_id if isinstance(pic, ImageRef) else id(pic)
+
                 # Gestion des doublons en cache (évite l'upload multiple du même logo)
                 if pic_id in uploaded_cache:
                     urls.append(uploaded_cache[pic_id])
                     continue
 
                 pil_img = self._extract_pil(pic)
-                
+
                 if pil_img is None:
                     continue
-                
+
                 # Sécurité : On accepte les images >= 150px (largeur ou hauteur)
                 if pil_img.size[0] >= 150 or pil_img.size[1] >= 150:
                     url = self.storage.upload_image(pil_img)
                     if url:
                         urls.append(url)
                         uploaded_cache[pic_id] = url
-            
+                del pil_img
+
             # Mise à jour des métadonnées finales
             unit.metadata["image_urls"] = urls
-            
+
             # Suppression du binaire Docling pour libérer la RAM
-            unit.metadata.pop("docling_images", None) 
+            unit.metadata.pop("docling_images", None)
 
         return units
+
     def _extract_pil(self, item):
 
+        if isinstance(item, ImageRef):
+            return self._render(item)
+
         if isinstance(item, Image.Image):
             return item
-            
+
         # Sécurité : si jamais un PictureItem de Docling s'est glissé là par erreur
         if hasattr(item, 'image') and hasattr(item.image, 'pil_image'):
             return item.image.pil_image
-            
-        return None
\ No newline at end of file
+
+        return None
+
+    def _render(self, ref: ImageRef):
+        """Rend une ImageRef à partir du document source ('#/pictures/3' -> doc.pictures[3])."""
+        if self.doc is None:
+            logger.warning(f"⚠️ No source document to render image {ref.img_id}, skipped.")
+            return None
+        try:
+            _, collection, index = ref.self_ref.split("/")
+            picture = getattr(self.doc, collection)[int(index)]
+            return picture.get_image(self.doc)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to render correlated image {ref.img_id}: {e}")
+            return None
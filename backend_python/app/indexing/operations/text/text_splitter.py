@@ -1,11 +1,17 @@
-from typing import List
-from transformers import AutoTokenizer
+import re
+from typing import List, Optional, Tuple
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from app.core.config.embedding_config import EMBEDDING_MODEL_NAME
 from app.core.data_model.text_units import TextUnit
+from app.services.tokenizer_registry import TokenizerRegistry
 
 import logging
 logger = logging.getLogger(__name__)
 
+# Cut preferences, best first: paragraph, line (table row), table cell, sentence, word
+SEPARATOR_PRIORITIES = 5
+SENTENCE_END = re.compile(r"[.!?؟۔…]['\")»]*\s*$")
+
 class TextSplitter:
     """
     Security splitter that recursively breaks down TextUnits exceeding token limits.
@@ -14,22 +20,29 @@ class TextSplitter:
     might still be too large for the embedding model's context window (e.g., BGE-M3).
     This class ensures all units are compliant while preserving metadata and 
     structural continuity.
+
+    Oversized texts are tokenized once with offset mapping and cut into exact token
+    windows, at the best separator boundary inside each window ('\\n\\n', '\\n', '|',
+    sentence end, word), with an exact token overlap. A line break always beats a
+    cell boundary, so table rows stay whole whenever one fits in a window. Without
+    a loadable tokenizer, a character-based splitter (~3 characters per token) is used.
     """
-    def __init__(self, max_tokens: int = 1200, overlap: int = 150):
+    def __init__(self, max_tokens: int = 1200, overlap: int = 150, tokenizer_name: str = EMBEDDING_MODEL_NAME):
         """
-        Initializes the splitter with the BGE-M3 tokenizer.
+        Initializes the splitter; token counts use the shared embedding tokenizer (TokenizerRegistry).
         
         Args:
             max_tokens: Maximum allowed tokens per unit.
             overlap: Token overlap between sub-chunks to preserve context.
+            tokenizer_name: Tokenizer of the embedding model the units must fit.
         """
         self.max_tokens = max_tokens
         self.overlap = overlap
+        self.tokenizer_name = tokenizer_name
         
         logger.debug(f"⚙️ Initializing TextSplitter (Max: {max_tokens} tokens, Overlap: {overlap})")
-        self.tokenizer = AutoTokenizer.from_pretrained("BAAI/bge-m3") #TODO have to centralize the configuration of the embedding model IN the config
         
-        # Langchain uses characters for size, but we target tokens. 
+        # Fallback when no tokenizer can be loaded: Langchain uses characters for size, but we target tokens.
         # Multiplier of 3 is a safe heuristic for BGE-M3 (chars to tokens ratio).
         self.langchain_splitter = RecursiveCharacterTextSplitter(
             chunk_size=max_tokens * 3,
@@ -56,22 +69,22 @@ class TextSplitter:
         
         logger.info(f"📏 Checking token limits for {len(units)} units...")
 
-        for unit in units:
+        # Accurate token counts, one batched call for all units
+        token_counts = TokenizerRegistry.count_tokens([unit.text or "" for unit in units], self.tokenizer_name)
+
+        for unit, token_count in zip(units, token_counts):
             text = unit.text or ""
             # Detect if this chunk was originally a table or contained one
             original_had_table = (len(unit.tables) > 0 or "|" in text)
             base_title = unit.metadata.get("heading_refined", "Sans titre")
 
-            # Accurate token count
-            token_count = len(self.tokenizer.encode(text))
-
             if token_count <= self.max_tokens:
                 final_units.append(unit)
                 continue
 
             # --- SPLIT REQUIRED ---
             split_count += 1
-            sub_texts = self.langchain_splitter.split_text(text)
+            sub_texts = self.split_text(text)
             num_sub_chunks = len(sub_texts)
             
             logger.debug(f"✂️ Splitting unit {unit.id} ({token_count} tokens) into {num_sub_chunks} sub-units.")
@@ -111,6 +124,7 @@ class TextSplitter:
                 # Images are usually kept with the first sub-chunk to avoid duplication
                 if i > 0:
                     new_unit.metadata["docling_images"] = []
+                    new_unit.metadata["image_urls"] = []
 
                 final_units.append(new_unit)
 
@@ -118,4 +132,89 @@ class TextSplitter:
             logger.info(f"✅ Token limit safety: {split_count} units were too large and were subdivided.")
             logger.info(f"📊 Final unit count: {len(final_units)} (Net increase: +{len(final_units) - len(units)}).")
         
-        return final_units
\ No newline at end of file
+        return final_units
+
+    def split_text(self, text: str) -> List[str]:
+        """Splits a text into pieces of at most max_tokens tokens (special tokens included)."""
+        tokenizer = TokenizerRegistry.get_or_none(self.tokenizer_name)
+        if tokenizer is None or not getattr(tokenizer, "is_fast", False):
+            return self.langchain_splitter.split_text(text)
+
+        with TokenizerRegistry.lock(self.tokenizer_name):
+            encoding = tokenizer(
+                text, add_special_tokens=False, truncation=False, return_offsets_mapping=True, verbose=False
+            )
+        offsets = encoding["offset_mapping"]
+        # One token of slack: a slice re-encoded on its own may gain a token at its edges
+        budget = max(1, self.max_tokens - tokenizer.num_special_tokens_to_add() - 1)
+        return self._split_by_offsets(text, offsets, budget, min(self.overlap, budget // 2))
+
+    @staticmethod
+    def _split_by_offsets(text: str, offsets: List[Tuple[int, int]], budget: int, overlap: int) -> List[str]:
+        """
+        Greedy token windows over one tokenization of the text.
+
+        Each window [start, start + budget) is cut at the latest boundary of the best
+        separator found in its second half, then the next window starts `overlap`
+        tokens before the cut (moved to a word start when one is close).
+        """
+        n = len(offsets)
+        if n <= budget:
+            return [text]
+
+        priorities = TextSplitter._boundary_priorities(text, offsets)
+        pieces, start = [], 0
+        while start < n:
+            end = min(start + budget, n)
+            if end < n:
+                end = TextSplitter._best_cut(priorities, start + max(1, budget // 2), end)
+
+            char_start = offsets[start][0]
+            char_end = offsets[end][0] if end < n else len(text)
+            pieces.append(text[char_start:char_end].strip())
+            if end >= n:
+                break
+
+            next_start = max(end - overlap, start + 1)
+            for candidate in range(next_start, end):
+                if priorities[candidate] is not None and priorities[candidate] < SEPARATOR_PRIORITIES:
+                    next_start = candidate
+                    break
+            start = next_start
+
+        return [p for p in pieces if p]
+
+    @staticmethod
+    def _boundary_priorities(text: str, offsets: List[Tuple[int, int]]) -> List[Optional[int]]:
+        """
+        Separator quality of the boundary before each token (lower is better):
+        0 paragraph, 1 line, 2 table cell, 3 sentence, 4 word, 5 inside a word.
+        """
+        priorities: List[Optional[int]] = [None]
+        for i in range(1, len(offsets)):
+            before = text[offsets[i - 1][0]:offsets[i][0]]
+            if "\n\n" in before:
+                priorities.append(0)
+            elif "\n" in before:
+                priorities.append(1)
+            elif before.rstrip().endswith("|"):
+                priorities.append(2)
+            elif SENTENCE_END.search(before):
+                priorities.append(3)
+            elif offsets[i - 1][1] < offsets[i][0] or before[-1:].isspace():
+                priorities.append(4)
+            else:
+                priorities.append(5)
+        return priorities
+
+    @staticmethod
+    def _best_cut(priorities: List[Optional[int]], low: int, high: int) -> int:
+        """Latest boundary in [low, high] with the best available separator (high if none)."""
+        best, best_priority = high, SEPARATOR_PRIORITIES
+        for i in range(high, low - 1, -1):
+            priority = priorities[i]
+            if priority is not None and priority < best_priority:
+                best, best_priority = i, priority
+                if priority == 0:
+                    break
+        return best
@@ -1 +1,143 @@
-# Workflow de post-process + Ingestion
\ No newline at end of file
+# Workflow de post-process + Ingestion
+import logging
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from app.core.config.graph_config import COMMUNITY_INCREMENTAL_MAX_SHARE
+from app.core.data_model.community import CommunityModel
+from app.indexing.operations.graph.community_detector import CommunityDetector, COMMUNITY_COLUMNS
+from app.indexing.operations.graph.community_reporter import CommunityReportGenerator, REPORT_COLUMNS
+from app.indexing.operations.graph.store_manager import GraphStoreManager
+from app.services.database.community_repository import CommunityRepository
+
+logger = logging.getLogger(__name__)
+
+async def workflow_finalize_graph(
+    store_manager: GraphStoreManager,
+    detector: CommunityDetector,
+    reporter: CommunityReportGenerator,
+    community_repo: Optional[CommunityRepository] = None,
+    entities_df: Optional[pd.DataFrame] = None,
+    relationships_df: Optional[pd.DataFrame] = None,
+    incremental: bool = False
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Builds the community layer of the graph, used to answer corpus-wide questions
+    from precomputed reports instead of scanning chunks at query time.
+
+    The workflow follows these stages:
+    1. Graph Loading: the whole stored corpus graph (unless frames are given),
+       or, in incremental mode, only the subgraph of the communities touched by the delta.
+    2. Community Detection: hierarchical Leiden / Louvain, in-process or through GDS.
+    3. SQL Persistence: communities upserted, vanished ones deleted.
+    4. Report Generation: bottom-up, concurrent, cached by context hash.
+    5. Graph Persistence: (:Community) nodes with their report, membership and hierarchy.
+
+    Incremental mode keeps the per-document cost proportional to what the document
+    touched, not to the corpus. Repeated local re-clustering drifts from what a full
+    run would produce; a periodic full run (incremental=False) resets it.
+
+    Args:
+        store_manager: Neo4j persistence (graph source and community target).
+        detector: The community detection backend.
+        reporter: The community report generator.
+        community_repo: PostgreSQL persistence of communities and reports (required in incremental mode).
+        entities_df / relationships_df: Graph frames to use instead of the stored graph.
+            In incremental mode: the delta of the latest GraphService.run_pipeline.
+        incremental: Re-cluster only the communities touched by the delta.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: The (re)built (Communities DF, Reports DF).
+    """
+    logger.info(f"🏗️ Starting finalize-graph workflow ({'incremental' if incremental else 'full'})...")
+
+    # 1. Graph Loading
+    scope_ids: Optional[List[str]] = None
+    if incremental:
+        scope = await _incremental_scope(store_manager, community_repo, entities_df, relationships_df)
+        if scope is None:
+            return await workflow_finalize_graph(store_manager, detector, reporter, community_repo)
+        scope_ids, entity_ids = scope
+        if not entity_ids:
+            logger.info("💤 Empty delta, communities unchanged.")
+            return pd.DataFrame(columns=COMMUNITY_COLUMNS), pd.DataFrame(columns=REPORT_COLUMNS)
+        entities_df, relationships_df = await store_manager.load_graph(entity_ids)
+    elif entities_df is None or relationships_df is None:
+        entities_df, relationships_df = await store_manager.load_graph()
+
+    # 2. Community Detection
+    communities_df = await detector.detect(entities_df, relationships_df, in_process=incremental)
+    current_ids = set(communities_df["id"])
+
+    # 3. SQL Persistence (before the reports, which reference their community)
+    if community_repo:
+        previous_ids = scope_ids if incremental else await community_repo.get_community_ids()
+        await community_repo.delete_communities([i for i in previous_ids if i not in current_ids])
+        await community_repo.save_communities([
+            CommunityModel(**row) for row in communities_df.to_dict(orient="records")
+        ])
+
+    # 4. Report Generation (unchanged membership and member summaries -> cached report)
+    reports_df = await reporter.generate(communities_df, entities_df, relationships_df)
+
+    # 5. Graph Persistence
+    previous_ids = scope_ids if incremental else await store_manager.get_community_ids()
+    stale_ids = [i for i in previous_ids if i not in current_ids]
+    await store_manager.save_communities(communities_df, reports_df, stale_ids=stale_ids)
+
+    logger.info(
+        f"✨ Finalize-graph finished: {len(communities_df)} communities, {len(reports_df)} reports, "
+        f"{len(stale_ids)} retired."
+    )
+    return communities_df, reports_df
+
+
+async def _incremental_scope(
+    store_manager: GraphStoreManager,
+    community_repo: Optional[CommunityRepository],
+    entities_df: Optional[pd.DataFrame],
+    relationships_df: Optional[pd.DataFrame]
+) -> Optional[Tuple[List[str], List[str]]]:
+    """
+    Finds what the delta touched.
+
+    Touched entities are the delta entities and the endpoints of the delta edges. Their
+    top-level communities (level 0 partitions the graph, lower levels are nested) are
+    re-clustered as a whole, together with the touched entities that had no community
+    yet, so that a new edge between two communities can merge them.
+
+    Returns:
+        (ids of the stored communities in scope, entity ids of the subgraph to re-cluster),
+        or None when a full run is needed (no delta info, no stored communities, or a
+        scope larger than COMMUNITY_INCREMENTAL_MAX_SHARE of the graph).
+    """
+    if community_repo is None or entities_df is None:
+        logger.warning("⚠️ Incremental finalize needs the delta frames and a community store, running a full pass.")
+        return None
+
+    touched = set(entities_df["id"].astype(str)) if not entities_df.empty else set()
+    if relationships_df is not None and not relationships_df.empty:
+        touched |= set(relationships_df["source_id"].astype(str)) | set(relationships_df["target_id"].astype(str))
+    if not touched:
+        return [], []
+
+    touched_communities = await community_repo.get_communities_by_entities(list(touched))
+    if not touched_communities and not await community_repo.has_communities():
+        logger.info("ℹ️ No stored communities yet, running a full pass.")
+        return None
+
+    entity_ids = set(touched)
+    for community in touched_communities:
+        if community.level == 0:
+            entity_ids.update(community.entity_ids or [])
+
+    total = await store_manager.count_entities()
+    if total and len(entity_ids) > COMMUNITY_INCREMENTAL_MAX_SHARE * total:
+        logger.info(f"ℹ️ Delta touches {len(entity_ids)}/{total} entities, running a full pass.")
+        return None
+
+    # Every stored community inside the scope: the touched roots and all their descendants
+    scoped = await community_repo.get_communities_by_entities(sorted(entity_ids))
+    logger.info(f"🎯 Incremental scope: {len(entity_ids)} entities, {len(scoped)} stored communities.")
+    return [c.id for c in scoped], sorted(entity_ids)
@@ -83,6 +83,14 @@ class PostgresClient:
             return await conn.execute(query, *args)
         
     
+    async def executemany(self, query: str, args: List[tuple]):
+        """
+        Executes the same command for every parameter tuple on a single connection.
+        Used for bulk upserts where COPY cannot express the ON CONFLICT logic.
+        """
+        async with self._pool.acquire() as conn:
+            await conn.executemany(query, args)
+
     async def initialize_schema(self):
         """Creates the necessary tables if they don't exist."""
         async with self._pool.acquire() as conn:
@@ -0,0 +1,164 @@
+import logging
+import os
+import shlex
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import pandas as pd
+
+from app.indexing.operations.graph.store_manager import GraphStoreManager
+from app.infrastructure.neo4j.client import Neo4jClient
+
+logger = logging.getLogger(__name__)
+
+ARRAY_DELIMITER = ";"
+
+@dataclass
+class ImportManifest:
+    """Files written by Neo4jImportExporter, and the matching neo4j-admin command."""
+    output_dir: str
+    node_files: List[str] = field(default_factory=list)
+    relationship_files: List[str] = field(default_factory=list)
+    nodes: int = 0
+    relationships: int = 0
+
+    def command(self, database: str = "neo4j", neo4j_admin: str = "neo4j-admin") -> List[str]:
+        """
+        `neo4j-admin database import full` arguments (the database must be stopped).
+        Paths are relative to output_dir, the working directory of the import.
+        """
+        return [
+            neo4j_admin, "database", "import", "full", database,
+            "--nodes=Entity=" + ",".join(self.node_files),
+            "--relationships=" + GraphStoreManager.RELATIONSHIP_TYPE + "=" + ",".join(self.relationship_files),
+            f"--array-delimiter={ARRAY_DELIMITER}",
+            "--multiline-fields=true",
+            "--overwrite-destination=true",
+        ]
+
+    def command_line(self, database: str = "neo4j") -> str:
+        return f"cd {shlex.quote(self.output_dir)} && " + " ".join(shlex.quote(a) for a in self.command(database))
+
+
+class Neo4jImportExporter:
+    """
+    Writes resolved entity / relationship frames as `neo4j-admin database import`
+    CSV files (one header file + one gzipped data file per element type).
+
+    The files carry exactly what GraphStoreManager writes online: entity ids, the
+    deterministic RELATED_TO keys, content hashes and provenance. A graph loaded
+    offline is therefore indistinguishable from one written through Cypher, and
+    later delta syncs skip the unchanged rows.
+
+    Offline import is meant for the first load of a large corpus into an empty,
+    stopped database; it bypasses the transaction layer entirely.
+    """
+
+    ENTITY_HEADER = [
+        "id:ID(Entity)", "title", "type", "description", "frequency:long",
+        "content_hash", "source_ids:string[]", "doc_ids:string[]"
+    ]
+    RELATIONSHIP_HEADER = [
+        ":START_ID(Entity)", ":END_ID(Entity)", "key", "source_id", "description",
+        "weight:double", "content_hash", "doc_ids:string[]"
+    ]
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+
+    def export(
+        self,
+        entities_df: pd.DataFrame,
+        relationships_df: pd.DataFrame,
+        doc_id: Optional[str] = None
+    ) -> ImportManifest:
+        """
+        Writes the import files.
+
+        Args:
+            entities_df: Resolved entities ('id', 'title', 'type', 'description', 'frequency', optional 'source_ids').
+            relationships_df: Resolved relationships ('source_id', 'target_id', 'description', 'weight').
+            doc_id: Provenance recorded on every row (optional).
+
+        Returns:
+            The manifest of the written files.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        manifest = ImportManifest(output_dir=self.output_dir)
+
+        nodes = self._entity_rows(entities_df, doc_id)
+        edges = self._relationship_rows(relationships_df, set(nodes["id:ID(Entity)"]), doc_id)
+
+        manifest.node_files = self._write("entities", self.ENTITY_HEADER, nodes)
+        manifest.relationship_files = self._write("relationships", self.RELATIONSHIP_HEADER, edges)
+        manifest.nodes, manifest.relationships = len(nodes), len(edges)
+
+        logger.info(f"📦 Bulk import files written to {self.output_dir} ({manifest.nodes} nodes, {manifest.relationships} edges).")
+        return manifest
+
+    def _entity_rows(self, entities_df: pd.DataFrame, doc_id: Optional[str]) -> pd.DataFrame:
+        entities = entities_df.drop_duplicates(subset="id", keep="last").reset_index(drop=True)
+        # Same hash inputs as the online writer, so a later delta sync sees these rows as unchanged
+        columns = [c for c in GraphStoreManager.ENTITY_PROPERTIES if c in entities.columns]
+        content_hash = GraphStoreManager._content_hashes(entities[["id"] + columns], columns)
+
+        frame = entities.reindex(columns=["id"] + GraphStoreManager.ENTITY_PROPERTIES)
+        frame["frequency"] = frame["frequency"].fillna(1).astype(int)
+        source_ids = entities["source_ids"] if "source_ids" in entities else [None] * len(entities)
+
+        return pd.DataFrame({
+            "id:ID(Entity)": frame["id"].astype(str),
+            "title": frame["title"],
+            "type": frame["type"],
+            "description": frame["description"],
+            "frequency:long": frame["frequency"],
+            "content_hash": content_hash,
+            "source_ids:string[]": [self._array(s) for s in source_ids],
+            "doc_ids:string[]": doc_id or "",
+        })
+
+    def _relationship_rows(self, relationships_df: pd.DataFrame, entity_ids: set, doc_id: Optional[str]) -> pd.DataFrame:
+        if relationships_df.empty:
+            return pd.DataFrame(columns=self.RELATIONSHIP_HEADER)
+
+        edges = relationships_df.drop_duplicates(subset=["source_id", "target_id"], keep="last")
+        dangling = ~(edges["source_id"].isin(entity_ids) & edges["target_id"].isin(entity_ids))
+        if dangling.any():
+            logger.warning(f"⚠️ {int(dangling.sum())} relationships point to unknown entities and are not exported.")
+        edges = edges[~dangling].sort_values(["source_id", "target_id"], kind="stable").reset_index(drop=True)
+
+        columns = [c for c in GraphStoreManager.RELATIONSHIP_PROPERTIES if c in edges.columns]
+        content_hash = GraphStoreManager._content_hashes(edges, columns)
+
+        frame = edges.reindex(columns=["source_id", "target_id"] + GraphStoreManager.RELATIONSHIP_PROPERTIES)
+        frame["weight"] = frame["weight"].fillna(1.0).astype(float)
+
+        return pd.DataFrame({
+            ":START_ID(Entity)": frame["source_id"].astype(str),
+            ":END_ID(Entity)": frame["target_id"].astype(str),
+            "key": GraphStoreManager._relationship_keys(frame),
+            "source_id": frame["source_id"].astype(str),
+            "description": frame["description"],
+            "weight:double": frame["weight"],
+            "content_hash": content_hash,
+            "doc_ids:string[]": doc_id or "",
+        })
+
+    def _write(self, name: str, header: List[str], rows: pd.DataFrame) -> List[str]:
+        """Header file + gzipped data file (neo4j-admin reads .gz transparently)."""
+        header_file, data_file = f"{name}_header.csv", f"{name}.csv.gz"
+        pd.DataFrame(columns=header).to_csv(os.path.join(self.output_dir, header_file), index=False)
+        rows[header].to_csv(os.path.join(self.output_dir, data_file), index=False, header=False, compression="gzip")
+        return [header_file, data_file]
+
+    @staticmethod
+    def _array(values) -> str:
+        if values is None or isinstance(values, str) or not hasattr(values, "__iter__"):
+            return ""
+        return ARRAY_DELIMITER.join(str(v) for v in values)
+
+
+async def is_database_empty(client: Neo4jClient) -> bool:
+    """True when the graph holds no node at all (offline import is then safe)."""
+    records = await client.execute_query("MATCH (n) RETURN n LIMIT 1")
+    return not records
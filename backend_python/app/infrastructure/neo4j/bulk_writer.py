@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Dict, List
+
+from neo4j.exceptions import TransientError
+
+from app.core.config.graph_config import (
+    NEO4J_WRITE_BATCH_SIZE,
+    NEO4J_WRITE_CONCURRENCY,
+    NEO4J_WRITE_MAX_RETRIES
+)
+from app.infrastructure.neo4j.client import Neo4jClient
+
+logger = logging.getLogger(__name__)
+
+class Neo4jBulkWriter:
+    """
+    Writes large row sets through an `UNWIND $batch` query, in bounded transactions.
+
+    - Rows are split into batches of `batch_size`, so no single transaction has to
+      hold the whole graph in the Neo4j heap.
+    - Batches run as managed write transactions, at most `max_concurrency` at a time.
+    - Transient failures (deadlocks, lock timeouts) that outlive the driver's own
+      retry window are retried with exponential backoff and jitter.
+
+    Callers are responsible for the row order: sorting relationships by their
+    endpoints keeps each node in as few concurrent batches as possible.
+    """
+
+    BASE_BACKOFF = 0.2  # seconds
+
+    def __init__(
+        self,
+        client: Neo4jClient,
+        batch_size: int = NEO4J_WRITE_BATCH_SIZE,
+        max_concurrency: int = NEO4J_WRITE_CONCURRENCY,
+        max_retries: int = NEO4J_WRITE_MAX_RETRIES
+    ):
+        self.client = client
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+
+    async def write(self, query: str, rows: List[Dict[str, Any]], label: str = "rows") -> int:
+        """
+        Writes all rows and logs the throughput.
+
+        Args:
+            query: Cypher query reading its rows from `$batch`.
+            rows: Parameter dictionaries, one per row.
+            label: Name used in the logs (e.g. 'nodes', 'edges').
+
+        Returns:
+            The number of rows written.
+        """
+        if not rows:
+            return 0
+
+        batches = [rows[i:i + self.batch_size] for i in range(0, len(rows), self.batch_size)]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(batch: List[Dict[str, Any]]):
+            async with semaphore:
+                await self._write_batch(query, batch)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[run(b) for b in batches])
+        elapsed = max(time.perf_counter() - start, 1e-6)
+
+        logger.info(
+            f"💾 {len(rows)} {label} written in {len(batches)} batches, {elapsed:.2f}s "
+            f"({len(rows) / elapsed:,.0f} rows/s)."
+        )
+        return len(rows)
+
+    async def _write_batch(self, query: str, batch: List[Dict[str, Any]]):
+        """One managed transaction, retried on transient errors."""
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                await self.client.execute_write(query, parameters={"batch": batch})
+                return
+            except TransientError as e:
+                if attempt == self.max_retries:
+                    logger.error(f"❌ Batch of {len(batch)} rows failed after {attempt} attempts: {e}")
+                    raise
+                delay = self.BASE_BACKOFF * (2 ** (attempt - 1)) * (1 + random.random())
+                logger.warning(f"🔁 Transient Neo4j error (attempt {attempt}/{self.max_retries}), retrying in {delay:.2f}s: {e}")
+                await asyncio.sleep(delay)
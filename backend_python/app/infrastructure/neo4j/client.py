@@ -70,16 +70,37 @@ class Neo4jClient:
             logger.error(f"❌ Cypher Query Error: {e}\nQuery: {query}")
             raise
 
-    async def ensure_constraints(self):
+    async def execute_write(
+        self,
+        query: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        database: str = "neo4j"
+    ) -> List[Dict[str, Any]]:
         """
-        Sets up database constraints and indexes.
-        
-        Guarantees that each Entity is unique based on its 'id' (canonical name).
+        Executes a Cypher query inside a managed write transaction.
+
+        The driver routes it to the leader and replays the whole transaction
+        function on transient failures (deadlocks, leader switch) within its
+        retry window.
+
+        Args:
+            query: The Cypher query string.
+            parameters: Dictionary of query parameters.
+            database: Target database name.
+
+        Returns:
+            A list of records as dictionaries.
         """
-        constraints = [
-            "CREATE CONSTRAINT entity_id_unique IF NOT EXISTS FOR (e:Entity) REQUIRE e.id IS UNIQUE",
-            "CREATE INDEX entity_title_index IF NOT EXISTS FOR (e:Entity) ON (e.title)"
-        ]
-        for cypher in constraints:
-            await self.execute_query(cypher)
-            logger.debug(f"⚙️ Applied Neo4j constraint/index: {cypher.split('FOR')[0].strip()}")
\ No newline at end of file
+        if not self._driver:
+            raise RuntimeError("Neo4j Driver is not initialized. Call connect() first.")
+
+        async def _work(tx):
+            result = await tx.run(query, parameters or {})
+            return await result.data()
+
+        try:
+            async with self._driver.session(database=database) as session:
+                return await session.execute_write(_work)
+        except Exception as e:
+            logger.error(f"❌ Cypher Write Error: {e}")
+            raise
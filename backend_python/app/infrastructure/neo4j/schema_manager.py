@@ -0,0 +1,114 @@
+import logging
+from typing import List, Optional
+
+from app.infrastructure.neo4j.client import Neo4jClient
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever SCHEMA_STATEMENTS changes: the new statements are applied at the next startup
+SCHEMA_VERSION = 4
+
+SCHEMA_STATEMENTS: List[str] = [
+    # --- Bookkeeping ---
+    "CREATE CONSTRAINT schema_version_name_unique IF NOT EXISTS FOR (s:SchemaVersion) REQUIRE s.name IS UNIQUE",
+
+    # --- Entity nodes ---
+    # Identity (MERGE / MATCH by id)
+    "CREATE CONSTRAINT entity_id_unique IF NOT EXISTS FOR (e:Entity) REQUIRE e.id IS UNIQUE",
+    # Exact / prefix lookups and ordering (retrieval filters)
+    "CREATE INDEX entity_title_index IF NOT EXISTS FOR (e:Entity) ON (e.title)",
+    "CREATE INDEX entity_type_index IF NOT EXISTS FOR (e:Entity) ON (e.type)",
+    "CREATE INDEX entity_canonical_id_index IF NOT EXISTS FOR (e:Entity) ON (e.canonical_id)",
+    "CREATE INDEX entity_frequency_index IF NOT EXISTS FOR (e:Entity) ON (e.frequency)",
+    "CREATE INDEX entity_type_frequency_index IF NOT EXISTS FOR (e:Entity) ON (e.type, e.frequency)",
+    # Substring search on names (CONTAINS / ENDS WITH)
+    "CREATE TEXT INDEX entity_title_text_index IF NOT EXISTS FOR (e:Entity) ON (e.title)",
+    # Keyword search over names and summaries
+    "CREATE FULLTEXT INDEX entity_fulltext_index IF NOT EXISTS FOR (e:Entity) ON EACH [e.title, e.description]",
+
+    # --- RELATED_TO edges ---
+    # Identity (MERGE by key, delta sync, orphan cleanup)
+    "CREATE INDEX related_to_key_index IF NOT EXISTS FOR ()-[r:RELATED_TO]-() ON (r.key)",
+    # Provenance side (source entity) and ranking
+    "CREATE INDEX related_to_source_id_index IF NOT EXISTS FOR ()-[r:RELATED_TO]-() ON (r.source_id)",
+    "CREATE INDEX related_to_weight_index IF NOT EXISTS FOR ()-[r:RELATED_TO]-() ON (r.weight)",
+    "CREATE FULLTEXT INDEX related_to_fulltext_index IF NOT EXISTS FOR ()-[r:RELATED_TO]-() ON EACH [r.description]",
+
+    # --- Communities (finalize-graph workflow) ---
+    "CREATE CONSTRAINT community_id_unique IF NOT EXISTS FOR (c:Community) REQUIRE c.id IS UNIQUE",
+    "CREATE INDEX community_level_rank_index IF NOT EXISTS FOR (c:Community) ON (c.level, c.rank)",
+    "CREATE FULLTEXT INDEX community_fulltext_index IF NOT EXISTS FOR (c:Community) ON EACH [c.title, c.summary]",
+
+    # --- Documents (edge keys produced by each document, orphan cleanup on re-ingestion) ---
+    "CREATE CONSTRAINT document_id_unique IF NOT EXISTS FOR (d:Document) REQUIRE d.id IS UNIQUE",
+    # Backfill for the documents ingested before the Document nodes (idempotent, one scan per schema version)
+    """
+    MATCH ()-[r:RELATED_TO]->()
+    WHERE r.key IS NOT NULL AND r.doc_ids IS NOT NULL
+    UNWIND r.doc_ids AS doc_id
+    WITH doc_id, collect(r.key) AS keys
+    MERGE (d:Document {id: doc_id})
+    SET d.relationship_keys = keys
+    """,
+]
+
+
+class Neo4jSchemaManager:
+    """
+    One-time, versioned setup of the Neo4j schema (constraints and indexes).
+
+    Runs from the FastAPI lifespan, never on the ingestion hot path. The applied
+    version is recorded in the graph itself (a SchemaVersion node), so a restart
+    on an up-to-date database costs a single read.
+
+    Every statement is idempotent (IF NOT EXISTS): a partially applied version is
+    simply replayed at the next startup.
+
+    Note: document provenance is stored as lists (doc_ids), and list membership
+    cannot be served by Neo4j property indexes; those filters stay scans by design.
+    The orphan cleanup avoids them through the per-document (:Document) edge keys.
+    """
+
+    SCHEMA_NAME = "graph"
+
+    def __init__(self, client: Neo4jClient, version: int = SCHEMA_VERSION, statements: Optional[List[str]] = None):
+        self.client = client
+        self.version = version
+        self.statements = statements if statements is not None else SCHEMA_STATEMENTS
+
+    async def apply(self) -> bool:
+        """
+        Applies the schema if the recorded version is older than the current one.
+
+        Returns:
+            True if statements were executed, False if the schema was already up to date.
+        """
+        current = await self.get_applied_version()
+        if current is not None and current >= self.version:
+            logger.info(f"✅ Neo4j schema up to date (v{current}).")
+            return False
+
+        logger.info(f"⚙️ Applying Neo4j schema v{self.version} (current: {current if current is not None else 'none'})...")
+        for cypher in self.statements:
+            await self.client.execute_query(cypher)
+            logger.debug(f"⚙️ Applied Neo4j schema statement: {cypher.split('FOR')[0].strip()}")
+
+        # Indexes are populated in the background; wait so the first queries can use them
+        await self.client.execute_query("CALL db.awaitIndexes(300)")
+
+        await self.client.execute_query(
+            """
+            MERGE (s:SchemaVersion {name: $name})
+            SET s.version = $version, s.applied_at = timestamp()
+            """,
+            parameters={"name": self.SCHEMA_NAME, "version": self.version}
+        )
+        logger.info(f"✅ Neo4j schema v{self.version} applied ({len(self.statements)} statements).")
+        return True
+
+    async def get_applied_version(self) -> Optional[int]:
+        records = await self.client.execute_query(
+            "MATCH (s:SchemaVersion {name: $name}) RETURN s.version AS version",
+            parameters={"name": self.SCHEMA_NAME}
+        )
+        return records[0]["version"] if records else None
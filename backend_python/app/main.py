@@ -5,10 +5,17 @@ from app.services.startup_service import StartupService
 from app.services.database.encyclopedia_repository import EncyclopediaRepository
 
 from app.infrastructure.database.postgres_client import PostgresClient
+from app.infrastructure.neo4j.client import Neo4jClient
+from app.infrastructure.neo4j.schema_manager import Neo4jSchemaManager
+from app.services.graph.snapshot_store import GraphSnapshotStore
+from app.indexing.operations.pdf.conversion_executor import ConversionExecutor
+from app.core.config.ingestion_config import CONVERTER_WARM_ON_STARTUP
 
 from fastapi import FastAPI
+import logging
 from fastapi.middleware.cors import CORSMiddleware
 
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
@@ -20,9 +27,30 @@ async def lifespan(app: FastAPI):
     startup = StartupService(db, repo)
     
     await startup.initialize_encyclopedia() # Migration faite UNE FOIS au lancement
+
+    # Schéma Neo4j (contraintes + index) appliqué une seule fois, hors du chemin d'ingestion
+    neo4j_client = Neo4jClient()
+    try:
+        await neo4j_client.connect()
+        await Neo4jSchemaManager(neo4j_client).apply()
+    except Exception as e:
+        logger.critical(f"💥 Neo4j schema setup failed, graph persistence will be degraded: {e}")
+    finally:
+        await neo4j_client.close()
+
+    # Snapshot CSR du graphe (mmap, partagé entre workers, rechargé à chaud après chaque ingestion)
+    app.state.graph_snapshots = GraphSnapshotStore()
+
+    # Workers de conversion démarrés (modèles layout / tables chargés une seule fois par worker)
+    if CONVERTER_WARM_ON_STARTUP:
+        try:
+            await ConversionExecutor.warm_up()
+        except Exception as e:
+            logger.error(f"❌ Docling warm-up failed, converters will be built on first use: {e}")
     
     yield
 
+    ConversionExecutor.shutdown()
     await db.disconnect()
     # Cleanup si besoin
 
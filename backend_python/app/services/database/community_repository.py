@@ -0,0 +1,135 @@
+import json
+import logging
+from typing import Dict, List
+from app.core.data_model.community import CommunityModel
+from app.core.data_model.community_report import CommunityReportModel
+from app.infrastructure.database.postgres_client import PostgresClient
+
+logger = logging.getLogger(__name__)
+
+class CommunityRepository:
+    """
+    Persistence layer for the graph communities and their reports.
+
+    Reports double as a durable cache: a report is reused as long as its
+    community keeps the same id and its context the same hash.
+    """
+
+    def __init__(self, client: PostgresClient):
+        """
+        Initializes the repository with a database client.
+
+        Args:
+            client (PostgresClient): The database client used for execution.
+        """
+        self.client = client
+
+    async def has_communities(self) -> bool:
+        return bool(await self.client.fetchval("SELECT EXISTS (SELECT 1 FROM communities)"))
+
+    async def get_community_ids(self) -> List[str]:
+        rows = await self.client.fetch("SELECT id FROM communities")
+        return [r["id"] for r in rows]
+
+    async def get_communities_by_entities(self, entity_ids: List[str]) -> List[CommunityModel]:
+        """
+        Fetches every community (all levels) holding at least one of the given entities.
+        Served by the GIN index on entity_ids.
+        """
+        if not entity_ids:
+            return []
+
+        query = """
+        SELECT id, title, level, parent, children, entity_ids, relationship_ids, text_unit_ids, size
+        FROM communities
+        WHERE entity_ids && $1::text[]
+        ORDER BY level, id
+        """
+        rows = await self.client.fetch(query, list(set(entity_ids)))
+        return [CommunityModel(**dict(r)) for r in rows]
+
+    async def save_communities(self, communities: List[CommunityModel]):
+        """
+        Upserts communities (membership, hierarchy and provenance).
+        """
+        if not communities:
+            return
+
+        query = """
+        INSERT INTO communities (id, title, level, parent, children, entity_ids, relationship_ids, text_unit_ids, size)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+        ON CONFLICT (id) DO UPDATE SET
+            title = EXCLUDED.title,
+            parent = EXCLUDED.parent,
+            children = EXCLUDED.children,
+            relationship_ids = EXCLUDED.relationship_ids,
+            text_unit_ids = EXCLUDED.text_unit_ids,
+            size = EXCLUDED.size,
+            updated_at = CURRENT_TIMESTAMP
+        """
+        records = [
+            (c.id, c.title, c.level, c.parent, c.children, c.entity_ids or [],
+             c.relationship_ids or [], c.text_unit_ids or [], c.size or 0)
+            for c in communities
+        ]
+        await self.client.executemany(query, records)
+        logger.info(f"🧩 {len(records)} communities persisted.")
+
+    async def delete_communities(self, community_ids: List[str]):
+        """Deletes communities (and, by cascade, their reports)."""
+        if not community_ids:
+            return
+        await self.client.execute("DELETE FROM communities WHERE id = ANY($1::text[])", list(community_ids))
+        logger.info(f"🧹 {len(community_ids)} stale communities deleted.")
+
+    async def get_reports(self, community_ids: List[str]) -> Dict[str, CommunityReportModel]:
+        """
+        Fetches the stored reports of the given communities.
+
+        Returns:
+            A dictionary {community_id: report}; communities without report are absent.
+        """
+        if not community_ids:
+            return {}
+
+        query = """
+        SELECT community_id, level, title, summary, full_content, findings, rank, context_hash
+        FROM community_reports
+        WHERE community_id = ANY($1::text[])
+        """
+        rows = await self.client.fetch(query, list(set(community_ids)))
+
+        results = {}
+        for r in rows:
+            data = dict(r)
+            data["id"] = data["community_id"]
+            data["findings"] = json.loads(data["findings"]) if isinstance(data["findings"], str) else (data["findings"] or [])
+            results[data["community_id"]] = CommunityReportModel(**data)
+        return results
+
+    async def save_reports(self, reports: List[CommunityReportModel]):
+        """
+        Upserts reports (a regenerated report replaces the previous one).
+        """
+        if not reports:
+            return
+
+        query = """
+        INSERT INTO community_reports (community_id, level, title, summary, full_content, findings, rank, context_hash)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+        ON CONFLICT (community_id) DO UPDATE SET
+            title = EXCLUDED.title,
+            summary = EXCLUDED.summary,
+            full_content = EXCLUDED.full_content,
+            findings = EXCLUDED.findings,
+            rank = EXCLUDED.rank,
+            context_hash = EXCLUDED.context_hash,
+            updated_at = CURRENT_TIMESTAMP
+        """
+        records = [
+            (r.community_id, r.level, r.title, r.summary, r.full_content,
+             json.dumps(r.findings), r.rank, r.context_hash)
+            for r in reports
+        ]
+        await self.client.executemany(query, records)
+        logger.info(f"📰 {len(records)} community reports persisted.")
@@ -1,6 +1,6 @@
 import logging
 import json
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from app.core.data_model.encyclopedia import EncyclopediaEntry
 from app.infrastructure.database.postgres_client import PostgresClient
 
@@ -51,57 +51,87 @@ class EncyclopediaRepository:
         Searches encyclopedia entries based on category and fuzzy/exact matching.
 
         Logic: Category check, ID match, Alias overlap, and partial containment.
+        Single-pair shortcut over search_many_by_criteria.
         """
+        results = await self.search_many_by_criteria([(slug, category)])
+        return results[0] if results else []
+
+    async def search_many_by_criteria(self, pairs: List[Tuple[str, str]]) -> List[List[EncyclopediaEntry]]:
+        """
+        Resolves a whole batch of (slug, category) pairs in a single round trip.
+
+        The pairs are shipped as two parallel arrays and expanded server-side with
+        unnest(). Every candidate key is precomputed (slug_key, title_slug and the
+        encyclopedia_aliases table), so the exact branches hit btree indexes and
+        the containment branches (slugs longer than 4 chars) hit the pg_trgm GIN
+        indexes instead of running slugify_entity() on every row.
+
+        Args:
+            pairs: Already slugified (slug, category) tuples.
+
+        Returns:
+            A list aligned with `pairs`: matches[i] holds the entries for pairs[i].
+        """
+        if not pairs:
+            return []
+
+        slugs = [p[0] for p in pairs]
+        categories = [p[1] for p in pairs]
 
         try:
             query = """
-            SELECT * FROM encyclopedia
-            WHERE category = $2
-            AND (
-                slugify_entity(slug) = $1
-
-                OR EXISTS (
-                    SELECT 1
-                    FROM jsonb_array_elements_text(properties->'aliases') AS a
-                    WHERE slugify_entity(a) = $1
-                )
-
-                OR (
-                    length($1) > 4
-                    AND (
-                        slugify_entity(slug) LIKE '%' || $1 || '%'
-
-                        OR EXISTS (
-                            SELECT 1
-                            FROM jsonb_array_elements_text(properties->'aliases') AS a
-                            WHERE slugify_entity(a) LIKE '%' || $1 || '%'
-                        )
-                    )
-                )
-            )
-            """
-            logger.info(f"🧪 SEARCH ENCYCLO QUERY slug={slug} category={category}")
-            rows = await self.client.fetch(query, slug, category)
-            logger.info(f"📦 RESULTS COUNT: {len(rows)}")   
-            results = []
+            SELECT q.idx, e.*
+            FROM unnest($1::text[], $2::text[]) WITH ORDINALITY AS q(slug, category, idx)
+            CROSS JOIN LATERAL (
+                SELECT id FROM encyclopedia
+                WHERE category = q.category AND (slug_key = q.slug OR title_slug = q.slug)
 
-            for r in rows:
-                logger.info(f"➡️ MATCH: id={r['id']} slug={r['slug']} title={r['title']}")
+                UNION
 
-                data = dict(r)
+                SELECT a.entry_id FROM encyclopedia_aliases a
+                WHERE a.alias_slug = q.slug
+
+                UNION
 
-                # FIX UUID -> string for the Model
-                data["id"] = str(data["id"])
+                SELECT id FROM encyclopedia
+                WHERE length(q.slug) > 4
+                AND category = q.category
+                AND (slug_key LIKE '%' || q.slug || '%' OR title_slug LIKE '%' || q.slug || '%')
 
-                # FIX JSONB string -> dict (for the Model)
-                if isinstance(data.get("properties"), str):
+                UNION
 
-                    data["properties"] = json.loads(data["properties"])
+                SELECT a.entry_id FROM encyclopedia_aliases a
+                WHERE length(q.slug) > 4
+                AND a.alias_slug LIKE '%' || q.slug || '%'
+            ) AS m
+            JOIN encyclopedia e ON e.id = m.id AND e.category = q.category
+            ORDER BY q.idx
+            """
+            logger.info(f"🧪 SEARCH ENCYCLO BULK QUERY pairs={len(pairs)}")
+            rows = await self.client.fetch(query, slugs, categories)
+            logger.info(f"📦 RESULTS COUNT: {len(rows)}")
 
-                results.append(EncyclopediaEntry(**data))
+            results: List[List[EncyclopediaEntry]] = [[] for _ in pairs]
+            for r in rows:
+                data = dict(r)
+                idx = data.pop("idx") - 1  # ORDINALITY is 1-based
+                logger.debug(f"➡️ MATCH: {slugs[idx]} -> id={data['id']} slug={data['slug']}")
+                results[idx].append(self._row_to_entry(data))
 
             return results
 
         except Exception as e:
-            logger.error(f"❌ Error searching encyclopedia for {slug} (cat: {category}): {e}")
-            return []
\ No newline at end of file
+            logger.error(f"❌ Error bulk searching encyclopedia ({len(pairs)} pairs): {e}")
+            return [[] for _ in pairs]
+
+    @staticmethod
+    def _row_to_entry(data: dict) -> EncyclopediaEntry:
+        """Converts a raw encyclopedia row into its Pydantic model."""
+        # FIX UUID -> string for the Model
+        data["id"] = str(data["id"])
+
+        # FIX JSONB string -> dict (for the Model)
+        if isinstance(data.get("properties"), str):
+            data["properties"] = json.loads(data["properties"])
+
+        return EncyclopediaEntry(**data)
@@ -0,0 +1,151 @@
+import logging
+from typing import List, Tuple, Optional
+from app.core.data_model.registry import RegistryEntry
+from app.infrastructure.database.postgres_client import PostgresClient
+
+logger = logging.getLogger(__name__)
+
+class EntityRegistryRepository:
+    """
+    Persistence layer for the cross-document entity registry.
+
+    Every lookup is a single set-based query over the batch of the current
+    document, backed by the (category, slug), (category, phonetic_key) and
+    GIN(aliases) indexes, so its cost depends on the batch size and not on
+    the size of the corpus already ingested.
+    """
+
+    def __init__(self, client: PostgresClient):
+        """
+        Initializes the repository with a database client.
+
+        Args:
+            client (PostgresClient): The database client used for execution.
+        """
+        self.client = client
+
+    async def find_candidates(
+        self,
+        keys: List[Tuple[str, str, str]],
+        max_candidates: int = 8
+    ) -> List[List[RegistryEntry]]:
+        """
+        Retrieves the known identities that could match each (slug, phonetic_key, category) key.
+
+        A registry entry is a candidate when it shares the category AND either the
+        slug, one of its alias slugs, or the phonetic key.
+
+        Args:
+            keys: (slug, phonetic_key, category) tuples, one per entity to resolve.
+            max_candidates: Upper bound of candidates returned per key.
+
+        Returns:
+            A list aligned with `keys`, each item holding its candidate entries.
+        """
+        if not keys:
+            return []
+
+        query = """
+        SELECT q.idx, r.id, r.slug, r.title, r.type, r.category, r.phonetic_key,
+               r.aliases, r.description, r.description_embedding::text AS description_embedding, r.frequency
+        FROM unnest($1::text[], $2::text[], $3::text[]) WITH ORDINALITY AS q(slug, phonetic_key, category, idx)
+        CROSS JOIN LATERAL (
+            -- Exact slug first, then aliases, then phonetic neighbours
+            SELECT m.id FROM (
+                SELECT id, 0 AS prio FROM entity_registry
+                WHERE category = q.category AND slug = q.slug
+
+                UNION ALL
+
+                SELECT id, 1 AS prio FROM entity_registry
+                WHERE category = q.category AND aliases @> ARRAY[q.slug]
+
+                UNION ALL
+
+                SELECT id, 2 AS prio FROM entity_registry
+                WHERE q.phonetic_key <> '' AND category = q.category AND phonetic_key = q.phonetic_key
+            ) AS m
+            GROUP BY m.id
+            ORDER BY MIN(m.prio)
+            LIMIT $4
+        ) AS c
+        JOIN entity_registry r ON r.id = c.id
+        ORDER BY q.idx, r.frequency DESC
+        """
+
+        try:
+            rows = await self.client.fetch(
+                query,
+                [k[0] for k in keys],
+                [k[1] or "" for k in keys],
+                [k[2] for k in keys],
+                max_candidates
+            )
+
+            results: List[List[RegistryEntry]] = [[] for _ in keys]
+            for r in rows:
+                data = dict(r)
+                idx = data.pop("idx") - 1  # ORDINALITY is 1-based
+                data["aliases"] = list(data.get("aliases") or [])
+                data["description_embedding"] = self._parse_vector(data.get("description_embedding"))
+                results[idx].append(RegistryEntry(**data))
+
+            logger.info(f"🗂️ Registry lookup: {len(rows)} candidates for {len(keys)} entities.")
+            return results
+
+        except Exception as e:
+            logger.error(f"❌ Error searching entity registry ({len(keys)} keys): {e}")
+            return [[] for _ in keys]
+
+    async def upsert_entries(self, entries: List[RegistryEntry]):
+        """
+        Registers new identities and enriches the known ones.
+
+        On conflict the aliases are unioned, the frequency is cumulated and the
+        reference description/embedding are only filled when still empty, so an
+        identity keeps a stable anchor text across ingestions.
+
+        Args:
+            entries: The resolved entities of the current document.
+        """
+        if not entries:
+            return
+
+        query = """
+        INSERT INTO entity_registry (id, slug, title, type, category, phonetic_key, aliases, description, description_embedding, frequency)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9::text::vector, $10)
+        ON CONFLICT (id) DO UPDATE SET
+            aliases = ARRAY(SELECT DISTINCT unnest(entity_registry.aliases || EXCLUDED.aliases)),
+            frequency = entity_registry.frequency + EXCLUDED.frequency,
+            description = COALESCE(NULLIF(entity_registry.description, ''), EXCLUDED.description),
+            description_embedding = COALESCE(entity_registry.description_embedding, EXCLUDED.description_embedding),
+            updated_at = CURRENT_TIMESTAMP
+        """
+        records = [
+            (
+                e.id, e.slug, e.title, e.type, e.category, e.phonetic_key,
+                e.aliases, e.description, self._format_vector(e.description_embedding), e.frequency
+            )
+            for e in entries
+        ]
+
+        try:
+            await self.client.executemany(query, records)
+            logger.info(f"🗂️ Registry updated with {len(records)} identities.")
+        except Exception as e:
+            logger.error(f"❌ Failed to upsert {len(records)} registry entries: {e}")
+            raise
+
+    @staticmethod
+    def _format_vector(values: Optional[List[float]]) -> Optional[str]:
+        """Serializes an embedding to the pgvector text format ('[0.1,0.2,...]')."""
+        if not values:
+            return None
+        return "[" + ",".join(f"{v:.6f}" for v in values) + "]"
+
+    @staticmethod
+    def _parse_vector(value: Optional[str]) -> Optional[List[float]]:
+        """Parses the pgvector text format back into a list of floats."""
+        if not value:
+            return None
+        return [float(v) for v in value.strip("[]").split(",") if v]
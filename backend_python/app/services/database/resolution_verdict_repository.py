@@ -0,0 +1,65 @@
+import logging
+from typing import Dict, List
+from app.core.data_model.resolution import ResolutionVerdict
+from app.infrastructure.database.postgres_client import PostgresClient
+
+logger = logging.getLogger(__name__)
+
+class ResolutionVerdictRepository:
+    """
+    Persistence layer for the memo of LLM resolution verdicts.
+
+    Reads and writes are set-based (one query per cluster), keyed by the
+    primary key pair_key.
+    """
+
+    def __init__(self, client: PostgresClient):
+        """
+        Initializes the repository with a database client.
+
+        Args:
+            client (PostgresClient): The database client used for execution.
+        """
+        self.client = client
+
+    async def get_verdicts(self, pair_keys: List[str]) -> Dict[str, ResolutionVerdict]:
+        """
+        Fetches the known verdicts for the given pair keys.
+
+        Returns:
+            A dictionary {pair_key: verdict}; unknown pairs are absent.
+        """
+        if not pair_keys:
+            return {}
+
+        query = """
+        SELECT pair_key, left_key, right_key, left_slug, right_slug, category, verdict, target_key, source
+        FROM resolution_verdicts
+        WHERE pair_key = ANY($1::text[])
+        """
+        rows = await self.client.fetch(query, list(set(pair_keys)))
+        return {r["pair_key"]: ResolutionVerdict(**dict(r)) for r in rows}
+
+    async def save_verdicts(self, verdicts: List[ResolutionVerdict]):
+        """
+        Stores new verdicts. The latest decision wins on conflict.
+        """
+        if not verdicts:
+            return
+
+        query = """
+        INSERT INTO resolution_verdicts (pair_key, left_key, right_key, left_slug, right_slug, category, verdict, target_key, source)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+        ON CONFLICT (pair_key) DO UPDATE SET
+            verdict = EXCLUDED.verdict,
+            target_key = EXCLUDED.target_key,
+            source = EXCLUDED.source,
+            created_at = CURRENT_TIMESTAMP
+        """
+        records = [
+            (v.pair_key, v.left_key, v.right_key, v.left_slug, v.right_slug,
+             v.category, v.verdict, v.target_key, v.source)
+            for v in verdicts
+        ]
+        await self.client.executemany(query, records)
+        logger.info(f"🧾 {len(records)} resolution verdicts memorized.")
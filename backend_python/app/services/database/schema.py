@@ -2,6 +2,26 @@
 CREATE_SCHEMA_QUERY = """
 -- Extensions
 CREATE EXTENSION IF NOT EXISTS pgcrypto;
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS vector;
+
+-- Slug normalization (mirror of app.core.data_model.base.slugify_entity).
+-- Declared first because the encyclopedia generated columns depend on it.
+CREATE OR REPLACE FUNCTION slugify_entity(value TEXT)
+RETURNS TEXT AS $$
+BEGIN
+    IF value IS NULL THEN
+        RETURN '';
+    END IF;
+
+    value := UPPER(value);
+    value := REGEXP_REPLACE(value, '[^A-Z0-9\s_-]', '', 'g');
+    value := REGEXP_REPLACE(value, '[\s-]+', '_', 'g');
+    value := TRIM(BOTH '_' FROM value);
+
+    RETURN value;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
 
 -- Table Documents
 CREATE TABLE IF NOT EXISTS documents (
@@ -55,21 +75,135 @@ CREATE INDEX IF NOT EXISTS idx_encyclopedia_slug ON encyclopedia(slug);
 CREATE INDEX IF NOT EXISTS idx_encyclopedia_properties_gin ON encyclopedia USING GIN (properties);
 CREATE INDEX IF NOT EXISTS idx_encyclopedia_verification ON encyclopedia(is_verified);
 
+-- Precomputed match keys: the resolver compares against these instead of
+-- evaluating slugify_entity() on every row at query time.
+ALTER TABLE encyclopedia ADD COLUMN IF NOT EXISTS slug_key TEXT GENERATED ALWAYS AS (slugify_entity(slug)) STORED;
+ALTER TABLE encyclopedia ADD COLUMN IF NOT EXISTS title_slug TEXT GENERATED ALWAYS AS (slugify_entity(title)) STORED;
 
-CREATE OR REPLACE FUNCTION slugify_entity(value TEXT)
-RETURNS TEXT AS $$
+-- Normalized aliases (one row per alias, kept in sync with properties->'aliases')
+CREATE TABLE IF NOT EXISTS encyclopedia_aliases (
+    entry_id UUID NOT NULL REFERENCES encyclopedia(id) ON DELETE CASCADE,
+    alias TEXT NOT NULL,
+    alias_slug TEXT GENERATED ALWAYS AS (slugify_entity(alias)) STORED,
+    PRIMARY KEY (entry_id, alias)
+);
+
+CREATE INDEX IF NOT EXISTS idx_encyclopedia_category_slug_key ON encyclopedia(category, slug_key);
+CREATE INDEX IF NOT EXISTS idx_encyclopedia_category_title_slug ON encyclopedia(category, title_slug);
+CREATE INDEX IF NOT EXISTS idx_encyclopedia_slug_key_trgm ON encyclopedia USING GIN (slug_key gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_encyclopedia_title_slug_trgm ON encyclopedia USING GIN (title_slug gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_encyclopedia_aliases_slug ON encyclopedia_aliases(alias_slug);
+CREATE INDEX IF NOT EXISTS idx_encyclopedia_aliases_slug_trgm ON encyclopedia_aliases USING GIN (alias_slug gin_trgm_ops);
+
+CREATE OR REPLACE FUNCTION sync_encyclopedia_aliases()
+RETURNS TRIGGER AS $$
 BEGIN
-    IF value IS NULL THEN
-        RETURN '';
-    END IF;
+    DELETE FROM encyclopedia_aliases WHERE entry_id = NEW.id;
 
-    value := UPPER(value);
-    value := REGEXP_REPLACE(value, '[^A-Z0-9\s_-]', '', 'g');
-    value := REGEXP_REPLACE(value, '[\s-]+', '_', 'g');
-    value := TRIM(BOTH '_' FROM value);
+    IF jsonb_typeof(NEW.properties->'aliases') = 'array' THEN
+        INSERT INTO encyclopedia_aliases (entry_id, alias)
+        SELECT DISTINCT NEW.id, a
+        FROM jsonb_array_elements_text(NEW.properties->'aliases') AS a
+        WHERE a <> ''
+        ON CONFLICT DO NOTHING;
+    END IF;
 
-    RETURN value;
+    RETURN NEW;
 END;
-$$ LANGUAGE plpgsql IMMUTABLE;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_encyclopedia_aliases ON encyclopedia;
+CREATE TRIGGER trg_encyclopedia_aliases
+AFTER INSERT OR UPDATE OF properties ON encyclopedia
+FOR EACH ROW EXECUTE FUNCTION sync_encyclopedia_aliases();
+
+-- Backfill for entries written before the alias table existed
+INSERT INTO encyclopedia_aliases (entry_id, alias)
+SELECT DISTINCT e.id, a
+FROM encyclopedia e, jsonb_array_elements_text(
+    CASE WHEN jsonb_typeof(e.properties->'aliases') = 'array' THEN e.properties->'aliases' ELSE '[]'::jsonb END
+) AS a
+WHERE a <> ''
+ON CONFLICT DO NOTHING;
+
+-- Table Entity Registry (cross-document identities, filled after each ingestion)
+CREATE TABLE IF NOT EXISTS entity_registry (
+    id TEXT PRIMARY KEY,                            -- Canonical graph id, stable across documents
+    slug TEXT NOT NULL,
+    title TEXT NOT NULL,
+    type TEXT NOT NULL,
+    category TEXT,
+    phonetic_key TEXT DEFAULT '',
+    aliases TEXT[] DEFAULT '{}',                    -- Slugs of every variant merged into this identity
+    description TEXT DEFAULT '',
+    description_embedding vector(1024),             -- BGE-M3 dimension
+    frequency INTEGER DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_entity_registry_category_slug ON entity_registry(category, slug);
+CREATE INDEX IF NOT EXISTS idx_entity_registry_category_phonetic ON entity_registry(category, phonetic_key);
+CREATE INDEX IF NOT EXISTS idx_entity_registry_aliases_gin ON entity_registry USING GIN (aliases);
+
+-- Table Resolution Verdicts (memo of LLM merge / no-merge decisions between two entities)
+CREATE TABLE IF NOT EXISTS resolution_verdicts (
+    pair_key TEXT PRIMARY KEY,                      -- Hash of the two sorted entity fingerprints
+    left_key TEXT NOT NULL,                         -- Fingerprint = hash(slug, category, description)
+    right_key TEXT NOT NULL,
+    left_slug TEXT NOT NULL,
+    right_slug TEXT NOT NULL,
+    category TEXT,
+    verdict TEXT NOT NULL CHECK (verdict IN ('MERGE', 'DISTINCT')),
+    target_key TEXT,                                -- Surviving side of a MERGE (NULL = no preference)
+    source TEXT NOT NULL,                           -- CLUSTER | ANCHORING
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Table Description Summaries (durable Phase 4 results, one per graph object and prompt version)
+CREATE TABLE IF NOT EXISTS description_summaries (
+    object_id TEXT NOT NULL,                        -- Entity id, or 'source_id->target_id' for a relationship
+    prompt_version TEXT NOT NULL,                   -- Hash of the summarization prompts
+    fragments_hash TEXT NOT NULL,                   -- Hash of the sorted, deduplicated fragments
+    fragments TEXT[] NOT NULL DEFAULT '{}',
+    summary TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (object_id, prompt_version)
+);
+
+-- Table Communities (hierarchical clusters of the entity graph, rebuilt by the finalize-graph workflow)
+CREATE TABLE IF NOT EXISTS communities (
+    id TEXT PRIMARY KEY,                            -- Hash of (level, sorted member entity ids)
+    title TEXT NOT NULL,
+    level INTEGER NOT NULL,                         -- 0 = coarsest
+    parent TEXT,
+    children TEXT[] DEFAULT '{}',
+    entity_ids TEXT[] DEFAULT '{}',
+    relationship_ids TEXT[] DEFAULT '{}',           -- RELATED_TO edge keys
+    text_unit_ids TEXT[] DEFAULT '{}',
+    size INTEGER DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_communities_level ON communities(level);
+CREATE INDEX IF NOT EXISTS idx_communities_entity_ids_gin ON communities USING GIN (entity_ids);
+
+-- Table Community Reports (LLM summaries read by global search instead of the chunks)
+CREATE TABLE IF NOT EXISTS community_reports (
+    community_id TEXT PRIMARY KEY REFERENCES communities(id) ON DELETE CASCADE,
+    level INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    full_content TEXT NOT NULL,
+    findings JSONB DEFAULT '[]',
+    rank REAL DEFAULT 1.0,
+    context_hash TEXT NOT NULL,                     -- Hash of the prompt version and of the context sent to the LLM
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_community_reports_level_rank ON community_reports(level, rank DESC);
+
+
+
 
 """
\ No newline at end of file
@@ -0,0 +1,70 @@
+import logging
+from typing import Dict, List
+from app.core.data_model.summary import DescriptionSummary
+from app.infrastructure.database.postgres_client import PostgresClient
+
+logger = logging.getLogger(__name__)
+
+class SummaryRepository:
+    """
+    Persistence layer for the durable description summaries (Phase 4).
+
+    Unlike the Redis LLM cache, entries do not expire: a summary is replaced only
+    when its object gets a new fragment set or when the prompts change.
+    """
+
+    def __init__(self, client: PostgresClient):
+        """
+        Initializes the repository with a database client.
+
+        Args:
+            client (PostgresClient): The database client used for execution.
+        """
+        self.client = client
+
+    async def get_summaries(self, object_ids: List[str], prompt_version: str) -> Dict[str, DescriptionSummary]:
+        """
+        Fetches the stored summaries of the given objects for a prompt version.
+
+        Returns:
+            A dictionary {object_id: summary}; objects never summarized are absent.
+        """
+        if not object_ids:
+            return {}
+
+        query = """
+        SELECT object_id, prompt_version, fragments_hash, fragments, summary
+        FROM description_summaries
+        WHERE prompt_version = $2 AND object_id = ANY($1::text[])
+        """
+        rows = await self.client.fetch(query, list(set(object_ids)), prompt_version)
+
+        results = {}
+        for r in rows:
+            data = dict(r)
+            data["fragments"] = list(data.get("fragments") or [])
+            results[data["object_id"]] = DescriptionSummary(**data)
+        return results
+
+    async def save_summaries(self, summaries: List[DescriptionSummary]):
+        """
+        Upserts summaries (the new fragment set replaces the previous one).
+        """
+        if not summaries:
+            return
+
+        query = """
+        INSERT INTO description_summaries (object_id, prompt_version, fragments_hash, fragments, summary)
+        VALUES ($1, $2, $3, $4, $5)
+        ON CONFLICT (object_id, prompt_version) DO UPDATE SET
+            fragments_hash = EXCLUDED.fragments_hash,
+            fragments = EXCLUDED.fragments,
+            summary = EXCLUDED.summary,
+            updated_at = CURRENT_TIMESTAMP
+        """
+        records = [
+            (s.object_id, s.prompt_version, s.fragments_hash, s.fragments, s.summary)
+            for s in summaries
+        ]
+        await self.client.executemany(query, records)
+        logger.info(f"📝 {len(records)} summaries persisted.")
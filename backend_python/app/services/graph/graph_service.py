@@ -8,6 +8,7 @@ from app.core.data_model.text_units import TextUnit
 
 from app.indexing.operations.graph.graph_extractor import EntityAndRelationExtractor
 from app.indexing.operations.graph.summarize_manager import SummarizeManager
+from app.indexing.operations.graph.aggregation_utils import columnar_aggregate, JOIN_UNIQUE, UNION_LISTS
 
 from app.services.llm.parser import LLMParser
 from app.indexing.operations.entity_resolution.resolution_engine import EntityResolutionEngine
@@ -46,7 +47,8 @@ class GraphService:
         self, 
         text_units: List[TextUnit], 
         domain_context: str,
-        persist: bool = True
+        persist: bool = True,
+        doc_id: str = None
     ) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
         Executes the end-to-end knowledge graph construction pipeline.
@@ -59,6 +61,7 @@ class GraphService:
             text_units (List[TextUnit]): The text chunks to process.
             domain_context (str): Global context to ground the LLM extractions.
             persist (bool): If True, saves the final dataframes to the graph database.
+            doc_id (str): Source document, recorded as provenance on the persisted graph.
             
         Returns:
             Tuple[pd.DataFrame, pd.DataFrame]: The processed (Entities DF, Relationships DF).
@@ -116,10 +119,9 @@ class GraphService:
         if not relationships_df.empty:
             logger.info("🔗 Phase 3: Re-mapping relations...")
 
-            final_slug_map = {}
-            for slug, init_id in initial_slug_to_id.items():
-                final_id = global_mapping.get(init_id, init_id)
-                final_slug_map[slug] = final_id
+            # Slug -> initial id -> final id, resolved in one vectorized pass
+            slug_ids = pd.Series(initial_slug_to_id, dtype=object)
+            final_slug_map = slug_ids.map(global_mapping).fillna(slug_ids).to_dict()
 
             relationships_df = self._process_relationships(
                 relationships_df, 
@@ -142,7 +144,7 @@ class GraphService:
         if persist:
             logger.info("💾 Phase 5: Persisting graph to database...")
             try:
-                await self.store_manager.save_graph(entities_df, relationships_df)
+                await self.store_manager.save_graph(entities_df, relationships_df, doc_id=doc_id)
                 logger.info("✅ Graph successfully saved to Neo4j.")
             except Exception as e:
                 logger.error(f"❌ Failed to persist graph: {e}")
@@ -186,17 +188,17 @@ class GraphService:
         # Step 3: Remove self-loops created by entity fusion (e.g., Muhammad -> Prophet becomes Muhammad -> Muhammad)
         rels_df = rels_df[rels_df["source_id"] != rels_df["target_id"]]
 
-        # Step 4: Aggregate duplicate relationships
-        return (
-            rels_df.groupby(["source_id", "target_id"], sort=False)
-            .agg({
+        # Step 4: Aggregate duplicate relationships (columnar, no per-group lambdas)
+        return columnar_aggregate(
+            rels_df,
+            ["source_id", "target_id"],
+            {
                 "source_slug": "first",
                 "target_slug": "first",
-                "description": lambda x: " | ".join(set(filter(None, x))),
+                "description": JOIN_UNIQUE,
                 "weight": "sum",
-                "source_ids": lambda x: list(set([i for sub in x for i in sub if isinstance(sub, list)])),
+                "source_ids": UNION_LISTS,
                 "rank": "max",          # Retain the highest importance rank
                 "attributes": "first"   # Retain the first encountered attributes dict
-            })
-            .reset_index()
-        )
\ No newline at end of file
+            }
+        )
@@ -0,0 +1,242 @@
+import heapq
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Arrays persisted as one .npy file each (memory-mappable)
+ARRAY_NAMES = [
+    "ids", "sorted_ids", "sorted_order", "titles", "type_codes",
+    "frequency", "degree", "strength", "indptr", "indices", "weights"
+]
+
+class GraphSnapshot:
+    """
+    Read-only, array-backed (CSR) view of the entity graph for query-time traversal.
+
+    Node i has the neighbors indices[indptr[i]:indptr[i + 1]] with the matching edge
+    weights; edges are stored in both directions (traversal ignores orientation) and
+    parallel edges are summed. Node attributes are numpy columns. Id lookups go
+    through a sorted copy of the ids (binary search), so a memory-mapped snapshot
+    needs no per-process dictionary and is shared by every worker through the page cache.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], types: List[str], version: int):
+        self.arrays = arrays
+        self.types = types
+        self.version = version
+
+        self.ids = arrays["ids"]
+        self.titles = arrays["titles"]
+        self.type_codes = arrays["type_codes"]
+        self.frequency = arrays["frequency"]
+        self.degree = arrays["degree"]
+        self.strength = arrays["strength"]
+        self.indptr = arrays["indptr"]
+        self.indices = arrays["indices"]
+        self.weights = arrays["weights"]
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.ids)
+
+    @property
+    def num_edges(self) -> int:
+        """Undirected edges (each one is stored twice)."""
+        return len(self.indices) // 2
+
+    # --- BUILD ---
+
+    @classmethod
+    def from_frames(cls, entities_df: pd.DataFrame, relationships_df: pd.DataFrame, version: Optional[int] = None) -> "GraphSnapshot":
+        """
+        Builds a snapshot from the resolved frames (pipeline output or GraphStoreManager.load_graph()).
+        Edges whose endpoints are unknown, and self-loops, are ignored.
+        """
+        entities = entities_df.drop_duplicates(subset="id").reset_index(drop=True)
+        ids = entities["id"].astype(str).to_numpy(dtype=str)
+        n = len(ids)
+
+        type_codes, types = pd.factorize(entities["type"].fillna("UNKNOWN") if "type" in entities else pd.Series(["UNKNOWN"] * n))
+        frequency = entities["frequency"].fillna(1).to_numpy(dtype=np.int32) if "frequency" in entities else np.ones(n, dtype=np.int32)
+        titles = entities["title"].fillna("").astype(str).to_numpy(dtype=str) if "title" in entities else ids.copy()
+
+        src, dst, weights = cls._edge_arrays(ids, relationships_df)
+
+        # Both directions, then one CSR row per node sorted by neighbor
+        rows = np.concatenate([src, dst])
+        cols = np.concatenate([dst, src])
+        vals = np.concatenate([weights, weights])
+        order = np.lexsort((cols, rows))
+        rows, cols, vals = rows[order], cols[order], vals[order]
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+
+        sorted_order = np.argsort(ids, kind="stable").astype(np.int64)
+        arrays = {
+            "ids": ids,
+            "sorted_ids": ids[sorted_order],
+            "sorted_order": sorted_order,
+            "titles": titles,
+            "type_codes": type_codes.astype(np.int32),
+            "frequency": frequency,
+            "degree": np.diff(indptr).astype(np.int32),
+            "strength": np.bincount(rows, weights=vals, minlength=n).astype(np.float32),
+            "indptr": indptr,
+            "indices": cols.astype(np.int32),
+            "weights": vals.astype(np.float32),
+        }
+        return cls(arrays, [str(t) for t in types], version if version is not None else int(time.time() * 1000))
+
+    @staticmethod
+    def _edge_arrays(ids: np.ndarray, relationships_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Endpoint indices and summed weights of the undirected, deduplicated edges."""
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32))
+        if relationships_df.empty or not len(ids):
+            return empty
+
+        index = pd.Index(ids)
+        src = index.get_indexer(relationships_df["source_id"].astype(str))
+        dst = index.get_indexer(relationships_df["target_id"].astype(str))
+        weights = (
+            relationships_df["weight"].fillna(1.0).to_numpy(dtype=np.float64)
+            if "weight" in relationships_df else np.ones(len(src))
+        )
+
+        keep = (src >= 0) & (dst >= 0) & (src != dst)
+        low, high = np.minimum(src[keep], dst[keep]), np.maximum(src[keep], dst[keep])
+        if not len(low):
+            return empty
+
+        edges = pd.DataFrame({"low": low, "high": high, "weight": weights[keep]})
+        edges = edges.groupby(["low", "high"], sort=True)["weight"].sum()
+        return (
+            edges.index.get_level_values(0).to_numpy(dtype=np.int64),
+            edges.index.get_level_values(1).to_numpy(dtype=np.int64),
+            edges.to_numpy(dtype=np.float32),
+        )
+
+    # --- PERSISTENCE ---
+
+    def save(self, directory: str):
+        """Writes one .npy per array plus meta.json into `directory` (created)."""
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(directory, f"{name}.npy"), self.arrays[name], allow_pickle=False)
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "types": self.types, "nodes": self.num_nodes, "edges": self.num_edges}, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "GraphSnapshot":
+        """Opens a saved snapshot; with mmap, arrays are paged in on demand and shared between processes."""
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None, allow_pickle=False)
+            for name in ARRAY_NAMES
+        }
+        return cls(arrays, meta["types"], meta["version"])
+
+    # --- QUERIES ---
+
+    def index_of(self, entity_ids: Sequence[str]) -> np.ndarray:
+        """Node indices of the given ids (-1 when unknown)."""
+        keys = np.asarray(entity_ids, dtype=str)
+        if not self.num_nodes or not len(keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        sorted_ids = self.arrays["sorted_ids"]
+        pos = np.searchsorted(sorted_ids, keys)
+        pos = np.minimum(pos, self.num_nodes - 1)
+        found = sorted_ids[pos] == keys
+        return np.where(found, self.arrays["sorted_order"][pos], -1)
+
+    def node_type(self, index: int) -> str:
+        return self.types[self.type_codes[index]]
+
+    def neighbors(self, entity_id: str, top: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Direct neighbors of an entity with the edge weight, strongest first."""
+        (i,) = self.index_of([entity_id])
+        if i < 0:
+            return []
+        start, end = self.indptr[i], self.indptr[i + 1]
+        cols, vals = self.indices[start:end], self.weights[start:end]
+        order = np.argsort(-vals, kind="stable")[:top]
+        return [(str(self.ids[cols[j]]), float(vals[j])) for j in order]
+
+    def k_hop(self, entity_ids: Sequence[str], k: int = 2, max_nodes: Optional[int] = None) -> Dict[str, int]:
+        """
+        Neighborhood expansion: every entity within k hops of the seeds, with its hop
+        distance (seeds = 0). Each hop is one vectorized gather over the CSR rows of
+        the frontier. With max_nodes, expansion stops once the budget is reached
+        (the last frontier is cut, strongest nodes first).
+        """
+        seeds = self.index_of(entity_ids)
+        seeds = np.unique(seeds[seeds >= 0])
+        layers = [seeds]
+        visited = seeds
+        count = len(seeds)
+
+        for _ in range(k):
+            if not len(layers[-1]) or (max_nodes and count >= max_nodes):
+                break
+            reached = np.setdiff1d(self._gather(layers[-1]), visited)
+            if max_nodes and count + len(reached) > max_nodes:
+                reached = reached[np.argsort(-self.strength[reached], kind="stable")[:max_nodes - count]]
+            layers.append(reached)
+            visited = np.concatenate([visited, reached])
+            count += len(reached)
+
+        return {str(self.ids[i]): hop for hop, layer in enumerate(layers) for i in layer}
+
+    def shortest_path(self, source_id: str, target_id: str, max_hops: Optional[int] = None) -> Tuple[List[str], float]:
+        """
+        Weighted shortest path (Dijkstra), an edge costing 1 / weight: strongly
+        related entities are close. Returns ([], inf) when no path exists.
+        """
+        source, target = self.index_of([source_id, target_id])
+        if source < 0 or target < 0:
+            return [], float("inf")
+
+        best = {int(source): 0.0}
+        previous: Dict[int, int] = {}
+        depth = {int(source): 0}
+        heap = [(0.0, int(source))]
+        while heap:
+            cost, node = heapq.heappop(heap)
+            if node == target:
+                break
+            if cost > best[node] or (max_hops is not None and depth[node] >= max_hops):
+                continue
+            start, end = self.indptr[node], self.indptr[node + 1]
+            for neighbor, weight in zip(self.indices[start:end].tolist(), self.weights[start:end].tolist()):
+                new_cost = cost + 1.0 / max(weight, 1e-6)
+                if new_cost < best.get(neighbor, float("inf")):
+                    best[neighbor] = new_cost
+                    previous[neighbor] = node
+                    depth[neighbor] = depth[node] + 1
+                    heapq.heappush(heap, (new_cost, neighbor))
+
+        if int(target) not in best:
+            return [], float("inf")
+
+        path = [int(target)]
+        while path[-1] != source:
+            path.append(previous[path[-1]])
+        return [str(self.ids[i]) for i in reversed(path)], best[int(target)]
+
+    def _gather(self, rows: np.ndarray) -> np.ndarray:
+        """Concatenated neighbor lists of the given CSR rows, without a Python loop."""
+        starts, ends = self.indptr[rows], self.indptr[rows + 1]
+        lengths = ends - starts
+        total = int(lengths.sum())
+        if not total:
+            return np.zeros(0, dtype=self.indices.dtype)
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        return self.indices[offsets]
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Optional
+
+from app.core.config.graph_config import (
+    GRAPH_SNAPSHOT_DIR, GRAPH_SNAPSHOT_KEEP_VERSIONS, GRAPH_SNAPSHOT_REFRESH_INTERVAL
+)
+from app.indexing.operations.graph.store_manager import GraphStoreManager
+from app.services.graph.graph_snapshot import GraphSnapshot
+
+logger = logging.getLogger(__name__)
+
+class GraphSnapshotStore:
+    """
+    Versioned, hot-swappable GraphSnapshot shared by the API workers.
+
+    Layout: one directory per version (v<version>/) and a CURRENT file naming the
+    published one. Publishing writes the new version first, then replaces CURRENT
+    atomically (os.replace), so a reader only ever sees complete snapshots.
+
+    Readers call current(): at most every refresh_interval seconds it re-reads
+    CURRENT and, on a new version, memory-maps it and swaps its reference. Queries
+    already running keep the previous snapshot object, whose mapped files stay
+    valid even after the version directory is pruned.
+    """
+
+    POINTER = "CURRENT"
+
+    def __init__(
+        self,
+        directory: str = GRAPH_SNAPSHOT_DIR,
+        keep_versions: int = GRAPH_SNAPSHOT_KEEP_VERSIONS,
+        refresh_interval: float = GRAPH_SNAPSHOT_REFRESH_INTERVAL
+    ):
+        self.directory = directory
+        self.keep_versions = keep_versions
+        self.refresh_interval = refresh_interval
+
+        self._snapshot: Optional[GraphSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self) -> Optional[GraphSnapshot]:
+        """The latest published snapshot (None until a first publish)."""
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._checked_at < self.refresh_interval:
+            return self._snapshot
+
+        with self._lock:
+            self._checked_at = now
+            version = self._published_version()
+            if version is not None and (self._snapshot is None or self._snapshot.version != version):
+                try:
+                    self._snapshot = GraphSnapshot.load(self._version_dir(version), mmap=True)
+                    logger.info(
+                        f"🔁 Graph snapshot v{version} loaded "
+                        f"({self._snapshot.num_nodes} nodes, {self._snapshot.num_edges} edges)."
+                    )
+                except FileNotFoundError:
+                    logger.warning(f"⚠️ Graph snapshot v{version} vanished, keeping the previous one.")
+        return self._snapshot
+
+    def publish(self, snapshot: GraphSnapshot) -> str:
+        """
+        Saves a snapshot as a new version, makes it current and prunes old versions.
+
+        Returns:
+            The directory of the published version.
+        """
+        target = self._version_dir(snapshot.version)
+        staging = f"{target}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        snapshot.save(staging)
+        shutil.rmtree(target, ignore_errors=True)  # Same version published twice
+        os.replace(staging, target)
+
+        pointer_tmp = os.path.join(self.directory, f"{self.POINTER}.tmp")
+        with open(pointer_tmp, "w", encoding="utf-8") as f:
+            f.write(str(snapshot.version))
+        os.replace(pointer_tmp, os.path.join(self.directory, self.POINTER))
+
+        with self._lock:
+            self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+
+        self._prune(snapshot.version)
+        logger.info(f"📸 Graph snapshot v{snapshot.version} published ({snapshot.num_nodes} nodes, {snapshot.num_edges} edges).")
+        return target
+
+    async def rebuild(self, store_manager: GraphStoreManager) -> GraphSnapshot:
+        """Builds a snapshot of the whole stored graph and publishes it (CPU work off the event loop)."""
+        entities_df, relationships_df = await store_manager.load_graph()
+        snapshot = await asyncio.to_thread(GraphSnapshot.from_frames, entities_df, relationships_df)
+        await asyncio.to_thread(self.publish, snapshot)
+        return snapshot
+
+    def _published_version(self) -> Optional[int]:
+        try:
+            with open(os.path.join(self.directory, self.POINTER), encoding="utf-8") as f:
+                return int(f.read().strip())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _version_dir(self, version: int) -> str:
+        return os.path.join(self.directory, f"v{version}")
+
+    def _prune(self, current_version: int):
+        """Keeps the `keep_versions` most recent versions (the current one always)."""
+        versions = []
+        for name in os.listdir(self.directory):
+            if name.startswith("v") and name[1:].isdigit():
+                versions.append(int(name[1:]))
+        for version in sorted(versions, reverse=True)[self.keep_versions:]:
+            if version != current_version:
+                shutil.rmtree(self._version_dir(version), ignore_errors=True)
@@ -0,0 +1,136 @@
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.core.config.embedding_config import EMBEDDING_MODEL_NAME, EMBEDDING_TOKENIZER_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+class TokenizerRegistry:
+    """
+    Process-wide tokenizers, loaded lazily once and shared by every component.
+
+    Names are either a Hugging Face model id (the embedding tokenizer, by default
+    EMBEDDING_MODEL_NAME) or 'tiktoken:<encoding>' for LLM prompt budgeting.
+    count_tokens() encodes whole batches in one call to the fast (Rust) tokenizer
+    instead of one Python call per text.
+
+    When a tokenizer cannot be loaded (offline host, missing files), count_tokens()
+    falls back to a ~4 characters per token estimate; get() raises.
+
+    A shared fast tokenizer is not safe for concurrent calls: its padding and
+    truncation settings live on the Rust backend and are rewritten by every call
+    that passes them. Callers encoding with a shared instance hold lock(name).
+    """
+
+    TIKTOKEN_PREFIX = "tiktoken:"
+
+    _tokenizers: Dict[str, Any] = {}
+    _unavailable: Dict[str, str] = {}
+    _locks: Dict[str, threading.Lock] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, name: str = EMBEDDING_MODEL_NAME) -> Any:
+        """The tokenizer registered under `name`, loaded on first use (thread-safe)."""
+        tokenizer = cls._tokenizers.get(name)
+        if tokenizer is not None:
+            return tokenizer
+
+        with cls._lock:
+            if name not in cls._tokenizers:
+                logger.info(f"⚙️ Loading tokenizer '{name}'...")
+                cls._tokenizers[name] = cls._load(name)
+            return cls._tokenizers[name]
+
+    @classmethod
+    def lock(cls, name: str = EMBEDDING_MODEL_NAME) -> threading.Lock:
+        """The lock serializing the calls to the tokenizer registered under `name`."""
+        lock = cls._locks.get(name)
+        if lock is not None:
+            return lock
+
+        with cls._lock:
+            return cls._locks.setdefault(name, threading.Lock())
+
+    @classmethod
+    def register(cls, name: str, tokenizer: Any):
+        """Registers an already built tokenizer (custom vocabularies, tests)."""
+        with cls._lock:
+            cls._tokenizers[name] = tokenizer
+            cls._unavailable.pop(name, None)
+
+    @classmethod
+    def count_tokens(
+        cls,
+        texts: Sequence[str],
+        name: str = EMBEDDING_MODEL_NAME,
+        add_special_tokens: bool = True,
+        batch_size: int = EMBEDDING_TOKENIZER_BATCH_SIZE
+    ) -> List[int]:
+        """
+        Token counts of many texts, encoded in batches.
+
+        Args:
+            texts: Texts to measure.
+            name: Tokenizer name (see class docstring).
+            add_special_tokens: Count the model's special tokens ([CLS], [SEP]...), as the
+                embedding model sees them. Ignored by tiktoken encodings.
+            batch_size: Texts per tokenizer call.
+        """
+        texts = [t or "" for t in texts]
+        if not texts:
+            return []
+
+        tokenizer = cls.get_or_none(name)
+        if tokenizer is None:
+            return [cls.estimate_tokens(t) for t in texts]
+
+        counts: List[int] = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            if name.startswith(cls.TIKTOKEN_PREFIX):
+                # tiktoken encodings hold no per-call state: no lock needed
+                counts.extend(len(ids) for ids in tokenizer.encode_ordinary_batch(batch))
+            else:
+                with cls.lock(name):
+                    encoded = tokenizer(
+                        batch,
+                        add_special_tokens=add_special_tokens,
+                        truncation=False,
+                        return_attention_mask=False,
+                        return_token_type_ids=False,
+                        verbose=False,
+                    )
+                counts.extend(len(ids) for ids in encoded["input_ids"])
+        return counts
+
+    @classmethod
+    def count(cls, text: str, name: str = EMBEDDING_MODEL_NAME, add_special_tokens: bool = True) -> int:
+        return cls.count_tokens([text], name, add_special_tokens)[0]
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Cheap token estimate (~4 characters per token)."""
+        return len(text) // 4 + 1
+
+    @classmethod
+    def get_or_none(cls, name: str = EMBEDDING_MODEL_NAME) -> Optional[Any]:
+        """Like get(), but None (logged once) when the tokenizer cannot be loaded."""
+        if name in cls._unavailable:
+            return None
+        try:
+            return cls.get(name)
+        except Exception as e:
+            cls._unavailable[name] = str(e)
+            logger.warning(f"⚠️ Tokenizer '{name}' unavailable, using a character-based estimate: {e}")
+            return None
+
+    @classmethod
+    def _load(cls, name: str) -> Any:
+        if name.startswith(cls.TIKTOKEN_PREFIX):
+            import tiktoken
+            return tiktoken.get_encoding(name[len(cls.TIKTOKEN_PREFIX):])
+
+        from transformers import AutoTokenizer
+        return AutoTokenizer.from_pretrained(name, use_fast=True)
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from app.core.config.embedding_config import (
+    EMBEDDING_MODEL_NAME, EMBEDDING_DEVICE, EMBEDDING_BATCH_SIZE, EMBEDDING_MAX_LENGTH
+)
+from app.services.tokenizer_registry import TokenizerRegistry
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingService:
+    """
+    Local dense embeddings with the project's BGE-M3 model.
+
+    The model is loaded lazily (first call) and kept for the lifetime of the service.
+    Texts are encoded in batches under torch.inference_mode; the dense BGE-M3 vector
+    is the L2-normalized [CLS] hidden state, so a dot product is a cosine similarity.
+    Encoding is CPU-bound: the async entry point runs it in a worker thread to keep
+    the event loop free.
+
+    The model weighs ~2 GB: the pipeline uses the process-wide instance (shared()),
+    so it is loaded once per process and not once per ingestion.
+    """
+
+    _shared: Optional["EmbeddingService"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_MODEL_NAME,
+        device: str = EMBEDDING_DEVICE,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        max_length: int = EMBEDDING_MAX_LENGTH
+    ):
+        self.model_name = model_name
+        self.device = device
+        self.batch_size = batch_size
+        self.max_length = max_length
+
+        self._tokenizer = None
+        self._model = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "EmbeddingService":
+        """The process-wide service built on the configured model (created on first call, loaded lazily)."""
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Async wrapper around encode(), executed off the event loop.
+        """
+        return await asyncio.to_thread(self.encode, texts)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Encodes texts into normalized float32 vectors.
+
+        Args:
+            texts: Raw texts (truncated to max_length tokens).
+
+        Returns:
+            An array of shape (len(texts), dim).
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        import torch
+
+        self._load()
+        vectors = []
+        with self._lock, torch.inference_mode():
+            for start in range(0, len(texts), self.batch_size):
+                batch = texts[start:start + self.batch_size]
+                # Shared tokenizer: padding / truncation settings are per call, see TokenizerRegistry
+                with TokenizerRegistry.lock(self.model_name):
+                    inputs = self._tokenizer(
+                        batch,
+                        padding=True,
+                        truncation=True,
+                        max_length=self.max_length,
+                        return_tensors="pt"
+                    )
+                inputs = inputs.to(self.device)
+
+                cls = self._model(**inputs).last_hidden_state[:, 0]
+                cls = torch.nn.functional.normalize(cls, p=2, dim=-1)
+                vectors.append(cls.cpu().numpy().astype(np.float32))
+
+        logger.debug(f"🧬 Encoded {len(texts)} texts in {len(vectors)} batches.")
+        return np.vstack(vectors)
+
+    def _load(self):
+        """Loads the tokenizer and the model once (thread-safe)."""
+        if self._model is not None:
+            return
+
+        with self._lock:
+            if self._model is not None:
+                return
+
+            from transformers import AutoModel
+
+            logger.info(f"⚙️ Loading embedding model '{self.model_name}' on {self.device}...")
+            self._tokenizer = TokenizerRegistry.get(self.model_name)
+            model = AutoModel.from_pretrained(self.model_name)
+            model.eval()
+            self._model = model.to(self.device)
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+from app.indexing.operations.graph.aggregation_utils import (
+    columnar_aggregate, JOIN_UNIQUE, UNION_LISTS, MERGE_DICTS
+)
+from app.indexing.operations.entity_resolution.core_resolver import CoreResolver
+
+
+RULES = {
+    "title": "first",
+    "description": JOIN_UNIQUE,
+    "source_ids": UNION_LISTS,
+    "frequency": "sum",
+    "rank": "max",
+    "attributes": MERGE_DICTS,
+}
+
+
+def _legacy_aggregate(df: pd.DataFrame) -> pd.DataFrame:
+    """Ancienne implémentation (lambdas par groupe), sert de référence."""
+    def merge_attributes(series):
+        final_attr = {}
+        for d in series:
+            if isinstance(d, dict):
+                final_attr.update(d)
+        return final_attr
+
+    return df.groupby(["id"], sort=False).agg({
+        "title": "first",
+        "description": lambda x: " | ".join(set(filter(None, x.astype(str)))),
+        "source_ids": lambda x: list(set([i for sub in x if isinstance(sub, list) for i in sub])),
+        "frequency": "sum",
+        "rank": "max",
+        "attributes": merge_attributes,
+    }).reset_index()
+
+
+def _assert_same_semantics(new: pd.DataFrame, old: pd.DataFrame):
+    """Même contenu à l'ordre près des éléments dédupliqués."""
+    assert new["id"].tolist() == old["id"].tolist()
+    assert new["title"].tolist() == old["title"].tolist()
+    assert new["frequency"].tolist() == old["frequency"].tolist()
+    assert new["rank"].tolist() == old["rank"].tolist()
+    assert new["attributes"].tolist() == old["attributes"].tolist()
+    for a, b in zip(new["description"], old["description"]):
+        assert sorted(filter(None, a.split(" | "))) == sorted(filter(None, b.split(" | ")))
+    for a, b in zip(new["source_ids"], old["source_ids"]):
+        assert len(a) == len(set(a))
+        assert set(a) == set(b)
+
+
+def _synthetic_frame(n_rows: int, n_ids: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    ids = rng.integers(0, n_ids, n_rows)
+    return pd.DataFrame({
+        "id": [f"ent_{i}" for i in ids],
+        "title": [f"Title {i}" for i in ids],
+        "description": [f"desc {d}" if d % 7 else "" for d in rng.integers(0, 40, n_rows)],
+        "source_ids": [[f"chunk_{c}", f"chunk_{c + 1}"] for c in rng.integers(0, 500, n_rows)],
+        "frequency": np.ones(n_rows, dtype=int),
+        "rank": rng.integers(1, 10, n_rows),
+        "attributes": [{"k": int(a)} if a % 5 == 0 else {} for a in rng.integers(0, 50, n_rows)],
+    })
+
+
+def test_columnar_matches_legacy_semantics():
+    df = _synthetic_frame(2_000, 150)
+    _assert_same_semantics(columnar_aggregate(df, ["id"], RULES), _legacy_aggregate(df))
+
+
+def test_first_appearance_order_and_empty_values():
+    """Les doublons disparaissent, l'ordre de première apparition est conservé, les vides sont ignorés."""
+    df = pd.DataFrame({
+        "id": ["B", "A", "B", "B"],
+        "description": ["d2", None, "", "d1"],
+        "source_ids": [["c3", "c1"], None, ["c1", "c2"], []],
+    })
+    out = columnar_aggregate(df, ["id"], {"description": JOIN_UNIQUE, "source_ids": UNION_LISTS})
+
+    assert out["id"].tolist() == ["B", "A"]
+    assert out["description"].tolist() == ["d2 | d1", ""]
+    assert out["source_ids"].tolist() == [["c3", "c1", "c2"], []]
+
+
+def test_core_resolver_clusters_collapse_on_pivot():
+    """Le pivot (plus fréquent) garde son identité, les variantes y sont fusionnées."""
+    resolver = CoreResolver(encyclopedia=None, similarity_threshold=0.8)
+    df = pd.DataFrame([
+        {"id": "v1", "title": "Abu Hurayra", "slug": "ABU_HURAYRA", "type": "Sahabi", "category": "Human",
+         "description": "narrator", "frequency": 1, "source_ids": ["c2"], "rank": 3,
+         "community_ids": [], "attributes": {"a": 1}, "phonetic_key": "APRR"},
+        {"id": "p", "title": "Abu Hurayrah", "slug": "ABU_HURAYRAH", "type": "Sahabi", "category": "Human",
+         "description": "companion", "frequency": 5, "source_ids": ["c1", "c2"], "rank": 1,
+         "community_ids": [], "attributes": {}, "phonetic_key": "APRR"},
+        {"id": "o", "title": "Abu Hurayrah", "slug": "ABU_HURAYRAH", "type": "Place", "category": "Place",
+         "description": "other", "frequency": 2, "source_ids": ["c9"], "rank": 1,
+         "community_ids": [], "attributes": {}, "phonetic_key": "APRR"},
+    ])
+    changes = {}
+    merged = resolver._algorithmic_merging(df, changes)
+
+    assert changes == {"v1": "p"}
+    assert merged["id"].tolist() == ["p", "o"]
+    pivot = merged.iloc[0]
+    assert pivot["frequency"] == 6 and pivot["rank"] == 3
+    assert pivot["description"] == "companion | narrator"
+    assert pivot["source_ids"] == ["c1", "c2"]
+    assert pivot["attributes"] == {"a": 1}
+    assert pivot["review_status"] == "NOT_KNOWN"
+
+
+def test_same_semantics_on_50k_rows():
+    """Sur 50k lignes (12k identités), même résultat que l'ancienne version."""
+    df = _synthetic_frame(50_000, 12_000, seed=1)
+
+    old = _legacy_aggregate(df)
+    new = columnar_aggregate(df, ["id"], RULES)
+
+    _assert_same_semantics(new, old)
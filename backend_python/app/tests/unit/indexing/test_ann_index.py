@@ -0,0 +1,50 @@
+import pytest
+import numpy as np
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core.data_model.entity import EntityModel
+from app.indexing.operations.entity_resolution.ann_index import ANNIndex
+from app.indexing.operations.entity_resolution.llm_resolver import LLMResolver
+
+
+def _normalized(rows):
+    v = np.asarray(rows, dtype=np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def test_exact_knn_pairs_are_unique_and_thresholded():
+    vectors = _normalized([[1, 0, 0], [0.98, 0.05, 0], [0, 1, 0], [0, 0.97, 0.1], [0, 0, 1]])
+    pairs = ANNIndex(vectors, hnsw_min_size=10_000).query_pairs(k=2, min_similarity=0.9)
+
+    assert [(i, j) for i, j, _ in pairs] == [(0, 1), (2, 3)]
+    assert all(sim >= 0.9 for _, _, sim in pairs)
+
+
+def test_embedding_mode_links_transliteration_variants():
+    """'Husayn' et 'Al-Hussein' n'ont aucun n-gramme commun : seul l'embedding les rapproche."""
+    entities = [
+        EntityModel(title="Husayn", type="Sahabi", description="Grandson of the Prophet, killed at Karbala"),
+        EntityModel(title="Al-Hussein", type="Sahabi", description="Martyr of the battle of Karbala"),
+        EntityModel(title="Khalid ibn al-Walid", type="Sahabi", description="Commander of Muslim armies"),
+    ]
+    embeddings = _normalized([[1, 0.1, 0], [0.95, 0.15, 0], [0, 0, 1]])
+
+    resolver = LLMResolver(light_service=MagicMock(), heavy_service=MagicMock(), embedder=MagicMock(), resolution_mode="embedding")
+    clusters = resolver._create_algo_clusters(entities, embeddings)
+
+    groups = sorted(sorted(e.title for e in c) for c in clusters)
+    assert groups == [["Al-Hussein", "Husayn"], ["Khalid ibn al-Walid"]]
+
+
+@pytest.mark.asyncio
+async def test_embedder_is_called_once_per_category_and_falls_back():
+    embedder = MagicMock()
+    embedder.embed = AsyncMock(side_effect=RuntimeError("model unavailable"))
+    resolver = LLMResolver(light_service=MagicMock(), heavy_service=MagicMock(), embedder=embedder, resolution_mode="embedding")
+
+    entities = [EntityModel(title=t, type="Sahabi", description="d") for t in ("Umar", "Uthman")]
+    assert await resolver._embed_entities(entities) is None
+    embedder.embed.assert_awaited_once()
+
+    # Sans embedder, le mode embedding retombe sur TF-IDF
+    assert LLMResolver(MagicMock(), MagicMock(), resolution_mode="embedding").resolution_mode == "tfidf"
@@ -0,0 +1,63 @@
+import os
+import pandas as pd
+
+from app.indexing.operations.graph.store_manager import GraphStoreManager
+from app.infrastructure.neo4j.bulk_import import Neo4jImportExporter
+
+
+def _frames():
+    entities = pd.DataFrame([
+        {"id": "a", "title": "Abu Bakr", "type": "Sahabi", "description": "first caliph, \"al-Siddiq\"\nof Quraysh",
+         "frequency": 3, "source_ids": ["c1", "c2"]},
+        {"id": "b", "title": "Umar", "type": "Sahabi", "description": "second caliph", "frequency": 2, "source_ids": ["c2"]},
+    ])
+    relationships = pd.DataFrame([
+        {"source_id": "b", "target_id": "a", "description": "succeeded", "weight": 2.0},
+        {"source_id": "a", "target_id": "b", "description": "appointed", "weight": 1.0},
+        {"source_id": "a", "target_id": "ghost", "description": "hallucinated", "weight": 1.0},
+    ])
+    return entities, relationships
+
+
+def _read(directory, name):
+    header = pd.read_csv(os.path.join(directory, f"{name}_header.csv")).columns.tolist()
+    return pd.read_csv(os.path.join(directory, f"{name}.csv.gz"), header=None, names=header, keep_default_na=False)
+
+
+def test_export_matches_the_online_writer(tmp_path):
+    """Clés d'arêtes et hashes identiques à GraphStoreManager : une synchro ultérieure ne réécrit rien."""
+    entities, relationships = _frames()
+    manifest = Neo4jImportExporter(str(tmp_path)).export(entities, relationships, doc_id="doc-1")
+
+    assert (manifest.nodes, manifest.relationships) == (2, 2)  # L'arête vers une entité inconnue est écartée
+    nodes, edges = _read(tmp_path, "entities"), _read(tmp_path, "relationships")
+
+    assert nodes["id:ID(Entity)"].tolist() == ["a", "b"]
+    assert nodes.loc[0, "description"] == entities.loc[0, "description"]  # Guillemets et retours à la ligne préservés
+    assert nodes["source_ids:string[]"].tolist() == ["c1;c2", "c2"]
+    assert nodes["doc_ids:string[]"].tolist() == ["doc-1", "doc-1"]
+    assert nodes["content_hash"].tolist() == GraphStoreManager._content_hashes(
+        entities[["id"] + GraphStoreManager.ENTITY_PROPERTIES], GraphStoreManager.ENTITY_PROPERTIES
+    )
+
+    online = relationships.iloc[:2].sort_values(["source_id", "target_id"])
+    assert edges[":START_ID(Entity)"].tolist() == ["a", "b"]
+    assert edges["key"].tolist() == GraphStoreManager._relationship_keys(online)
+    assert edges["content_hash"].tolist() == GraphStoreManager._content_hashes(online, GraphStoreManager.RELATIONSHIP_PROPERTIES)
+
+
+def test_export_is_deterministic_and_command_is_complete(tmp_path):
+    entities, relationships = _frames()
+    first = Neo4jImportExporter(str(tmp_path / "1")).export(entities, relationships)
+    Neo4jImportExporter(str(tmp_path / "2")).export(entities.iloc[::-1], relationships)
+
+    for name in ("entities", "relationships"):
+        a, b = _read(tmp_path / "1", name), _read(tmp_path / "2", name)
+        pd.testing.assert_frame_equal(
+            a.sort_values(a.columns[0]).reset_index(drop=True), b.sort_values(b.columns[0]).reset_index(drop=True)
+        )
+
+    command = first.command("neo4j")
+    assert command[:5] == ["neo4j-admin", "database", "import", "full", "neo4j"]
+    assert "--nodes=Entity=entities_header.csv,entities.csv.gz" in command
+    assert "--relationships=RELATED_TO=relationships_header.csv,relationships.csv.gz" in command
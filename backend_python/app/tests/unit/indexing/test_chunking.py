@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from app.indexing.operations.pdf.spatial_processor import ImageRef, PictureIndex, SpatialProcessor
+from app.indexing.operations.storage_processor import ImageStorageProcessor
+
+
+def _bbox(t, b, l=0.0, r=100.0):
+    return SimpleNamespace(l=l, t=t, r=r, b=b)
+
+
+class FakePicture:
+    """PictureItem minimal : compte ses rendus pour vérifier le rendu paresseux."""
+    def __init__(self, index, page_no, top, height=2.0):
+        self.self_ref = f"#/pictures/{index}"
+        self.prov = [SimpleNamespace(page_no=page_no, bbox=_bbox(top, top + height))]
+        self.renders = 0
+
+    def get_image(self, doc):
+        self.renders += 1
+        return Image.new("RGB", (200, 200))
+
+
+def _chunk(text, items):
+    return SimpleNamespace(
+        text=text,
+        meta=SimpleNamespace(headings=[], label="text", doc_items=[
+            SimpleNamespace(prov=[SimpleNamespace(page_no=p, bbox=_bbox(t, b))]) for p, t, b in items
+        ])
+    )
+
+
+def test_picture_index_queries_only_the_chunk_pages():
+    pictures = [FakePicture(0, 1, 500), FakePicture(1, 2, 50), FakePicture(2, 2, 700), FakePicture(3, 9, 10)]
+    index = PictureIndex(SimpleNamespace(pictures=pictures))
+
+    assert len(index) == 4
+    assert [ref.self_ref for _, ref, _ in index.query(2, 0, 200)] == ["#/pictures/1"]
+    assert len(index.query(2)) == 2 and index.query(5) == []
+
+
+def test_spatial_enrichment_links_refs_without_rendering():
+    pictures = [FakePicture(0, 1, 500), FakePicture(1, 2, 150), FakePicture(2, 3, 900)]
+    doc = SimpleNamespace(pictures=pictures)
+    chunks = [
+        _chunk("Page 1 seule", [(1, 100, 400)]),               # Chunk mono-page : toute image de la page
+        _chunk("Pages 2-3", [(2, 100, 300), (3, 100, 300)]),   # Multi-pages : fenêtre de proximité
+    ]
+
+    units = SpatialProcessor.enrich_with_spatial_data(doc, chunks)
+
+    assert [r.self_ref for r in units[0].metadata["docling_images"]] == ["#/pictures/0"]
+    assert [r.self_ref for r in units[1].metadata["docling_images"]] == ["#/pictures/1"]
+    assert all(isinstance(r, ImageRef) for u in units for r in u.metadata["docling_images"])
+    assert sum(p.renders for p in pictures) == 0
+
+
+@pytest.mark.asyncio
+async def test_storage_renders_refs_once_at_upload():
+    pictures = [FakePicture(0, 1, 500)]
+    doc = SimpleNamespace(pictures=pictures)
+    ref = PictureIndex(doc).query(1)[0][1]
+
+    class FakeStorage:
+        def __init__(self):
+            self.uploads = 0
+        def upload_image(self, pil_image):
+            self.uploads += 1
+            return f"http://minio/{self.uploads}.jpg"
+
+    storage = FakeStorage()
+    units = SpatialProcessor.enrich_with_spatial_data(doc, [_chunk("a", [(1, 100, 400)]), _chunk("b", [(1, 450, 480)])])
+    units[1].metadata["docling_images"] = [ref]   # Même image référencée deux fois
+
+    units = await ImageStorageProcessor(storage, doc=doc).process(units)
+
+    assert [u.metadata["image_urls"] for u in units] == [["http://minio/1.jpg"], ["http://minio/1.jpg"]]
+    assert pictures[0].renders == 1 and storage.uploads == 1
+    assert all("docling_images" not in u.metadata for u in units)
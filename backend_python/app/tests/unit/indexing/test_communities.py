@@ -0,0 +1,237 @@
+import pytest
+import pandas as pd
+
+from app.core.data_model.community_report import CommunityReportModel
+from app.indexing.operations.graph.community_detector import CommunityDetector, COMMUNITY_COLUMNS
+from app.indexing.operations.graph.community_reporter import CommunityReportGenerator
+
+
+def _clique_graph(n_cliques: int = 3, size: int = 5):
+    """Cliques denses reliées par une seule arête : structure communautaire évidente."""
+    entities, rels = [], []
+    for c in range(n_cliques):
+        ids = [f"e{c}_{i}" for i in range(size)]
+        entities += [
+            {"id": i, "title": i.upper(), "type": "Sahabi", "description": f"member of {c}",
+             "source_ids": [f"chunk_{c}"]}
+            for i in ids
+        ]
+        rels += [
+            {"source_id": a, "target_id": b, "description": f"{a} knows {b}", "weight": 2.0}
+            for k, a in enumerate(ids) for b in ids[k + 1:]
+        ]
+        if c:
+            rels.append({"source_id": f"e{c - 1}_0", "target_id": f"e{c}_0", "description": "bridge", "weight": 0.5})
+    return pd.DataFrame(entities), pd.DataFrame(rels)
+
+
+class _FakeLLM:
+    def __init__(self):
+        self.calls = []
+
+    async def ask_json(self, system_prompt, user_prompt):
+        self.calls.append(user_prompt)
+        return {
+            "title": f"Report {len(self.calls)}",
+            "summary": "A tightly knit group.",
+            "rating": 7.5,
+            "findings": [{"summary": "Cohesion", "explanation": "Everyone knows everyone."}],
+        }
+
+
+class _FakeStore:
+    def __init__(self):
+        self.reports = {}
+
+    async def get_reports(self, community_ids):
+        return {i: self.reports[i] for i in community_ids if i in self.reports}
+
+    async def save_reports(self, reports):
+        self.reports.update({r.community_id: r for r in reports})
+
+
+@pytest.mark.asyncio
+async def test_detection_is_hierarchical_and_deterministic():
+    entities_df, rels_df = _clique_graph()
+    detector = CommunityDetector(algorithm="louvain", backend="networkx")
+
+    first = await detector.detect(entities_df, rels_df)
+    second = await detector.detect(entities_df, rels_df)
+
+    assert list(first.columns) == COMMUNITY_COLUMNS
+    assert first["id"].tolist() == second["id"].tolist()
+
+    # Chaque entité appartient à une communauté du niveau 0, les cliques ne sont pas coupées
+    top = first[first["level"] == 0]
+    assert sorted(e for members in top["entity_ids"] for e in members) == sorted(entities_df["id"])
+    for members in top["entity_ids"]:
+        assert len({m.split("_")[0] for m in members}) == 1 or len(members) > 5
+
+    by_id = first.set_index("id")
+    for row in first.itertuples():
+        if row.parent is not None:
+            assert set(row.entity_ids) < set(by_id.loc[row.parent, "entity_ids"])
+            assert row.id in by_id.loc[row.parent, "children"]
+        # Les arêtes internes relient deux membres de la communauté
+        assert len(row.relationship_ids) >= len(row.entity_ids) - 1
+        assert row.size == len(row.text_unit_ids)
+
+
+def test_nested_duplicates_and_small_communities_are_dropped():
+    """Un sous-groupe identique à son parent n'est pas dupliqué ; les singletons n'ont pas de communauté."""
+    entities_df, rels_df = _clique_graph(n_cliques=2, size=3)
+    entities_df = pd.concat([entities_df, pd.DataFrame([{"id": "lonely", "title": "LONELY"}])], ignore_index=True)
+    hierarchy = [
+        {**{e: "A" for e in entities_df["id"] if e != "lonely"}, "lonely": "B"},
+        {**{f"e0_{i}": "a" for i in range(3)}, **{f"e1_{i}": "b" for i in range(3)}},
+        {**{f"e0_{i}": "x" for i in range(3)}, **{f"e1_{i}": "y" for i in range(2)}},
+    ]
+    communities = CommunityDetector(min_size=2).build_communities(hierarchy, entities_df, rels_df)
+
+    assert communities["level"].tolist() == [0, 1, 1, 2]
+    root = communities.iloc[0]
+    assert "lonely" not in root["entity_ids"]
+    assert sorted(root["children"]) == sorted(communities[communities["level"] == 1]["id"])
+    # Le niveau 2 de e0 (identique à son parent) disparaît ; celui de e1 est rattaché à son parent
+    leaf = communities.iloc[3]
+    assert leaf["entity_ids"] == ["e1_0", "e1_1"]
+    assert leaf["parent"] == communities[communities["entity_ids"].apply(lambda m: "e1_2" in m) & (communities["level"] == 1)].iloc[0]["id"]
+    assert len(leaf["relationship_ids"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_reports_are_cached_by_context():
+    entities_df, rels_df = _clique_graph()
+    communities = await CommunityDetector(algorithm="louvain", backend="networkx").detect(entities_df, rels_df)
+
+    llm, store = _FakeLLM(), _FakeStore()
+    reporter = CommunityReportGenerator(llm, max_concurrency=2, store=store)
+
+    reports = await reporter.generate(communities, entities_df, rels_df)
+    assert len(reports) == len(communities) == len(llm.calls)
+    assert reports["full_content"].str.startswith("# Report").all()
+    assert (reports["rank"] == 7.5).all()
+
+    # Même contexte : aucun nouvel appel
+    await reporter.generate(communities, entities_df, rels_df)
+    assert len(llm.calls) == len(communities)
+
+    # Un résumé de membre change : seules les communautés qui le contiennent sont régénérées
+    entities_df.loc[entities_df["id"] == "e2_3", "description"] = "now the leader of 2"
+    await reporter.generate(communities, entities_df, rels_df)
+    touched = communities["entity_ids"].apply(lambda m: "e2_3" in m).sum()
+    assert len(llm.calls) == len(communities) + touched
+
+
+def test_oversized_context_falls_back_on_sub_reports():
+    entities_df, rels_df = _clique_graph(n_cliques=2, size=6)
+    hierarchy = [
+        {e: "all" for e in entities_df["id"]},
+        {e: e.split("_")[0] for e in entities_df["id"]},
+    ]
+    communities = CommunityDetector().build_communities(hierarchy, entities_df, rels_df)
+    child_reports = {
+        cid: CommunityReportModel(community_id=cid, title=f"Clan {cid}", summary="sub summary", rank=5.0)
+        for cid in communities[communities["level"] == 1]["id"]
+    }
+    reporter = CommunityReportGenerator(_FakeLLM(), max_input_tokens=120)
+    entities = reporter._index_entities(entities_df)
+    relationships = reporter._index_relationships(rels_df)
+
+    root = next(communities[communities["level"] == 0].itertuples(index=False))
+    context = reporter.build_context(root, entities, relationships, child_reports)
+
+    assert context.startswith("-----Sub-community reports-----")
+    assert context.count("sub summary") == 2
+    assert reporter._estimate_tokens(context.splitlines()) <= reporter.max_input_tokens + 30  # En-têtes de section compris
+
+
+class _FakeGraphStore:
+    """Graphe stocké en mémoire, interface de GraphStoreManager utilisée par le workflow."""
+    def __init__(self, entities_df, rels_df):
+        self.entities_df, self.rels_df = entities_df, rels_df
+        self.loaded_ids = None
+        self.community_ids = set()
+
+    async def load_graph(self, entity_ids=None):
+        self.loaded_ids = entity_ids
+        if entity_ids is None:
+            return self.entities_df.copy(), self.rels_df.copy()
+        ids = set(entity_ids)
+        rels = self.rels_df[self.rels_df["source_id"].isin(ids) & self.rels_df["target_id"].isin(ids)]
+        return self.entities_df[self.entities_df["id"].isin(ids)].copy(), rels.copy()
+
+    async def count_entities(self):
+        return len(self.entities_df)
+
+    async def get_community_ids(self):
+        return list(self.community_ids)
+
+    async def save_communities(self, communities_df, reports_df, stale_ids=None):
+        self.community_ids -= set(stale_ids or [])
+        self.community_ids |= set(communities_df["id"])
+
+
+class _FakeCommunityRepo(_FakeStore):
+    def __init__(self):
+        super().__init__()
+        self.communities = {}
+
+    async def has_communities(self):
+        return bool(self.communities)
+
+    async def get_community_ids(self):
+        return list(self.communities)
+
+    async def get_communities_by_entities(self, entity_ids):
+        ids = set(entity_ids)
+        return [c for c in self.communities.values() if ids & set(c.entity_ids)]
+
+    async def delete_communities(self, community_ids):
+        for i in community_ids:
+            self.communities.pop(i, None)
+            self.reports.pop(i, None)
+
+    async def save_communities(self, communities):
+        self.communities.update({c.id: c for c in communities})
+
+
+@pytest.mark.asyncio
+async def test_incremental_finalize_only_rebuilds_touched_communities():
+    from app.indexing.workflows.finalize_graph import workflow_finalize_graph
+
+    entities_df, rels_df = _clique_graph(n_cliques=6, size=5)
+    graph, repo, llm = _FakeGraphStore(entities_df, rels_df), _FakeCommunityRepo(), _FakeLLM()
+    detector = CommunityDetector(algorithm="louvain", backend="networkx")
+    reporter = CommunityReportGenerator(llm, store=repo)
+
+    # Delta vide : rien à faire
+    await workflow_finalize_graph(graph, detector, reporter, repo, entities_df.iloc[:0], rels_df.iloc[:0], incremental=True)
+    assert not llm.calls and graph.loaded_ids is None
+
+    # Pas encore de communautés : passe complète
+    await workflow_finalize_graph(graph, detector, reporter, repo, entities_df, rels_df, incremental=True)
+    full_calls = len(llm.calls)
+    before = dict(repo.communities)
+    assert full_calls == len(before) > 0
+    assert graph.community_ids == set(before)
+
+    # Nouveau document : une entité rattachée à la clique 5, un résumé modifié dans la clique 5
+    new_entity = pd.DataFrame([{"id": "e5_new", "title": "E5_NEW", "type": "Sahabi", "description": "newcomer", "source_ids": ["chunk_9"]}])
+    new_rels = pd.DataFrame([
+        {"source_id": "e5_new", "target_id": f"e5_{i}", "description": "joins", "weight": 2.0} for i in range(3)
+    ])
+    graph.entities_df = pd.concat([entities_df, new_entity], ignore_index=True)
+    graph.entities_df.loc[graph.entities_df["id"] == "e5_1", "description"] = "renamed"
+    graph.rels_df = pd.concat([rels_df, new_rels], ignore_index=True)
+
+    delta_entities = graph.entities_df[graph.entities_df["id"].isin(["e5_new", "e5_1"])]
+    await workflow_finalize_graph(graph, detector, reporter, repo, delta_entities, new_rels, incremental=True)
+
+    # Seul le sous-graphe de la clique 5 est rechargé et reclusterisé
+    assert graph.loaded_ids is not None and all(i.startswith("e5_") for i in graph.loaded_ids)
+    untouched = {i: c for i, c in before.items() if not any(e.startswith("e5_") for e in c.entity_ids)}
+    assert untouched and all(repo.communities.get(i) == c for i, c in untouched.items())
+    assert 0 < len(llm.calls) - full_calls <= len(before) - len(untouched) + 1
+    assert any("e5_new" in c.entity_ids for c in repo.communities.values())
+    assert graph.community_ids == set(repo.communities)
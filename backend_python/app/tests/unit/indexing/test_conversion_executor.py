@@ -0,0 +1,94 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.core.data_model.text_units import TextUnit
+from app.indexing.operations.pdf import conversion_executor as module
+from app.indexing.operations.pdf.conversion_executor import ConversionExecutor
+
+
+# 30 pages : numériques, scannées (OCR), numériques -> trois segments
+FLAGS = [False] * 10 + [True] * 10 + [False] * 10
+
+
+class FakeConversion:
+    """Remplace convert_units : une unité par page de début, le premier segment rendu en dernier."""
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.fail_on = fail_on
+
+    def __call__(self, file_path, page_range=None, do_ocr=False):
+        self.calls.append((page_range, do_ocr))
+        if page_range == self.fail_on:
+            raise BrokenProcessPool("worker tué (OOM)")
+        first = page_range[0] if page_range else 1
+        time.sleep(0.05 if first == 1 else 0.0)  # Les segments terminent dans le désordre
+        return [TextUnit(id="chunk_0", text=f"page {first}", page_numbers=[first], headings=[f"H{first}"])]
+
+
+class TrackingExecutor(ThreadPoolExecutor):
+    """Exécuteur en threads à la place du pool de processus (fonctions patchées visibles)."""
+    def __init__(self):
+        super().__init__(max_workers=3)
+        self.shut_down = False
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.shut_down = True
+        super().shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+@pytest.fixture
+def fake_pipeline(monkeypatch):
+    conversion = FakeConversion()
+    monkeypatch.setattr(module, "classify_pages", lambda file_path: FLAGS)
+    monkeypatch.setattr(module, "convert_units", conversion)
+    monkeypatch.setattr(module, "finalize_units", lambda units, identity_text=None: units)
+    monkeypatch.setattr(module, "STREAMING_CONVERSION", False)
+    monkeypatch.setattr(ConversionExecutor, "_executor", None)
+    return conversion
+
+
+@pytest.mark.asyncio
+async def test_thread_path_converts_segments_in_page_order(fake_pipeline, monkeypatch):
+    """Sans pool de processus : conversion dans un thread, segments OCR routés et recousus dans l'ordre."""
+    monkeypatch.setattr(module, "CONVERSION_USE_PROCESS_POOL", False)
+
+    units = await ConversionExecutor.run("book.pdf")
+
+    assert fake_pipeline.calls == [((1, 10), False), ((11, 20), True), ((21, 30), False)]
+    assert [u.text for u in units] == ["page 1", "page 11", "page 21"]
+    assert [u.id for u in units] == ["chunk_0", "chunk_1", "chunk_2"]
+    assert ConversionExecutor._executor is None
+
+
+@pytest.mark.asyncio
+async def test_parallel_segments_are_stitched_in_page_order(fake_pipeline, monkeypatch):
+    """Segments convertis en parallèle : l'ordre des pages ne dépend pas de l'ordre de fin."""
+    monkeypatch.setattr(module, "CONVERSION_USE_PROCESS_POOL", True)
+    executor = TrackingExecutor()
+    monkeypatch.setattr(ConversionExecutor, "_executor", executor)
+
+    units = await ConversionExecutor.run("book.pdf")
+
+    assert sorted(fake_pipeline.calls) == [((1, 10), False), ((11, 20), True), ((21, 30), False)]
+    assert [u.page_numbers[0] for u in units] == [1, 11, 21]
+    assert [u.id for u in units] == ["chunk_0", "chunk_1", "chunk_2"]
+    assert ConversionExecutor._executor is executor
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_broken_pool_is_reset_for_the_next_document(fake_pipeline, monkeypatch):
+    """Un worker mort casse le pool : l'erreur remonte et le prochain document repart d'un pool neuf."""
+    monkeypatch.setattr(module, "CONVERSION_USE_PROCESS_POOL", True)
+    fake_pipeline.fail_on = (11, 20)
+    executor = TrackingExecutor()
+    monkeypatch.setattr(ConversionExecutor, "_executor", executor)
+
+    with pytest.raises(BrokenProcessPool):
+        await ConversionExecutor.run("book.pdf")
+
+    assert executor.shut_down
+    assert ConversionExecutor._executor is None
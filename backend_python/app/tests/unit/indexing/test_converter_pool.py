@@ -0,0 +1,90 @@
+import threading
+import time
+
+from app.indexing.operations.pdf.converter_pool import ConverterOptions, ConverterPool
+
+
+class FakeFactory:
+    """Simule la construction coûteuse d'un DocumentConverter."""
+    def __init__(self):
+        self.built = []
+
+    def __call__(self, options):
+        converter = {"options": options, "n": len(self.built)}
+        self.built.append(converter)
+        return converter
+
+
+def test_converter_reused_across_leases():
+    """Un convertisseur chaud est réutilisé : les modèles ne sont chargés qu'une fois."""
+    factory = FakeFactory()
+    pool = ConverterPool(factory, max_converters=4)
+    standard, ocr = ConverterOptions(), ConverterOptions(do_ocr=True)
+
+    pool.warm([standard])
+    for _ in range(3):
+        with pool.lease(standard) as converter:
+            assert converter["options"] == standard
+    with pool.lease(ocr) as converter:
+        assert converter["options"] == ocr
+
+    assert len(factory.built) == 2
+    assert pool.idle_count(standard) == 1 and pool.idle_count(ocr) == 1
+
+
+def test_failed_conversion_returns_converter():
+    factory = FakeFactory()
+    pool = ConverterPool(factory, max_converters=1)
+    try:
+        with pool.lease(ConverterOptions()):
+            raise ValueError("PDF corrompu")
+    except ValueError:
+        pass
+    with pool.lease(ConverterOptions()):
+        pass
+    assert len(factory.built) == 1
+
+
+def test_pool_bounded_evicts_idle_and_waits():
+    """La limite globale est respectée : éviction LRU d'un inactif, sinon attente."""
+    factory = FakeFactory()
+    pool = ConverterPool(factory, max_converters=1)
+    standard, ocr = ConverterOptions(), ConverterOptions(do_ocr=True)
+
+    with pool.lease(standard):
+        pass
+    with pool.lease(ocr):  # Le convertisseur standard inactif est évincé
+        assert pool.size == 1
+    assert pool.idle_count(standard) == 0 and pool.idle_count(ocr) == 1
+
+    events = []
+    def second_lease():
+        with pool.lease(ocr):
+            events.append("second")
+
+    with pool.lease(ocr):
+        worker = threading.Thread(target=second_lease)
+        worker.start()
+        time.sleep(0.05)
+        events.append("first released")
+    worker.join(timeout=2)
+
+    assert events == ["first released", "second"]
+    assert pool.size == 1 and len(factory.built) == 2
+
+
+def test_clear_drops_leased_converters_on_return():
+    """Un convertisseur prêté pendant clear() n'est pas remis en réserve à son retour."""
+    factory = FakeFactory()
+    pool = ConverterPool(factory, max_converters=2)
+    standard = ConverterOptions()
+
+    pool.warm([standard])
+    with pool.lease(standard) as stale:
+        pool.clear()
+        assert pool.size == 1  # Le convertisseur prêté reste compté jusqu'à son retour
+    assert pool.size == 0 and pool.idle_count(standard) == 0
+
+    with pool.lease(standard) as fresh:
+        assert fresh is not stale
+    assert len(factory.built) == 2 and pool.idle_count(standard) == 1
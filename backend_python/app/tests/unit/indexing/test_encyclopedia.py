@@ -2,6 +2,8 @@ import pytest
 import json
 import os
 from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+from app.core.data_model.encyclopedia import EncyclopediaEntry
 from app.indexing.operations.entity_resolution.encyclopedia_manager import EncyclopediaManager
 
 # ==========================================
@@ -98,4 +100,29 @@ class TestEncyclopediaManager:
         
         matches = manager.find_match("  AL-FARUQ  ", "SAHABI")
         assert len(matches) == 1
-        print(f"✅ Normalisation validée (espaces et majuscules).")
\ No newline at end of file
+        print(f"✅ Normalisation validée (espaces et majuscules).")
+
+class TestEncyclopediaBulkMatch:
+
+    @pytest.mark.asyncio
+    async def test_find_matches_dedups_and_realigns(self):
+        """Vérifie qu'un seul appel SQL est fait et que les résultats restent alignés."""
+        umar = EncyclopediaEntry(slug="UMAR_IBN_AL_KHATTAB", title="Umar ibn al-Khattab", type="Sahabi", core_summary="Test summary")
+
+        repo = MagicMock()
+        repo.search_many_by_criteria = AsyncMock(return_value=[[umar], []])
+        manager = EncyclopediaManager(repo)
+
+        matches = await manager.find_matches([
+            ("Umar ibn al-Khattab", "Human"),
+            ("Inconnu", "Human"),
+            ("umar ibn al khattab", "Human"),  # Même slug -> même requête
+            ("", "Human"),                     # Slug vide -> jamais envoyé
+        ])
+
+        repo.search_many_by_criteria.assert_awaited_once_with([
+            ("UMAR_IBN_AL_KHATTAB", "Human"),
+            ("INCONNU", "Human"),
+        ])
+        assert [len(m) for m in matches] == [1, 0, 1, 0]
+        assert matches[2][0].slug == "UMAR_IBN_AL_KHATTAB"
@@ -0,0 +1,113 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from app.services.graph.graph_snapshot import GraphSnapshot
+from app.services.graph.snapshot_store import GraphSnapshotStore
+
+
+def _frames():
+    entities = pd.DataFrame([
+        {"id": i, "title": i.upper(), "type": t, "frequency": f}
+        for i, t, f in [("a", "Sahabi", 3), ("b", "Sahabi", 1), ("c", "Place", 2), ("d", "Battle", 1), ("e", "Place", 1)]
+    ])
+    relationships = pd.DataFrame([
+        {"source_id": "a", "target_id": "b", "weight": 1.0},
+        {"source_id": "b", "target_id": "a", "weight": 2.0},   # Arête parallèle : les poids s'additionnent
+        {"source_id": "b", "target_id": "c", "weight": 1.0},
+        {"source_id": "a", "target_id": "d", "weight": 0.5},
+        {"source_id": "d", "target_id": "c", "weight": 0.5},
+        {"source_id": "c", "target_id": "ghost", "weight": 9.0},  # Extrémité inconnue : ignorée
+        {"source_id": "c", "target_id": "c", "weight": 9.0},      # Boucle : ignorée
+    ])
+    return entities, relationships
+
+
+def test_csr_structure_and_queries():
+    snapshot = GraphSnapshot.from_frames(*_frames(), version=1)
+
+    assert (snapshot.num_nodes, snapshot.num_edges) == (5, 4)
+    assert snapshot.index_of(["c", "zzz", "a"]).tolist() == [2, -1, 0]
+    assert snapshot.degree.tolist() == [2, 2, 2, 2, 0]
+    assert snapshot.node_type(2) == "Place"
+
+    assert snapshot.neighbors("a") == [("b", 3.0), ("d", 0.5)]
+    assert snapshot.k_hop(["a"], k=1) == {"a": 0, "b": 1, "d": 1}
+    assert snapshot.k_hop(["a"], k=2) == {"a": 0, "b": 1, "d": 1, "c": 2}
+    assert snapshot.k_hop(["e", "unknown"], k=3) == {"e": 0}
+    assert len(snapshot.k_hop(["a"], k=2, max_nodes=2)) == 2
+
+    # a -> b -> c (1/3 + 1) est plus court que a -> d -> c (2 + 2)
+    path, cost = snapshot.shortest_path("a", "c")
+    assert path == ["a", "b", "c"] and abs(cost - (1 / 3 + 1)) < 1e-6
+    assert snapshot.shortest_path("a", "e") == ([], float("inf"))
+
+
+def test_publish_and_hot_swap_between_workers(tmp_path):
+    """Deux stores sur le même répertoire simulent deux workers uvicorn."""
+    writer = GraphSnapshotStore(str(tmp_path), keep_versions=2, refresh_interval=0.0)
+    reader = GraphSnapshotStore(str(tmp_path), keep_versions=2, refresh_interval=0.0)
+    assert reader.current() is None
+
+    entities, relationships = _frames()
+    writer.publish(GraphSnapshot.from_frames(entities, relationships, version=1))
+    first = reader.current()
+    assert first.version == 1 and isinstance(first.indices, np.memmap)
+    assert first.k_hop(["a"], k=2) == {"a": 0, "b": 1, "d": 1, "c": 2}
+
+    entities.loc[len(entities)] = {"id": "f", "title": "F", "type": "Place", "frequency": 1}
+    relationships.loc[len(relationships)] = {"source_id": "e", "target_id": "f", "weight": 1.0}
+    for version in (2, 3):
+        writer.publish(GraphSnapshot.from_frames(entities, relationships, version=version))
+
+    second = reader.current()
+    assert second.version == 3 and second.neighbors("e") == [("f", 1.0)]
+    assert sorted(p.name for p in tmp_path.iterdir() if p.is_dir()) == ["v2", "v3"]
+    # Une requête en cours sur l'ancienne version reste valide après l'élagage
+    assert first.neighbors("a") == [("b", 3.0), ("d", 0.5)]
+
+
+def test_k_hop_matches_a_reference_bfs():
+    """Graphe aléatoire de taille modeste : distances k-hop identiques à un BFS networkx (non orienté)."""
+    rng = np.random.default_rng(0)
+    n, m = 300, 900
+    entities = pd.DataFrame({"id": [f"e{i}" for i in range(n)], "type": "Sahabi", "frequency": 1})
+    relationships = pd.DataFrame({
+        "source_id": [f"e{i}" for i in rng.integers(0, n, m)],
+        "target_id": [f"e{i}" for i in rng.integers(0, n, m)],
+        "weight": rng.random(m) + 0.1,
+    })
+    snapshot = GraphSnapshot.from_frames(entities, relationships)
+
+    reference = nx.Graph()
+    reference.add_nodes_from(entities["id"])
+    reference.add_edges_from(
+        (s, t) for s, t in zip(relationships["source_id"], relationships["target_id"]) if s != t
+    )
+
+    for seed in ("e0", "e17", "e123"):
+        for k in (1, 2, 3):
+            expected = nx.single_source_shortest_path_length(reference, seed, cutoff=k)
+            assert snapshot.k_hop([seed], k=k) == expected
+
+    # Plusieurs graines : distance à la graine la plus proche
+    expected = {}
+    for seed in ("e1", "e2"):
+        for node, hop in nx.single_source_shortest_path_length(reference, seed, cutoff=2).items():
+            expected[node] = min(hop, expected.get(node, hop))
+    assert snapshot.k_hop(["e1", "e2"], k=2) == expected
+
+
+def test_dependency_serves_the_lifespan_store(tmp_path):
+    """La dépendance FastAPI lit le store de app.state : une publication y est visible immédiatement."""
+    from types import SimpleNamespace
+    from app.api.dependencies import get_graph_snapshot, get_snapshot_store
+
+    store = GraphSnapshotStore(str(tmp_path), refresh_interval=60.0)
+    request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(graph_snapshots=store)))
+    assert get_snapshot_store(request) is store
+    assert get_graph_snapshot(request) is None
+
+    snapshot = GraphSnapshot.from_frames(*_frames(), version=7)
+    store.publish(snapshot)
+    assert get_graph_snapshot(request) is snapshot
@@ -0,0 +1,214 @@
+import asyncio
+import pytest
+import pandas as pd
+from neo4j.exceptions import TransientError
+
+from app.infrastructure.neo4j.bulk_writer import Neo4jBulkWriter
+from app.indexing.operations.graph.store_manager import GraphStoreManager
+from app.infrastructure.neo4j.schema_manager import Neo4jSchemaManager
+
+
+class _FakeNeo4jClient:
+    """Enregistre les batches écrits ; peut simuler un deadlock sur le premier appel."""
+    def __init__(self, deadlocks: int = 0, read_results=None):
+        self.batches = []
+        self.queries = []
+        self.write_queries = []
+        self.read_results = list(read_results or [])
+        self.deadlocks = deadlocks
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def execute_write(self, query, parameters=None, database="neo4j"):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.005)
+        self.in_flight -= 1
+        if self.deadlocks:
+            self.deadlocks -= 1
+            raise TransientError("ForsetiClient can't acquire ExclusiveLock")
+        self.batches.append(parameters["batch"])
+        self.write_queries.append(query)
+        return []
+
+    async def execute_query(self, query, parameters=None, database="neo4j"):
+        self.queries.append(query)
+        return self.read_results.pop(0) if self.read_results else []
+
+
+@pytest.mark.asyncio
+async def test_rows_are_chunked_with_bounded_concurrency():
+    client = _FakeNeo4jClient()
+    writer = Neo4jBulkWriter(client, batch_size=1000, max_concurrency=3)
+
+    written = await writer.write("UNWIND $batch AS row RETURN row", [{"i": i} for i in range(10_500)])
+
+    assert written == 10_500
+    assert sorted(len(b) for b in client.batches) == [500] + [1000] * 10
+    assert 1 < client.max_in_flight <= 3
+
+
+@pytest.mark.asyncio
+async def test_transient_deadlocks_are_retried():
+    client = _FakeNeo4jClient(deadlocks=2)
+    writer = Neo4jBulkWriter(client, batch_size=10, max_retries=3)
+    writer.BASE_BACKOFF = 0.001
+
+    await writer.write("UNWIND $batch AS row RETURN row", [{"i": i} for i in range(10)])
+    assert len(client.batches) == 1
+
+    failing = Neo4jBulkWriter(_FakeNeo4jClient(deadlocks=5), batch_size=10, max_retries=2)
+    failing.BASE_BACKOFF = 0.001
+    with pytest.raises(TransientError):
+        await failing.write("UNWIND $batch AS row RETURN row", [{"i": 1}])
+
+
+@pytest.mark.asyncio
+async def test_relationship_batches_are_ordered_by_endpoints():
+    client = _FakeNeo4jClient()
+    store = GraphStoreManager(client, writer=Neo4jBulkWriter(client, batch_size=2, max_concurrency=1))
+
+    rels = pd.DataFrame({
+        "source_id": ["c", "a", "b", "a"],
+        "target_id": ["x", "z", "y", "y"],
+        "description": ["d"] * 4,
+        "weight": [1.0] * 4,
+        "source_ids": [["chunk"]] * 4,
+    })
+    await store._upsert_relationships(rels)
+
+    rows = [r for b in client.batches for r in b]
+    assert [(r["source_id"], r["target_id"]) for r in rows] == [("a", "y"), ("a", "z"), ("b", "y"), ("c", "x")]
+    assert "source_ids" not in rows[0]
+
+
+def _entities():
+    return pd.DataFrame({
+        "id": ["e1", "e2", "e3"],
+        "title": ["Abu Bakr", "Umar", "Uthman"],
+        "type": ["Sahabi"] * 3,
+        "description": ["d1", "d2", "d3"],
+        "frequency": [1, 2, 3],
+    })
+
+
+@pytest.mark.asyncio
+async def test_only_new_or_changed_nodes_are_written():
+    entities = _entities()
+    hashes = GraphStoreManager._content_hashes(entities, GraphStoreManager.ENTITY_PROPERTIES)
+
+    # e1 inchangé et déjà rattaché au document, e2 modifié, e3 nouveau
+    existing = [
+        {"id": "e1", "content_hash": hashes[0], "tracked": True},
+        {"id": "e2", "content_hash": "stale", "tracked": True},
+    ]
+    client = _FakeNeo4jClient(read_results=[existing])
+    store = GraphStoreManager(client, writer=Neo4jBulkWriter(client, batch_size=100))
+    await store._upsert_entities(entities, doc_id="doc_1")
+
+    written = [r["id"] for b in client.batches for r in b]
+    assert written == ["e2", "e3"]
+    assert all(r["doc_id"] == "doc_1" for b in client.batches for r in b)
+
+    # Même contenu mais nouveau document -> réécrit pour la provenance
+    existing = [{"id": i, "content_hash": h, "tracked": False} for i, h in zip(entities["id"], hashes)]
+    client = _FakeNeo4jClient(read_results=[existing])
+    store = GraphStoreManager(client, writer=Neo4jBulkWriter(client, batch_size=100))
+    await store._upsert_entities(entities, doc_id="doc_2")
+    assert len(client.batches[0]) == 3
+
+
+def _relationships():
+    return pd.DataFrame({
+        "source_id": ["e1", "e2"],
+        "target_id": ["e2", "e3"],
+        "description": ["d1", "d2"],
+        "weight": [1.0, 2.0],
+    })
+
+
+def test_relationship_key_is_compact_and_stable():
+    keys = GraphStoreManager._relationship_keys(_relationships())
+    assert keys == GraphStoreManager._relationship_keys(_relationships().assign(description=["new", "text"]))
+    assert len(set(keys)) == 2 and all(len(k) == 24 for k in keys)
+
+
+@pytest.mark.asyncio
+async def test_rewritten_description_updates_the_keyed_edge():
+    """Une description réécrite met à jour l'arête existante (même clé) au lieu d'en créer une autre."""
+    rels = _relationships()
+    keys = GraphStoreManager._relationship_keys(rels)
+    hashes = GraphStoreManager._content_hashes(rels, GraphStoreManager.RELATIONSHIP_PROPERTIES)
+    existing = [{"key": k, "content_hash": h, "tracked": True} for k, h in zip(keys, hashes)]
+
+    changed = rels.assign(description=["d1", "d2 rewritten"])
+    client = _FakeNeo4jClient(read_results=[existing])
+    store = GraphStoreManager(client, writer=Neo4jBulkWriter(client, batch_size=100))
+    await store._upsert_relationships(changed, doc_id="doc_1")
+
+    rows = [r for b in client.batches for r in b]
+    assert [r["key"] for r in rows] == [keys[1]]
+    assert "MERGE (source)-[r:RELATED_TO {key: row.key}]->(target)" in client.write_queries[0]
+
+
+@pytest.mark.asyncio
+async def test_orphan_edges_lose_the_document_provenance():
+    rels = _relationships()
+    keys = GraphStoreManager._relationship_keys(rels)
+    client = _FakeNeo4jClient(read_results=[[{"keys": keys}]])
+    store = GraphStoreManager(client, writer=Neo4jBulkWriter(client, batch_size=100))
+
+    await store._remove_orphan_relationships(rels.iloc[:1], doc_id="doc_1")
+
+    # Les clés précédentes viennent du nœud Document, sans parcourir les arêtes RELATED_TO
+    assert "MATCH (d:Document {id: $doc_id})" in client.queries[0]
+    assert client.batches == [
+        [{"key": keys[1], "doc_id": "doc_1"}],
+        [{"id": "doc_1", "keys": [keys[0]]}],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_first_ingestion_records_the_document_edge_keys():
+    """Premier passage d'un document : aucune arête orpheline, ses clés sont enregistrées."""
+    rels = _relationships()
+    client = _FakeNeo4jClient(read_results=[[]])
+    store = GraphStoreManager(client, writer=Neo4jBulkWriter(client, batch_size=100))
+
+    await store._remove_orphan_relationships(rels, doc_id="doc_1")
+
+    assert client.batches == [[{"id": "doc_1", "keys": sorted(GraphStoreManager._relationship_keys(rels))}]]
+    assert "MERGE (d:Document {id: row.id})" in client.write_queries[0]
+
+
+@pytest.mark.asyncio
+async def test_schema_is_applied_once_per_version():
+    """Le schéma n'est appliqué que si la version enregistrée est plus ancienne."""
+    statements = ["CREATE INDEX a IF NOT EXISTS FOR (e:Entity) ON (e.type)"]
+
+    fresh = _FakeNeo4jClient(read_results=[[]])
+    assert await Neo4jSchemaManager(fresh, version=2, statements=statements).apply() is True
+    assert statements[0] in fresh.queries
+    assert "SchemaVersion" in fresh.queries[-1]
+
+    up_to_date = _FakeNeo4jClient(read_results=[[{"version": 2}]])
+    assert await Neo4jSchemaManager(up_to_date, version=2, statements=statements).apply() is False
+    assert len(up_to_date.queries) == 1
+
+
+@pytest.mark.asyncio
+async def test_new_text_units_rewrite_an_unchanged_node():
+    """Contenu identique mais nouvelles unités de texte -> réécrit ; unités déjà connues -> ignoré."""
+    entities = _entities().assign(source_ids=[["c1"], ["c2", "c9"], ["c3"]])
+    hashes = GraphStoreManager._content_hashes(entities, GraphStoreManager.ENTITY_PROPERTIES)
+    existing = [
+        {"id": "e1", "content_hash": hashes[0], "tracked": True, "source_ids": ["c0", "c1"]},
+        {"id": "e2", "content_hash": hashes[1], "tracked": True, "source_ids": ["c2"]},
+        {"id": "e3", "content_hash": hashes[2], "tracked": True, "source_ids": ["c3"]},
+    ]
+    client = _FakeNeo4jClient(read_results=[existing])
+    store = GraphStoreManager(client, writer=Neo4jBulkWriter(client, batch_size=100))
+    await store._upsert_entities(entities, doc_id="doc_1")
+
+    rows = [r for b in client.batches for r in b]
+    assert [(r["id"], r["source_ids"]) for r in rows] == [("e2", ["c2", "c9"])]
@@ -0,0 +1,61 @@
+import pandas as pd
+from app.indexing.operations.entity_resolution.identity_tracker import IdentityTracker
+
+
+def test_transitive_chain_and_targets():
+    """A -> B -> C : tout le monde pointe vers C."""
+    tracker = IdentityTracker()
+    tracker.add_mapping("A", "B")
+    tracker.add_mapping("B", "C")
+
+    assert tracker.resolve() == {"A": "C", "B": "C"}
+    assert tracker.find_many(["A", "C", "UNKNOWN"]) == ["C", "C", "UNKNOWN"]
+
+
+def test_canonical_is_the_target_side():
+    """L'identité canonique reste celle de la cible, quel que soit le rang des arbres."""
+    tracker = IdentityTracker()
+    for i in range(10):
+        tracker.add_mapping(f"X{i}", "BIG")   # Gros arbre enraciné sur BIG
+    tracker.add_mapping("BIG", "ANCHOR")       # Fusion dans un singleton
+
+    final_map = tracker.resolve()
+    assert set(final_map.values()) == {"ANCHOR"}
+    assert "ANCHOR" not in final_map
+
+
+def test_cycles_and_invalid_values_are_ignored():
+    tracker = IdentityTracker()
+    tracker.add_mapping("A", "B")
+    tracker.add_mapping("B", "A")          # Cycle -> ignoré
+    tracker.add_mapping("C", "C")          # Self-loop
+    tracker.add_mapping(None, "D")
+    tracker.add_mapping("nan", "D")
+
+    assert tracker.resolve() == {"A": "B"}
+
+
+def test_remap_series_keeps_index_and_missing_values():
+    tracker = IdentityTracker()
+    tracker.add_mapping("A", "B")
+
+    ids = pd.Series(["A", None, "C", "A"], index=[10, 11, 12, 13])
+    remapped = tracker.remap(ids)
+
+    assert remapped[[10, 12, 13]].tolist() == ["B", "C", "B"]
+    assert pd.isna(remapped[11])
+    assert remapped.index.tolist() == [10, 11, 12, 13]
+
+
+def test_long_chain_resolves_to_its_end():
+    """Une chaîne de 100k redirections (rounds pyramidaux) pointe entièrement vers son dernier maillon."""
+    tracker = IdentityTracker()
+    n = 100_000
+    for i in range(n):
+        tracker.add_mapping(f"E{i}", f"E{i + 1}")
+    final_map = tracker.resolve()
+
+    assert len(final_map) == n
+    assert final_map["E0"] == f"E{n}"
+    assert final_map[f"E{n // 2}"] == f"E{n}"
+    assert set(final_map.values()) == {f"E{n}"}
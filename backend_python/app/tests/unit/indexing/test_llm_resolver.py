@@ -0,0 +1,66 @@
+import asyncio
+import random
+import pytest
+import pandas as pd
+from unittest.mock import MagicMock
+
+from app.core.data_model.entity import EntityModel
+from app.indexing.operations.entity_resolution.llm_resolver import LLMResolver
+
+
+class _SlowHeavyService:
+    """Faux LLM : fusionne toujours #1 dans #0, avec une latence aléatoire, et mesure le parallélisme."""
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def ask_tuples(self, system_prompt, user_prompt):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(random.uniform(0.01, 0.05))
+        self.in_flight -= 1
+        return [["MERGE", "1", "0"]]
+
+
+def _orphans():
+    rows = []
+    for base, entity_type in [("Abdullah", "Sahabi"), ("Abdurrahman", "Sahabi"), ("Zubayr", "Sahabi"),
+                              ("Khaybar", "Place"), ("Tabuk", "Place"), ("Hudaybiyyah", "Place")]:
+        for variant in (base, base + "h"):
+            rows.append(EntityModel(title=variant, type=entity_type, description=f"{base} context").model_dump())
+    return pd.DataFrame(rows)
+
+
+@pytest.mark.asyncio
+async def test_categories_and_clusters_run_concurrently_under_budget():
+    heavy = _SlowHeavyService()
+    light = MagicMock()
+
+    async def no_bridges(**kwargs):
+        return []
+    light.ask_json = no_bridges
+
+    resolver = LLMResolver(light_service=light, heavy_service=heavy, max_concurrency=4)
+    _, mapping = await resolver.llm_resolve(_orphans())
+
+    # 6 clusters (3 Human, 3 Geographic) -> 6 merges, jamais plus de 4 appels simultanés
+    assert len(mapping) == 6
+    assert 1 < heavy.max_in_flight <= 4
+
+
+@pytest.mark.asyncio
+async def test_mapping_is_deterministic_across_runs():
+    """Le résultat ne dépend pas de l'ordre d'arrivée des réponses."""
+    results = []
+    for _ in range(3):
+        light = MagicMock()
+
+        async def no_bridges(**kwargs):
+            return []
+        light.ask_json = no_bridges
+
+        resolver = LLMResolver(light_service=light, heavy_service=_SlowHeavyService(), max_concurrency=8)
+        _, mapping = await resolver.llm_resolve(_orphans())
+        results.append(list(mapping.items()))
+
+    assert results[0] == results[1] == results[2]
@@ -31,4 +31,50 @@ def test_text_splitter_table_flags():
     assert len(splitted) > 1
     assert splitted[0].metadata["is_table_cut"] is True
     assert splitted[1].metadata["is_table_continuation"] is True
-    assert "Suite Tableau" in splitted[1].metadata["heading_refined"]
\ No newline at end of file
+    assert "Suite Tableau" in splitted[1].metadata["heading_refined"]
+
+def _offsets_tokenizer():
+    """Tokenizer rapide par mots et ponctuation (offsets exacts, sans téléchargement)."""
+    from tokenizers import Tokenizer, models, pre_tokenizers, processors
+    from transformers import PreTrainedTokenizerFast
+
+    backend = Tokenizer(models.WordLevel({"[UNK]": 0, "[CLS]": 1, "[SEP]": 2}, unk_token="[UNK]"))
+    backend.pre_tokenizer = pre_tokenizers.Whitespace()
+    backend.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]", special_tokens=[("[CLS]", 1), ("[SEP]", 2)]
+    )
+    return PreTrainedTokenizerFast(tokenizer_object=backend, unk_token="[UNK]", cls_token="[CLS]", sep_token="[SEP]")
+
+
+def test_text_splitter_token_exact_windows():
+    """Découpage sur une seule tokenisation : fenêtres exactes, coupe aux meilleures frontières."""
+    from app.services.tokenizer_registry import TokenizerRegistry
+    TokenizerRegistry.register("test/offsets", _offsets_tokenizer())
+
+    sentences = [f"Phrase numéro {i} sur la bataille de Badr." for i in range(40)]
+    text = " ".join(sentences[:20]) + "\n\n" + " ".join(sentences[20:])
+    splitter = TextSplitter(max_tokens=60, overlap=10, tokenizer_name="test/offsets")
+
+    pieces = splitter.split_text(text)
+    counts = TokenizerRegistry.count_tokens(pieces, "test/offsets")
+
+    assert all(c <= 60 for c in counts)
+    assert min(counts[:-1]) >= 30                      # Fenêtres pleines (au moins la moitié du budget)
+    assert all(p.endswith(".") for p in pieces)        # Coupes en fin de phrase, jamais au milieu
+    assert pieces[1].split()[0] in text.split()        # Le recouvrement commence sur un mot entier
+
+
+def test_text_splitter_keeps_table_rows_together():
+    from app.services.tokenizer_registry import TokenizerRegistry
+    TokenizerRegistry.register("test/offsets", _offsets_tokenizer())
+
+    rows = ["| Nom | Tribu | Année |", "|---|---|---|"] + [f"| Compagnon {i} | Quraysh | {600 + i} |" for i in range(30)]
+    unit = TextUnit(id="t", text="\n".join(rows), headings=["Tableau"], tables=["x"])
+    splitter = TextSplitter(max_tokens=50, overlap=0, tokenizer_name="test/offsets")
+
+    splitted = splitter.split_units([unit])
+
+    assert len(splitted) > 1
+    for sub in splitted:
+        assert all(line.startswith("|") and line.endswith("|") for line in sub.text.splitlines())
+    assert splitted[1].metadata["is_table_continuation"] is True
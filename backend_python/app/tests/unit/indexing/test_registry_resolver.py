@@ -0,0 +1,95 @@
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core.data_model.entity import EntityModel
+from app.core.data_model.registry import RegistryEntry
+from app.indexing.operations.entity_resolution.registry_resolver import RegistryResolver
+
+
+def _entities(*titles):
+    return pd.DataFrame([EntityModel(title=t, type="Sahabi", description=f"{t} desc").model_dump() for t in titles])
+
+
+@pytest.mark.asyncio
+async def test_registry_links_known_identities_without_llm():
+    """Un alias connu est relié de façon déterministe, une entité sans candidat est ignorée."""
+    known = RegistryEntry(id="reg_abu_bakr", slug="ABU_BAKR", title="Abu Bakr", type="Sahabi",
+                          category="Human", aliases=["ABU_BAKR_AL_SIDDIQ"])
+
+    repo = MagicMock()
+    repo.find_candidates = AsyncMock(return_value=[[known], []])
+    llm = MagicMock()
+    llm.resolve_against_candidates = AsyncMock(return_value=None)
+
+    resolver = RegistryResolver(repo=repo, llm_resolver=llm)
+    entities = _entities("Abu Bakr al-Siddiq", "Nouveau Compagnon")
+    mapping = await resolver.resolve(entities)
+
+    assert mapping == {entities.iloc[0]["id"]: "reg_abu_bakr"}
+    repo.find_candidates.assert_awaited_once()
+    llm.resolve_against_candidates.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_registry_sends_ambiguous_candidates_to_llm():
+    """Deux candidats plausibles -> arbitrage du LLM."""
+    c1 = RegistryEntry(id="reg_zayd_h", slug="ZAYD_IBN_HARITHAH", title="Zayd ibn Harithah", type="Sahabi", category="Human", aliases=["ZAYD"])
+    c2 = RegistryEntry(id="reg_zayd_t", slug="ZAYD_IBN_THABIT", title="Zayd ibn Thabit", type="Sahabi", category="Human", aliases=["ZAYD"])
+
+    repo = MagicMock()
+    repo.find_candidates = AsyncMock(return_value=[[c1, c2]])
+    llm = MagicMock()
+    llm.resolve_against_candidates = AsyncMock(return_value="reg_zayd_t")
+
+    resolver = RegistryResolver(repo=repo, llm_resolver=llm)
+    entities = _entities("Zayd")
+    mapping = await resolver.resolve(entities)
+
+    assert mapping == {entities.iloc[0]["id"]: "reg_zayd_t"}
+    llm.resolve_against_candidates.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_register_embeds_descriptions_in_one_batch():
+    """Les descriptions sont vectorisées en un seul appel et stockées avec l'identité."""
+    repo = MagicMock()
+    repo.upsert_entries = AsyncMock()
+    embedder = MagicMock()
+    embedder.embed = AsyncMock(return_value=np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32))
+
+    resolver = RegistryResolver(repo=repo, llm_resolver=MagicMock(), embedder=embedder)
+    await resolver.register(_entities("Abu Bakr", "Umar"), aliases={})
+
+    embedder.embed.assert_awaited_once_with(["Abu Bakr: Abu Bakr desc", "Umar: Umar desc"])
+    entries = repo.upsert_entries.await_args.args[0]
+    assert [e.description_embedding for e in entries] == [[1.0, 0.0], [0.0, 1.0]]
+
+
+@pytest.mark.asyncio
+async def test_description_similarity_ranks_and_filters_candidates():
+    """Les candidats trop éloignés sémantiquement ne sont pas soumis au LLM ; les autres sont triés."""
+    far = RegistryEntry(id="reg_zayd_h", slug="ZAYD_IBN_HARITHAH", title="Zayd ibn Harithah", type="Sahabi",
+                        category="Human", aliases=["ZAYD"], description_embedding=[0.0, 1.0])
+    close = RegistryEntry(id="reg_zayd_t", slug="ZAYD_IBN_THABIT", title="Zayd ibn Thabit", type="Sahabi",
+                          category="Human", aliases=["ZAYD"], description_embedding=[1.0, 0.0])
+    legacy = RegistryEntry(id="reg_zayd_a", slug="ZAYD_IBN_ARQAM", title="Zayd ibn Arqam", type="Sahabi",
+                           category="Human", aliases=["ZAYD"])
+
+    repo = MagicMock()
+    repo.find_candidates = AsyncMock(return_value=[[far, legacy, close], [far]])
+    llm = MagicMock()
+    llm.resolve_against_candidates = AsyncMock(return_value="reg_zayd_t")
+    embedder = MagicMock()
+    embedder.embed = AsyncMock(return_value=np.array([[0.96, 0.28], [1.0, 0.0]], dtype=np.float32))
+
+    resolver = RegistryResolver(repo=repo, llm_resolver=llm, embedder=embedder, min_similarity=0.6)
+    entities = _entities("Zayd", "Zaid")
+    mapping = await resolver.resolve(entities)
+
+    # "Zaid" n'a que le candidat éloigné : entité nouvelle, pas d'appel LLM
+    assert mapping == {entities.iloc[0]["id"]: "reg_zayd_t"}
+    llm.resolve_against_candidates.assert_awaited_once()
+    sent = llm.resolve_against_candidates.await_args.args[1]
+    assert [c.id for c in sent] == ["reg_zayd_t", "reg_zayd_a"]
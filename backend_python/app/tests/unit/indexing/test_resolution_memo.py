@@ -0,0 +1,98 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core.data_model.entity import EntityModel
+from app.indexing.operations.entity_resolution.llm_resolver import LLMResolver
+from app.indexing.operations.entity_resolution.resolution_memo import ResolutionMemo
+
+
+class _InMemoryVerdictRepo:
+    """Remplace la table resolution_verdicts."""
+    def __init__(self):
+        self.rows = {}
+
+    async def get_verdicts(self, pair_keys):
+        return {k: self.rows[k] for k in pair_keys if k in self.rows}
+
+    async def save_verdicts(self, verdicts):
+        for v in verdicts:
+            self.rows[v.pair_key] = v
+
+
+def _entity(title, description="Companion of the Prophet"):
+    return EntityModel(title=title, type="Sahabi", description=description)
+
+
+def _resolver(memo, tuples):
+    heavy = MagicMock()
+    heavy.ask_tuples = AsyncMock(return_value=tuples)
+    return LLMResolver(light_service=MagicMock(), heavy_service=heavy, memo=memo), heavy
+
+
+def test_fingerprint_ignores_fragment_order():
+    a = ResolutionMemo.fingerprint("ABU_BAKR", "Human", "first caliph | father of Aisha")
+    b = ResolutionMemo.fingerprint("ABU_BAKR", "Human", "father of Aisha | first caliph ")
+    c = ResolutionMemo.fingerprint("ABU_BAKR", "Human", "another description")
+    assert a == b != c
+    assert ResolutionMemo.pair_key(a, c) == ResolutionMemo.pair_key(c, a)
+
+
+@pytest.mark.asyncio
+async def test_known_verdicts_premerge_and_prune_clusters():
+    memo = ResolutionMemo(_InMemoryVerdictRepo())
+    abu_bakr, siddiq, umar = _entity("Abu Bakr"), _entity("Abu Bakr al-Siddiq"), _entity("Umar")
+
+    # 1er passage : le LLM fusionne #1 dans #0, Umar reste distinct
+    resolver, heavy = _resolver(memo, [["MERGE", "1", "0"]])
+    first = await resolver._resolve_cluster([abu_bakr, siddiq, umar], "Human")
+    assert first == {siddiq.id: abu_bakr.id}
+    assert len(memo.repo.rows) == 3
+
+    # 2e passage, autre ordre : tout est connu -> aucun appel LLM, même résultat
+    resolver, heavy = _resolver(memo, [])
+    second = await resolver._resolve_cluster([umar, siddiq, abu_bakr], "Human")
+    assert second == first
+    heavy.ask_tuples.assert_not_awaited()
+
+    # Nouveau membre : seul lui et les survivants ayant une question ouverte partent au LLM
+    uthman = _entity("Uthman")
+    resolver, heavy = _resolver(memo, [])
+    await resolver._resolve_cluster([abu_bakr, siddiq, umar, uthman], "Human")
+    prompt = heavy.ask_tuples.await_args.kwargs["user_prompt"]
+    assert "Abu Bakr al-Siddiq" not in prompt
+    assert "Uthman" in prompt
+
+
+@pytest.mark.asyncio
+async def test_llm_failure_is_not_memorized():
+    memo = ResolutionMemo(_InMemoryVerdictRepo())
+    heavy = MagicMock()
+    heavy.ask_tuples = AsyncMock(side_effect=RuntimeError("timeout"))
+    resolver = LLMResolver(light_service=MagicMock(), heavy_service=heavy, memo=memo)
+
+    assert await resolver._resolve_cluster([_entity("Ali"), _entity("Aly")], "Human") == {}
+    assert memo.repo.rows == {}
+
+
+@pytest.mark.asyncio
+async def test_anchoring_verdict_is_reused():
+    memo = ResolutionMemo(_InMemoryVerdictRepo())
+    candidates = [
+        {"id": "enc_1", "slug": "ZAYD_IBN_HARITHAH", "title": "Zayd ibn Harithah", "category": "Human", "core_summary": "Adopted son"},
+        {"id": "enc_2", "slug": "ZAYD_IBN_THABIT", "title": "Zayd ibn Thabit", "category": "Human", "core_summary": "Scribe"},
+    ]
+
+    light = MagicMock()
+    light.ask_json = AsyncMock(return_value={"choice": "ZAYD_IBN_THABIT"})
+    resolver = LLMResolver(light_service=light, heavy_service=MagicMock(), memo=memo)
+
+    first = _entity("Zayd", "Scribe of the revelation")
+    first.attributes["anchoring_candidates"] = candidates
+    await resolver._resolve_anchoring(first)
+
+    second = _entity("Zayd", "Scribe of the revelation")
+    second.attributes["anchoring_candidates"] = candidates
+    await resolver._resolve_anchoring(second)
+
+    assert first.canonical_id == second.canonical_id == "enc_2"
+    light.ask_json.assert_awaited_once()
@@ -0,0 +1,86 @@
+import fitz
+
+from app.core.data_model.text_units import TextUnit
+from app.indexing.operations.pdf.sharding import (
+    classify_pages, page_count, plan_page_ranges, plan_segments, plan_windows, stitch_units
+)
+
+
+def test_plan_page_ranges():
+    assert plan_page_ranges(50, min_pages=120, pages_per_shard=60) == [None]
+    assert plan_page_ranges(240, min_pages=120, pages_per_shard=60) == [(1, 60), (61, 120), (121, 180), (181, 240)]
+    # Une queue trop courte (10 pages) est rattachée au shard précédent
+    assert plan_page_ranges(130, min_pages=120, pages_per_shard=60) == [(1, 60), (61, 130)]
+
+
+def test_page_count(tmp_path):
+    path = tmp_path / "book.pdf"
+    with fitz.open() as doc:
+        for _ in range(7):
+            doc.new_page()
+        doc.save(path)
+    assert page_count(str(path)) == 7
+
+
+def test_stitch_units_keeps_heading_continuity():
+    """Les unités d'un shard commençant au milieu d'une section héritent des titres du shard précédent."""
+    first = [
+        TextUnit(id="chunk_0", text="a", headings=["Chapitre 1"], page_numbers=[1]),
+        TextUnit(id="chunk_1", text="b", headings=["Chapitre 1", "Section 2"], page_numbers=[60]),
+    ]
+    second = [
+        TextUnit(id="chunk_0", text="c", headings=[], page_numbers=[61], metadata={"heading_full": ""}),
+        TextUnit(id="chunk_1", text="d", headings=["Chapitre 2"], page_numbers=[70]),
+        TextUnit(id="chunk_2", text="e", headings=[], page_numbers=[71]),
+    ]
+
+    units = stitch_units([first, [], second])
+
+    assert [u.id for u in units] == [f"chunk_{i}" for i in range(5)]
+    assert [u.page_numbers[0] for u in units] == [1, 60, 61, 70, 71]
+    assert units[2].headings == ["Chapitre 1", "Section 2"]
+    assert units[2].metadata["heading_full"] == "Chapitre 1 > Section 2"
+    # Après un nouveau titre, l'héritage inter-shard s'arrête
+    assert units[4].headings == []
+
+
+def test_classify_pages_flags_scanned_pages_only(tmp_path):
+    """Seules les pages sans texte natif et couvertes par une image sont routées vers l'OCR."""
+    path = tmp_path / "mixed.pdf"
+    scan = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 60, 80), False)
+    scan.clear_with(200)
+    with fitz.open() as doc:
+        page = doc.new_page()
+        page.insert_text((72, 72), "Texte numérique natif suffisamment long pour ne pas être un scan. " * 2)
+        page = doc.new_page()
+        page.insert_image(page.rect, pixmap=scan)           # Page scannée
+        doc.new_page()                                      # Page blanche
+        page = doc.new_page()
+        page.insert_image(fitz.Rect(72, 72, 144, 144), pixmap=scan)  # Petite illustration
+        doc.save(path)
+
+    assert classify_pages(str(path)) == [False, True, False, False]
+    assert classify_pages(str(tmp_path / "missing.pdf")) == []
+
+
+def test_plan_segments_routes_ocr_per_page():
+    digital = [False] * 10
+    assert plan_segments(digital, min_pages=120) == [(None, False)]
+    assert plan_segments([True] * 10, min_pages=120) == [(None, True)]
+
+    # Livre numérique avec annexes scannées ; l'îlot numérique de 2 pages est absorbé par l'OCR
+    flags = [False] * 8 + [True] * 3 + [False] * 2 + [True] * 2 + [False] * 5
+    assert plan_segments(flags, min_pages=120, min_text_run=3) == [
+        ((1, 8), False), ((9, 15), True), ((16, 20), False)
+    ]
+
+    # Grand document : les segments longs sont aussi découpés en shards
+    flags = [False] * 130 + [True] * 10
+    assert plan_segments(flags, min_pages=120, pages_per_shard=60) == [
+        ((1, 60), False), ((61, 130), False), ((131, 140), True)
+    ]
+
+
+def test_plan_windows_for_streaming_conversion():
+    assert plan_windows(61, 130, 30) == [(61, 90), (91, 120), (121, 130)]
+    assert plan_windows(1, 10, 30) == [(1, 10)]
@@ -0,0 +1,102 @@
+import pytest
+import pandas as pd
+from unittest.mock import AsyncMock, MagicMock
+
+from app.indexing.operations.graph.summarize_manager import SummarizeManager
+
+
+class _InMemorySummaryRepo:
+    """Remplace la table description_summaries."""
+    def __init__(self):
+        self.rows = {}
+
+    async def get_summaries(self, object_ids, prompt_version):
+        return {oid: self.rows[(oid, prompt_version)] for oid in object_ids if (oid, prompt_version) in self.rows}
+
+    async def save_summaries(self, summaries):
+        for s in summaries:
+            self.rows[(s.object_id, s.prompt_version)] = s
+
+
+def _entities(description):
+    return pd.DataFrame([{"id": "ent_1", "title": "Abu Bakr", "description": description}])
+
+
+def _manager(store, answer="SUMMARY"):
+    llm = MagicMock()
+    llm.ask_text = AsyncMock(return_value=answer)
+    return SummarizeManager(llm, store=store), llm
+
+
+@pytest.mark.asyncio
+async def test_unchanged_fragment_set_is_not_summarized_again():
+    store = _InMemorySummaryRepo()
+    manager, llm = _manager(store)
+    await manager._process_df(_entities("first caliph | father of Aisha"), is_entity=True)
+    assert llm.ask_text.await_count == 1
+
+    # Même ensemble, autre ordre : aucun appel
+    manager, llm = _manager(store)
+    out = await manager._process_df(_entities("father of Aisha | first caliph"), is_entity=True)
+    assert out.iloc[0]["description"] == "SUMMARY"
+    llm.ask_text.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_new_fragment_is_folded_into_the_stored_summary():
+    store = _InMemorySummaryRepo()
+    manager, _ = _manager(store, "S1")
+    await manager._process_df(_entities("first caliph | father of Aisha"), is_entity=True)
+
+    manager, llm = _manager(store, "S2")
+    out = await manager._process_df(_entities("first caliph | father of Aisha | companion in the cave"), is_entity=True)
+
+    prompt = llm.ask_text.await_args.kwargs["user_prompt"]
+    assert "Current Summary: S1" in prompt
+    assert "companion in the cave" in prompt and "first caliph" not in prompt
+    assert out.iloc[0]["description"] == "S2"
+    assert list(store.rows.values())[0].summary == "S2"
+
+
+@pytest.mark.asyncio
+async def test_removed_fragment_triggers_full_summary_and_failures_are_not_stored():
+    store = _InMemorySummaryRepo()
+    manager, _ = _manager(store, "S1")
+    await manager._process_df(_entities("a | b"), is_entity=True)
+
+    manager, llm = _manager(store, "S2")
+    await manager._process_df(_entities("a | c"), is_entity=True)
+    assert "Current Summary" not in llm.ask_text.await_args.kwargs["user_prompt"]
+
+    failing_llm = MagicMock()
+    failing_llm.ask_text = AsyncMock(side_effect=RuntimeError("timeout"))
+    manager = SummarizeManager(failing_llm, store=store)
+    out = await manager._process_df(_entities("a | d"), is_entity=True)
+    assert out.iloc[0]["description"] == "a d"
+    assert list(store.rows.values())[0].summary == "S2"
+
+
+@pytest.mark.asyncio
+async def test_small_jobs_are_packed_and_missing_keys_fall_back():
+    """50 petites entités -> quelques prompts groupés ; une clé absente repasse en appel unitaire."""
+    df = pd.DataFrame([
+        {"id": f"ent_{i}", "title": f"Companion {i}", "description": f"fragment a{i} | fragment b{i}"}
+        for i in range(50)
+    ])
+
+    llm = MagicMock()
+
+    async def batch_answer(system_prompt, user_prompt):
+        keys = [line[1:line.index("]")] for line in user_prompt.splitlines() if line.startswith("[S")]
+        return {k: f"summary {k}" for k in keys if k != "S0"}  # S0 toujours oublié
+
+    llm.ask_json = AsyncMock(side_effect=batch_answer)
+    llm.ask_text = AsyncMock(return_value="single")
+
+    out = await SummarizeManager(llm)._process_df(df, is_entity=True)
+
+    n_batches = llm.ask_json.await_count
+    assert 1 < n_batches <= 5
+    assert llm.ask_text.await_count == n_batches   # Une relance par S0 oublié
+    assert out["description"].str.len().gt(0).all()
+    assert (out["description"] == "single").sum() == n_batches
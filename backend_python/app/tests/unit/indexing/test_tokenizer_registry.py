@@ -0,0 +1,43 @@
+from tokenizers import Tokenizer, models, pre_tokenizers
+from transformers import PreTrainedTokenizerFast
+
+from app.services.tokenizer_registry import TokenizerRegistry
+
+
+def _word_tokenizer() -> PreTrainedTokenizerFast:
+    """Tokenizer rapide minimal (un token par mot), sans téléchargement."""
+    vocab = {"[UNK]": 0, "[CLS]": 1, "[SEP]": 2, "le": 3, "prophète": 4, "à": 5, "médine": 6}
+    backend = Tokenizer(models.WordLevel(vocab, unk_token="[UNK]"))
+    backend.pre_tokenizer = pre_tokenizers.Whitespace()
+    return PreTrainedTokenizerFast(tokenizer_object=backend, unk_token="[UNK]")
+
+
+def test_batched_counts_match_single_encodes():
+    tokenizer = _word_tokenizer()
+    TokenizerRegistry.register("test/words", tokenizer)
+    texts = ["le prophète à médine", "", "médine", "mot inconnu ici"]
+
+    counts = TokenizerRegistry.count_tokens(texts, "test/words", batch_size=3)
+
+    assert counts == [len(tokenizer.encode(t)) for t in texts] == [4, 0, 1, 3]
+    assert TokenizerRegistry.get("test/words") is tokenizer
+
+
+def test_unavailable_tokenizer_falls_back_to_estimate():
+    """Sans tokenizer chargeable (hôte hors-ligne), le comptage reste possible par estimation."""
+    counts = TokenizerRegistry.count_tokens(["a" * 40, "b"], "tiktoken:encodage-inexistant")
+    assert counts == [11, 1]
+
+
+def test_one_lock_per_tokenizer_and_counts_ignore_truncation():
+    """Un verrou par tokenizer ; un appel tronquant (embeddings) ne fausse pas les comptages suivants."""
+    tokenizer = _word_tokenizer()
+    TokenizerRegistry.register("test/words-lock", tokenizer)
+    assert TokenizerRegistry.lock("test/words-lock") is TokenizerRegistry.lock("test/words-lock")
+    assert TokenizerRegistry.lock("test/words-lock") is not TokenizerRegistry.lock("test/words")
+
+    with TokenizerRegistry.lock("test/words-lock"):
+        truncated = tokenizer(["le prophète à médine"], truncation=True, max_length=2)
+    assert len(truncated["input_ids"][0]) == 2
+
+    assert TokenizerRegistry.count_tokens(["le prophète à médine"], "test/words-lock") == [4]
@@ -0,0 +1,42 @@
+"""
+Legacy (per-group lambdas) vs columnar entity aggregation on a 50k-row frame.
+
+Usage (from backend_python/): python -m scripts.benchmarks.aggregation_50k [--repeat 3]
+The frame and the reference implementation are those of the aggregation unit tests,
+which check that both produce the same result.
+"""
+import argparse
+import time
+
+from app.indexing.operations.graph.aggregation_utils import columnar_aggregate
+from app.tests.unit.indexing.test_aggregation import RULES, _legacy_aggregate, _synthetic_frame
+
+
+def best_of(repeat: int, fn, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--ids", type=int, default=12_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = _synthetic_frame(args.rows, args.ids, seed=1)
+    legacy = best_of(args.repeat, _legacy_aggregate, df)
+    columnar = best_of(args.repeat, columnar_aggregate, df, ["id"], RULES)
+
+    print(f"{args.rows} rows / {args.ids} ids (best of {args.repeat})")
+    print(f"  legacy   : {legacy:.3f}s")
+    print(f"  columnar : {columnar:.3f}s")
+    print(f"  speedup  : x{legacy / columnar:.1f}")
+
+
+if __name__ == "__main__":
+    main()
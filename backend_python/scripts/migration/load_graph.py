@@ -0,0 +1,86 @@
+import asyncio
+import argparse
+import shutil
+import subprocess
+
+import pandas as pd
+
+from app.indexing.operations.graph.store_manager import GraphStoreManager
+from app.infrastructure.neo4j.bulk_import import Neo4jImportExporter, is_database_empty
+from app.infrastructure.neo4j.client import Neo4jClient
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+async def load_graph(
+    entities_path: str,
+    relationships_path: str,
+    mode: str,
+    output_dir: str,
+    database: str,
+    execute: bool,
+    doc_id: str = None
+):
+    """
+    Loads resolved entity / relationship Parquet files into Neo4j.
+
+    - offline: writes neo4j-admin import files (empty, stopped database only);
+      with --execute, runs the import when neo4j-admin is on the PATH.
+    - online: batched Cypher writes through GraphStoreManager (any database state).
+    - auto: offline on an empty database, online otherwise.
+    """
+    entities_df = pd.read_parquet(entities_path)
+    relationships_df = pd.read_parquet(relationships_path)
+    logger.info(f"📥 Loaded {len(entities_df)} entities and {len(relationships_df)} relationships.")
+
+    client = Neo4jClient()
+    await client.connect()
+    try:
+        empty = await is_database_empty(client)
+        if mode == "auto":
+            mode = "offline" if empty else "online"
+            logger.info(f"🧭 Database is {'empty' if empty else 'not empty'}: using the {mode} path.")
+
+        if mode == "online":
+            await GraphStoreManager(client).save_graph(entities_df, relationships_df, doc_id=doc_id)
+            return
+
+        if not empty:
+            raise RuntimeError("Offline import overwrites the database: it is only allowed on an empty graph.")
+    finally:
+        await client.close()
+
+    manifest = Neo4jImportExporter(output_dir).export(entities_df, relationships_df, doc_id=doc_id)
+
+    if execute and shutil.which("neo4j-admin"):
+        logger.info("⏳ Running neo4j-admin import (the database must be stopped)...")
+        subprocess.run(manifest.command(database), cwd=output_dir, check=True)
+        logger.info("✅ Offline import complete. Start the database: the schema is applied at the next API startup.")
+    else:
+        logger.info(
+            "ℹ️ Stop the database, then run:\n"
+            f"    {manifest.command_line(database)}\n"
+            "Constraints and indexes are applied at the next API startup (Neo4jSchemaManager)."
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Load a resolved graph into Neo4j (bulk import or batched writes).")
+    parser.add_argument("--entities", required=True, help="Path to the entities Parquet file")
+    parser.add_argument("--relationships", required=True, help="Path to the relationships Parquet file")
+    parser.add_argument("--mode", choices=["auto", "offline", "online"], default="auto")
+    parser.add_argument("--output-dir", default="./neo4j_import", help="Where the neo4j-admin files are written")
+    parser.add_argument("--database", default="neo4j")
+    parser.add_argument("--doc-id", default=None, help="Provenance recorded on every node and edge")
+    parser.add_argument("--execute", action="store_true", help="Run neo4j-admin when available (offline mode)")
+    args = parser.parse_args()
+
+    await load_graph(
+        args.entities, args.relationships, args.mode,
+        args.output_dir, args.database, args.execute, args.doc_id
+    )
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())